@@ -0,0 +1,100 @@
+"""
+Compares ways of reading the old and new sources of all files of a commit that
+modifies many files: one `git cat-file blob` process per blob, like the git
+backend did before, GitPython, which PyDriller uses, and one long running
+`git cat-file --batch` process, see `contribution_complexity.blobs`. The
+mining of the whole commit with the git backend is timed as well.
+
+Usage: python benchmarks/bench_blobs.py [<no_files>]
+"""
+
+import time
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from git import Repo
+from synthetic import generate_repo
+from contribution_complexity.blobs import BlobReader
+from contribution_complexity.metrics import _records_per_commits
+
+
+def _git(path, *args):
+    return subprocess.run(
+        ["git", "-C", str(path), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def synthetic_commit(path, no_files):
+    """A repository, see `synthetic.generate_repo`, whose last commit
+    modifies all of its files. Returns the sha of that commit and the old and
+    new object ids of its files.
+    """
+    (commit_sha,) = generate_repo(
+        path,
+        no_commits=1,
+        files_per_commit=no_files,
+        no_files=no_files,
+        methods_per_file=20,
+    )
+    raw = _git(path, "diff-tree", "-r", "--no-abbrev", "HEAD~", "HEAD")
+    oids = []
+    for line in raw.splitlines():
+        _, _, old_oid, new_oid, _ = line.split(maxsplit=4)
+        oids += [old_oid, new_oid]
+    return commit_sha, oids
+
+
+def read_per_process(path, oids):
+    for oid in oids:
+        cmd = ["git", "-C", str(path), "cat-file", "blob", oid]
+        result = subprocess.run(cmd, capture_output=True)
+        result.stdout.decode("utf-8", "ignore")
+
+
+def read_with_gitpython(path, oids):
+    repo = Repo(path)
+    for oid in oids:
+        repo.odb.stream(bytes.fromhex(oid)).read().decode("utf-8", "ignore")
+
+
+def read_in_batch(path, oids):
+    with BlobReader(path) as reader:
+        for oid in oids:
+            reader.read_text(oid)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares ways of reading the sources of a commit"
+    )
+    parser.add_argument(
+        "no_files",
+        nargs="?",
+        type=int,
+        default=300,
+        help="number of files that the commit modifies (default: 300)",
+    )
+    no_files = parser.parse_args().no_files
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir)
+        commit_sha, oids = synthetic_commit(path, no_files)
+        print(f"Commit modifying {no_files} files, {len(oids)} blobs")
+        for func in (read_per_process, read_with_gitpython, read_in_batch):
+            start = time.perf_counter()
+            func(path, oids)
+            seconds = time.perf_counter() - start
+            print(f"{func.__name__:24} {seconds * 1000:8.1f} ms")
+
+        for backend in ("pydriller", "git"):
+            start = time.perf_counter()
+            _records_per_commits(tmp_dir, [commit_sha], backend)
+            seconds = time.perf_counter() - start
+            print(f"{'mining with ' + backend:24} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
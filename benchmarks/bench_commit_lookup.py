@@ -0,0 +1,90 @@
+"""
+Compares the latency of scoring a single commit of a repository with a long
+history, see `synthetic.generate_repo`, when the commit is found by
+walking the history with `RepositoryMining(..., only_commits=...)`, like
+`collect_data` did before, and when it is looked up directly, see
+`contribution_complexity.metrics.iter_commits`.
+
+Usage: python benchmarks/bench_commit_lookup.py [<no_commits>]
+"""
+
+import time
+import argparse
+import tempfile
+from pydriller import GitRepository, RepositoryMining
+from synthetic import generate_repo
+from contribution_complexity.metrics import (
+    compute_commit_metrics,
+    compute_contrib_compl,
+    iter_commits,
+)
+
+
+def walk_history(path, commit_shas):
+    rm = RepositoryMining(path, only_commits=commit_shas)
+    commits = list(rm.traverse_commits())
+    compute_commit_metrics(commits)
+    return commits
+
+
+def look_up(path, commit_shas):
+    commits = list(iter_commits(GitRepository(path), commit_shas))
+    compute_commit_metrics(commits)
+    return commits
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compares walking the history with looking up commits"
+    )
+    parser.add_argument(
+        "no_commits",
+        nargs="?",
+        type=int,
+        default=100_000,
+        help="number of commits of the history (default: 100000)",
+    )
+    no_commits = parser.parse_args().no_commits
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        # Each commit modifies one of 100 small files
+        commit_shas = generate_repo(
+            path,
+            no_commits=no_commits,
+            files_per_commit=1,
+            diff_lines=3,
+            no_files=100,
+            methods_per_file=1,
+            add_file_every=0,
+        )
+        seconds = time.perf_counter() - start
+        print(f"Generated {no_commits} commits in {seconds:.1f} s")
+
+        # An old, a middle, and the newest commit
+        for commit_sha in dict.fromkeys(
+            (
+                commit_shas[len(commit_shas) // 100],
+                commit_shas[len(commit_shas) // 2],
+                commit_shas[-1],
+            )
+        ):
+            for func in (walk_history, look_up):
+                start = time.perf_counter()
+                commits = func(path, [commit_sha])
+                seconds = time.perf_counter() - start
+                assert [c.hash for c in commits] == [commit_sha]
+                print(
+                    f"{commit_sha[:10]} {func.__name__:14} "
+                    f"{seconds * 1000:10.1f} ms"
+                )
+            start = time.perf_counter()
+            compute_contrib_compl(path, [commit_sha])
+            seconds = time.perf_counter() - start
+            print(
+                f"{commit_sha[:10]} {'contrib_compl':14} "
+                f"{seconds * 1000:10.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
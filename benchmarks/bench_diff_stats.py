@@ -0,0 +1,86 @@
+"""
+Compares counting hunks and added and removed lines of a large synthetic diff
+by splitting it into lines, like `_compute_hunks` and PyDriller do, with the
+single pass of `contribution_complexity.diff_stats.count_diff_lines`.
+
+Usage: python benchmarks/bench_diff_stats.py [<size_in_mb>]
+"""
+
+import sys
+import random
+import timeit
+import tracemalloc
+from contribution_complexity.diff_stats import count_diff_lines
+
+
+def count_diff_lines_by_splitting(diff):
+    is_hunk = False
+    no_hunks = 0
+    for line in diff.splitlines():
+        if line.startswith("+") or line.startswith("-"):
+            if not is_hunk:
+                is_hunk = True
+                no_hunks += 1
+        else:
+            is_hunk = False
+
+    no_added = no_removed = 0
+    for line in diff.replace("\r", "").split("\n"):
+        if line.startswith("+") and not line.startswith("+++"):
+            no_added += 1
+        if line.startswith("-") and not line.startswith("---"):
+            no_removed += 1
+    return no_added, no_removed, no_hunks
+
+
+def synthetic_diff(size_in_mb, seed=42):
+    """A diff of hunks with up to 20 added and removed lines of generated
+    code and a few context lines in between
+    """
+    rnd = random.Random(seed)
+    chunks = []
+    size = 0
+    line_no = 1
+    while size < size_in_mb * 1024 * 1024:
+        no_removed, no_added = rnd.randint(0, 20), rnd.randint(1, 20)
+        lines = [f"@@ -{line_no},{no_removed} +{line_no},{no_added} @@"]
+        lines += [f" context line {line_no + i}" for i in range(3)]
+        lines += [
+            f"-    value_{i} = compute({i}, {i * 7});"
+            for i in range(no_removed)
+        ]
+        lines += [
+            f"+    value_{i} = compute({i}, {i * 3});" for i in range(no_added)
+        ]
+        chunk = "\n".join(lines) + "\n"
+        chunks.append(chunk)
+        size += len(chunk)
+        line_no += no_added + 3
+    return "".join(chunks)
+
+
+def measure(func, diff, repeat=3):
+    seconds = min(timeit.repeat(lambda: func(diff), number=1, repeat=repeat))
+    tracemalloc.start()
+    func(diff)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    size_in_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    diff = synthetic_diff(size_in_mb)
+    assert count_diff_lines(diff) == count_diff_lines_by_splitting(diff)
+
+    print(f"Diff of {len(diff) / 1024 / 1024:.1f} MB")
+    for func in (count_diff_lines_by_splitting, count_diff_lines):
+        seconds, peak = measure(func, diff)
+        print(
+            f"{func.__name__:30} {seconds * 1000:8.1f} ms "
+            f"{peak / 1024 / 1024:8.1f} MB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
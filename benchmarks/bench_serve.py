@@ -0,0 +1,87 @@
+"""
+Compares the latency of scoring a contribution with a cold invocation of
+`contribcompl commits` with a request to a running `contribcompl serve`.
+
+Usage: python benchmarks/bench_serve.py [<no_requests>]
+"""
+
+import sys
+import time
+import tempfile
+import threading
+import statistics
+import subprocess
+from pathlib import Path
+from contribution_complexity.client import score
+from contribution_complexity.server import Scorer, make_server
+
+JAVA_SRC = """public class C{n} {{
+    public int value(int a) {{
+        if (a > {n}) {{
+            return a;
+        }}
+        return {n};
+    }}
+}}
+"""
+
+
+def _git(path, *args):
+    return subprocess.run(
+        ["git", "-C", str(path), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.strip()
+
+
+def synthetic_repo(path, no_commits=50):
+    """A repository in which every commit adds or changes a few classes"""
+    _git(path, "init", "-q")
+    _git(path, "config", "user.name", "Jane Doe")
+    _git(path, "config", "user.email", "jane@example.com")
+    shas = []
+    for i in range(no_commits):
+        for n in range(i % 5, i % 5 + 3):
+            (path / f"C{n}.java").write_text(JAVA_SRC.format(n=n + i))
+        _git(path, "add", "-A")
+        _git(path, "commit", "-q", "-m", f"ISSUE-{i % 10} Change {i}")
+        shas.append(_git(path, "rev-parse", "HEAD"))
+    return shas
+
+
+def timed(func, no_requests):
+    seconds = []
+    for _ in range(no_requests):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def main():
+    no_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path_to_repo = Path(tmp_dir)
+        shas = synthetic_repo(path_to_repo)[-5:]
+
+        server = make_server(Scorer(), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}"
+        cmd = ["contribcompl", "commits", "--no-cache", tmp_dir, *shas]
+
+        cold = timed(
+            lambda: subprocess.run(cmd, capture_output=True, check=True),
+            no_requests,
+        )
+        warm = timed(lambda: score(tmp_dir, shas=shas, url=url), no_requests)
+        server.shutdown()
+        server.server_close()
+
+    print(f"Median of {no_requests} requests for {len(shas)} commits")
+    print(f"{'cold CLI':12} {cold * 1000:8.1f} ms")
+    print(f"{'server':12} {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measures how long the CLI takes to answer `--help`, `--version`, and invalid
+arguments, and how much of that is spent importing modules, as reported by
+`python -X importtime`. For comparison, the same is measured for importing the
+modules that mine commits.
+
+Usage: python benchmarks/bench_startup.py [<repeat>]
+"""
+
+import sys
+import time
+import subprocess
+
+CASES = {
+    "--help": ["-m", "contribution_complexity.compute", "--help"],
+    "--version": ["-m", "contribution_complexity.compute", "--version"],
+    "invalid output": [
+        "-m",
+        "contribution_complexity.compute",
+        "commits",
+        "--output=xml",
+        ".",
+        "abc",
+    ],
+    "import metrics": ["-c", "import contribution_complexity.metrics"],
+}
+
+
+def import_time(stderr):
+    """Sums up the cumulative import times of all top level imports in
+    microseconds
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Imports of imports are indented
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+def measure(args, repeat):
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True)
+        seconds.append(time.perf_counter() - start)
+    cmd = [sys.executable, "-X", "importtime", *args]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    return min(seconds), import_time(result.stderr)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, args in CASES.items():
+        seconds, micros = measure(args, repeat)
+        print(
+            f"{name:16} {seconds * 1000:8.1f} ms total "
+            f"{micros / 1000:8.1f} ms importing"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Times the metrics pipeline on a synthetic repository, see `synthetic.py`, and
+writes the results as JSON, so that the performance of two versions can be
+compared offline. Each benchmark runs `--repeat` times and the minimum and
+median wall times are recorded.
+
+Usage:
+  run_benchmarks.py [options]
+  run_benchmarks.py --compare <old_json> <new_json>
+
+Options:
+  -h --help               Show this screen.
+  --commits=<n>           Number of commits [default: 200].
+  --files-per-commit=<n>  Number of files that each commit modifies
+                          [default: 4].
+  --diff-lines=<n>        Number of changed lines per modified file
+                          [default: 12].
+  --languages=<list>      Comma separated languages of the sources
+                          [default: java,python].
+  --repeat=<n>            Number of runs per benchmark [default: 3].
+  --output=<file>         Where to write the results [default: bench.json].
+"""
+
+import sys
+import json
+import time
+import platform
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from docopt import docopt
+from synthetic import contributions, generate_repo
+from contribution_complexity.batch import score_in_batches
+from contribution_complexity.metrics import (
+    _compute_hunks,
+    collect_data,
+    compute_contrib_compl,
+)
+
+
+def _package_revision():
+    result = subprocess.run(
+        ["git", "-C", str(Path(__file__).parent), "describe", "--always"],
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def benchmarks(path_to_repo, commit_shas):
+    """Returns the benchmarks as functions without arguments keyed by name"""
+    contribs = contributions(commit_shas)
+    commits = list(collect_data(path_to_repo, commit_shas))
+    mods = [mod for commit in commits for mod in commit.modifications]
+    path_to_results = Path(path_to_repo).parent / "results.csv"
+
+    def batch_scoring():
+        # The batch scoring resumes from existing results
+        path_to_results.unlink(missing_ok=True)
+        score_in_batches(path_to_repo, contribs, path_to_results)
+
+    return {
+        "collect_data": lambda: sum(
+            len(commit.modifications)
+            for commit in collect_data(path_to_repo, commit_shas)
+        ),
+        "compute_hunks": lambda: [_compute_hunks(mod) for mod in mods],
+        "compute_contrib_compl": lambda: compute_contrib_compl(
+            path_to_repo, commit_shas
+        ),
+        "compute_contrib_compl_git": lambda: compute_contrib_compl(
+            path_to_repo, commit_shas, backend="git"
+        ),
+        "batch_scoring": batch_scoring,
+    }
+
+
+def run(params, repeat):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path_to_repo = str(Path(tmp_dir) / "repo")
+        start = time.perf_counter()
+        commit_shas = generate_repo(path_to_repo, **params)
+        print(
+            f"Generated {len(commit_shas)} commits in "
+            f"{time.perf_counter() - start:.1f} s",
+            file=sys.stderr,
+        )
+        results = {}
+        for name, func in benchmarks(path_to_repo, commit_shas).items():
+            runs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                runs.append(time.perf_counter() - start)
+            results[name] = {
+                "min_s": min(runs),
+                "median_s": statistics.median(runs),
+                "runs_s": runs,
+            }
+            print(f"{name:28} {min(runs) * 1000:10.1f} ms", file=sys.stderr)
+    return {
+        "revision": _package_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {**params, "languages": list(params["languages"])},
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(path_to_old, path_to_new):
+    """Formats the minimum times of two result files and their ratio, which
+    is above 1 when the new version is slower
+    """
+    old = json.loads(Path(path_to_old).read_text())
+    new = json.loads(Path(path_to_new).read_text())
+    if old["params"] != new["params"]:
+        print("Warning: the benchmarks ran on different repositories")
+    lines = [f"{'benchmark':28} {'old_ms':>10} {'new_ms':>10} {'ratio':>7}"]
+    for name, stats in new["results"].items():
+        if name not in old["results"]:
+            continue
+        old_s = old["results"][name]["min_s"]
+        new_s = stats["min_s"]
+        lines.append(
+            f"{name:28} {old_s * 1000:10.1f} {new_s * 1000:10.1f} "
+            f"{new_s / old_s:7.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    arguments = docopt(__doc__)
+    if arguments["--compare"]:
+        print(compare(arguments["<old_json>"], arguments["<new_json>"]))
+        return
+    try:
+        params = {
+            "no_commits": int(arguments["--commits"]),
+            "files_per_commit": int(arguments["--files-per-commit"]),
+            "diff_lines": int(arguments["--diff-lines"]),
+            "languages": tuple(arguments["--languages"].split(",")),
+        }
+        repeat = int(arguments["--repeat"])
+    except ValueError as e:
+        sys.exit(f"Invalid option: {e}")
+    report = run(params, repeat)
+    with open(arguments["--output"], "w", encoding="utf-8") as fp:
+        json.dump(report, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Generation of deterministic synthetic repositories for the benchmarks. The
+repositories contain Java and Python sources, which lizard parses, and are
+written with `git fast-import`, so that even long histories are generated in
+seconds. The same parameters always result in the same commit shas.
+
+    shas = generate_repo("/tmp/synthetic", no_commits=500, files_per_commit=4)
+    contribs = contributions(shas, commits_per_issue=5)
+"""
+
+import random
+import subprocess
+
+JAVA_CLASS = "public class {name} {{\n{methods}}}\n"
+JAVA_METHOD = """    public int {name}(int a) {{
+        if (a > {c}) {{
+            return a * {c};
+        }}
+        return {c};
+    }}
+"""
+PYTHON_FUNCTION = """def {name}(a):
+    if a > {c}:
+        return a * {c}
+    return {c}
+
+"""
+LANGUAGES = ("java", "python")
+# All commits are committed by the same person a minute apart, starting at
+# 2021-01-01, which keeps the shas stable
+COMMITTER = b"Jane Doe <jane@example.com>"
+START_TIME = 1609459200
+
+
+class SyntheticFile:
+    """A source file that consists of methods, each of which returns a
+    constant. Changing a constant modifies three lines of the file.
+    """
+
+    def __init__(self, path, language, no_methods, rnd):
+        self.path = path
+        self.language = language
+        self.constants = [rnd.randrange(1000) for _ in range(no_methods)]
+
+    def modify(self, diff_lines, rnd):
+        for _ in range(max(1, diff_lines // 3)):
+            idx = rnd.randrange(len(self.constants) + 1)
+            if idx == len(self.constants):
+                self.constants.append(rnd.randrange(1000))
+            else:
+                self.constants[idx] += 1
+
+    def render(self):
+        if self.language == "java":
+            name = self.path.rsplit("/", 1)[-1][: -len(".java")]
+            methods = "".join(
+                JAVA_METHOD.format(name=f"m{idx}", c=c)
+                for idx, c in enumerate(self.constants)
+            )
+            return JAVA_CLASS.format(name=name, methods=methods)
+        return "".join(
+            PYTHON_FUNCTION.format(name=f"f{idx}", c=c)
+            for idx, c in enumerate(self.constants)
+        )
+
+
+def _data(content):
+    data = content.encode("utf-8")
+    return b"data %d\n%s\n" % (len(data), data)
+
+
+def _new_file(idx, languages, no_methods, rnd):
+    language = languages[idx % len(languages)]
+    if language == "java":
+        path = f"src/main/java/C{idx}.java"
+    else:
+        path = f"src/python/module_{idx}.py"
+    return SyntheticFile(path, language, no_methods, rnd)
+
+
+def generate_repo(
+    path_to_repo,
+    no_commits=100,
+    files_per_commit=3,
+    diff_lines=12,
+    no_files=50,
+    methods_per_file=10,
+    languages=LANGUAGES,
+    commits_per_issue=5,
+    seed=0,
+    add_file_every=10,
+):
+    """Creates a repository on branch main in the given empty directory. The
+    first commit adds `no_files` files, alternating between the given
+    languages, and each of the following `no_commits` commits modifies
+    `files_per_commit` of them by about `diff_lines` changed lines per file.
+    Every `add_file_every`th commit additionally adds a file, unless it is 0,
+    which keeps the trees of long histories small. The messages of the commits
+    reference the issues ISSUE-1, ISSUE-2, ..., `commits_per_issue` commits
+    each. Returns the shas of the commits after the first one, oldest first.
+    """
+    rnd = random.Random(seed)
+    files = [
+        _new_file(idx, languages, methods_per_file, rnd)
+        for idx in range(no_files)
+    ]
+    stream = []
+
+    def commit(mark, msg, changed_files):
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(b"mark :%d\n" % mark)
+        stream.append(
+            b"committer %s %d +0000\n" % (COMMITTER, START_TIME + mark * 60)
+        )
+        stream.append(_data(msg))
+        if mark > 1:
+            stream.append(b"from :%d\n" % (mark - 1))
+        for synthetic_file in changed_files:
+            stream.append(b"M 644 inline %s\n" % synthetic_file.path.encode())
+            stream.append(_data(synthetic_file.render()))
+
+    commit(1, "Initial import", files)
+    for idx in range(no_commits):
+        changed_files = rnd.sample(files, min(files_per_commit, len(files)))
+        for synthetic_file in changed_files:
+            synthetic_file.modify(diff_lines, rnd)
+        if add_file_every and idx % add_file_every == add_file_every - 1:
+            new_file = _new_file(len(files), languages, methods_per_file, rnd)
+            files.append(new_file)
+            changed_files.append(new_file)
+        issue_id = idx // commits_per_issue + 1
+        commit(idx + 2, f"ISSUE-{issue_id} Change {idx}", changed_files)
+
+    subprocess.run(
+        ["git", "init", "-q", "-b", "main", str(path_to_repo)], check=True
+    )
+    subprocess.run(
+        ["git", "-C", str(path_to_repo), "fast-import", "--quiet"],
+        input=b"".join(stream),
+        check=True,
+    )
+    # Check out the sources, which some tools expect
+    subprocess.run(
+        ["git", "-C", str(path_to_repo), "reset", "-q", "--hard"], check=True
+    )
+    log = subprocess.run(
+        ["git", "-C", str(path_to_repo), "rev-list", "--reverse", "HEAD"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return log.stdout.split()[1:]
+
+
+def contributions(commit_shas, commits_per_issue=5):
+    """Returns the shas of the commits of a `generate_repo` repository per
+    issue id
+    """
+    return {
+        f"ISSUE-{idx // commits_per_issue + 1}": commit_shas[
+            idx : idx + commits_per_issue
+        ]
+        for idx in range(0, len(commit_shas), commits_per_issue)
+    }
@@ -1,3 +1,8 @@
-from importlib.metadata import version
+def __getattr__(name):
+    # Reading the installed metadata is slow, so the version is only looked up
+    # when it is asked for, e.g., by `contribcompl --version`
+    if name == "__version__":
+        from importlib.metadata import version
 
-__version__ = version(__package__)
+        return version(__package__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,109 @@
+import struct
+from pydriller import ModificationType
+from contribution_complexity.complexity_types import ModificationComplexity
+
+# Number of modified files and lines followed by the frequencies of the kinds
+# and the complexities of modifications, as unsigned 64 bit integers
+_STRUCT = struct.Struct(
+    f"<2Q{len(ModificationType)}Q{len(ModificationComplexity)}Q"
+)
+
+
+class CommitMetricsAccumulator:
+    """Sums of the metrics of the commits of a contribution in constant
+    memory. Accumulators of disjoint sets of commits can be merged, e.g., the
+    ones of different workers or of an earlier and a later run, and
+    serialized to a fixed number of bytes.
+    """
+
+    __slots__ = (
+        "no_modified_files",
+        "no_lines",
+        "mod_kind_freqs",
+        "mods_compl_freqs",
+    )
+
+    def __init__(self):
+        self.no_modified_files = 0
+        self.no_lines = 0
+        # Indexed by the values of the enums minus one
+        self.mod_kind_freqs = [0] * len(ModificationType)
+        self.mods_compl_freqs = [0] * len(ModificationComplexity)
+
+    def add_commit(self, commit_metrics):
+        """Adds the metrics of a commit as returned by
+        `contribution_complexity.metrics.metrics_per_commit`
+        """
+        self.no_modified_files += commit_metrics["no_modified_files"]
+        self.no_lines += commit_metrics["no_lines"]
+        for mod_kind in commit_metrics["mod_kinds"]:
+            self.mod_kind_freqs[mod_kind.value - 1] += 1
+        for mod_compl in commit_metrics["mod_compls"]:
+            self.mods_compl_freqs[mod_compl.value - 1] += 1
+        return self
+
+    def merge(self, other):
+        self.no_modified_files += other.no_modified_files
+        self.no_lines += other.no_lines
+        for idx, freq in enumerate(other.mod_kind_freqs):
+            self.mod_kind_freqs[idx] += freq
+        for idx, freq in enumerate(other.mods_compl_freqs):
+            self.mods_compl_freqs[idx] += freq
+        return self
+
+    def to_commit_metrics(self):
+        """Returns the aggregated metrics of the contribution, see
+        `contribution_complexity.metrics.aggregate_commit_metrics`
+        """
+        if self.no_modified_files == 0:
+            # That should never happen... But it might in case the commits are
+            # not reachable, e.g., checked out an earlier version.
+            changed_l_per_f = 0
+        else:
+            changed_l_per_f = self.no_lines / self.no_modified_files
+        no_mod_types = sum(1 for freq in self.mod_kind_freqs if freq)
+        mods_compl_freqs = {
+            compl: freq
+            for compl, freq in zip(
+                ModificationComplexity, self.mods_compl_freqs
+            )
+            if freq
+        }
+
+        return {
+            "no_modified_files": self.no_modified_files,
+            "changed_l_per_f": changed_l_per_f,
+            "no_mod_types": no_mod_types,
+            "mods_compl_freqs": mods_compl_freqs,
+        }
+
+    def to_bytes(self):
+        return _STRUCT.pack(
+            self.no_modified_files,
+            self.no_lines,
+            *self.mod_kind_freqs,
+            *self.mods_compl_freqs,
+        )
+
+    @classmethod
+    def from_bytes(cls, data):
+        values = _STRUCT.unpack(data)
+        no_kinds = len(ModificationType)
+        acc = cls()
+        acc.no_modified_files, acc.no_lines = values[:2]
+        acc.mod_kind_freqs = list(values[2 : 2 + no_kinds])
+        acc.mods_compl_freqs = list(values[2 + no_kinds :])
+        return acc
+
+    def __eq__(self, other):
+        if not isinstance(other, CommitMetricsAccumulator):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    def __repr__(self):
+        return (
+            f"CommitMetricsAccumulator(no_modified_files="
+            f"{self.no_modified_files}, no_lines={self.no_lines}, "
+            f"mod_kind_freqs={self.mod_kind_freqs}, "
+            f"mods_compl_freqs={self.mods_compl_freqs})"
+        )
@@ -0,0 +1,143 @@
+"""
+Concurrent git queries with asyncio, e.g., to search and score the commits of
+issues in many repositories at once. The commands are the ones of
+`contribution_complexity.compute`, run without a shell, and at most
+`max_concurrent` of them run at the same time per `GitRunner`.
+
+    async def find_in_all(paths, issue_re):
+        runner = GitRunner(max_concurrent=16)
+        return await asyncio.gather(
+            *(runner.find_commits_for_issue(p, issue_re) for p in paths)
+        )
+"""
+
+import os
+import asyncio
+import threading
+import subprocess
+from contribution_complexity.compute import (
+    find_commits_for_issue_cmd,
+    find_commits_for_issues_cmd,
+    is_git_dir_cmd,
+    match_issues,
+)
+
+MAX_CONCURRENT_GIT = os.cpu_count() or 4
+
+# PyDriller writes the config of a repository when it opens it, which fails if
+# another thread does so at the same time, so mining with it is serialized per
+# repository across all runners
+_repo_locks = {}
+_repo_locks_lock = threading.Lock()
+
+
+def _repo_lock(path_to_repo):
+    key = os.path.realpath(path_to_repo)
+    with _repo_locks_lock:
+        return _repo_locks.setdefault(key, threading.Lock())
+
+
+def _compute_contrib_compl_locked(path_to_repo, commit_shas, workers, backend):
+    from contribution_complexity.metrics import compute_contrib_compl
+
+    if backend != "pydriller":
+        return compute_contrib_compl(
+            path_to_repo, commit_shas, workers=workers, backend=backend
+        )
+    with _repo_lock(path_to_repo):
+        return compute_contrib_compl(
+            path_to_repo, commit_shas, workers=workers, backend=backend
+        )
+
+
+class GitRunner:
+    """Runs git commands and mines commits concurrently, but at most
+    `max_concurrent` at the same time
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_GIT):
+        self.max_concurrent = max_concurrent
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Created on first use, since semaphores bind to the event loop that
+        # is running when they are created on Python 3.9
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run(self, cmd, input=None, check=False):
+        """Runs a command, which is a list of arguments, and returns its
+        stdout as bytes. Raises `subprocess.CalledProcessError` if it fails
+        and `check` is true.
+        """
+        async with self.semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=subprocess.DEVNULL if input is None else subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate(input)
+        if check and proc.returncode != 0:
+            raise subprocess.CalledProcessError(
+                proc.returncode, cmd, stdout, stderr
+            )
+        return stdout
+
+    async def git(self, path_to_repo, *args, input=None, check=True):
+        """Runs `git <args>` in the given repository, e.g., `rev-parse HEAD`,
+        and returns its stdout as text
+        """
+        cmd = ["git", "-C", str(path_to_repo), *args]
+        stdout = await self.run(cmd, input=input, check=check)
+        return stdout.decode("utf-8", "replace")
+
+    async def is_git_dir(self, potential_repo_path):
+        if not os.path.isdir(potential_repo_path):
+            return False
+        stdout = await self.run(is_git_dir_cmd(potential_repo_path))
+        return stdout.strip() == b"true"
+
+    async def find_commits_for_issue(self, path_to_repo, issue_re):
+        cmd = find_commits_for_issue_cmd(path_to_repo, issue_re)
+        stdout = await self.run(cmd)
+        return stdout.decode("utf-8", "replace").splitlines()
+
+    async def find_commits_for_issues(
+        self, path_to_repo, issue_res, revisions="HEAD"
+    ):
+        cmd = find_commits_for_issues_cmd(path_to_repo, revisions)
+        stdout = await self.run(cmd)
+        return match_issues(stdout.decode("utf-8", "replace"), issue_res)
+
+    async def compute_contrib_compl(
+        self, path_to_repo, commit_shas, workers=1, backend="pydriller"
+    ):
+        """Like `contribution_complexity.metrics.compute_contrib_compl`, whose
+        mining runs in a thread that counts towards `max_concurrent`. The
+        metrics cache is not supported, since its connection cannot be shared
+        between threads. With the pydriller backend, calls for the same
+        repository run one after the other.
+        """
+        async with self.semaphore:
+            return await asyncio.to_thread(
+                _compute_contrib_compl_locked,
+                path_to_repo,
+                commit_shas,
+                workers,
+                backend,
+            )
+
+
+async def compute_contrib_compl(
+    path_to_repo, commit_shas, workers=1, backend="pydriller", runner=None
+):
+    """Async variant of `metrics.compute_contrib_compl`. Pass the same
+    `GitRunner` to concurrent calls to bound how many run at the same time.
+    """
+    runner = runner or GitRunner()
+    return await runner.compute_contrib_compl(
+        path_to_repo, commit_shas, workers=workers, backend=backend
+    )
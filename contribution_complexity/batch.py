@@ -0,0 +1,125 @@
+"""
+Scoring of many contributions in batches, whose results are appended to a
+file as soon as they are computed. An interrupted run loses at most the batch
+that it was scoring and a later run with the same results file continues with
+the contributions that are not in it yet.
+"""
+
+import os
+import csv
+import json
+from pathlib import Path
+from itertools import chain, islice
+from contribution_complexity.output import RowWriter
+from contribution_complexity.metrics import (
+    collect_records,
+    contrib_breakdowns_from_records,
+    dedup_contribs,
+    get_models,
+)
+from contribution_complexity.path_filter import add_excluded_files
+
+# Number of contributions whose commits are mined together before their
+# results are written
+BATCH_SIZE = 100
+
+
+def is_csv(path_to_results):
+    """Results files ending in `.csv` are CSV files, all others JSON lines"""
+    return str(path_to_results).endswith(".csv")
+
+
+def _truncate_partial_row(path_to_results, block_size=64 * 1024):
+    # A crash while writing may leave a partial last row, which would
+    # otherwise be continued by the next row
+    with open(path_to_results, "rb+") as fp:
+        end = fp.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(pos - block_size, 0)
+            fp.seek(start)
+            block = fp.read(pos - start)
+            idx = block.rfind(b"\n")
+            if idx != -1:
+                pos = start + idx + 1
+                break
+            pos = start
+        if pos != end:
+            fp.truncate(pos)
+
+
+def read_done_ids(path_to_results):
+    """Returns the ids of the contributions in a results file of an earlier
+    run, which do not have to be scored again
+    """
+    if not Path(path_to_results).is_file():
+        return set()
+    _truncate_partial_row(path_to_results)
+    with open(path_to_results, newline="", encoding="utf-8") as fp:
+        if is_csv(path_to_results):
+            return {row["id"] for row in csv.DictReader(fp)}
+        return {json.loads(line)["id"] for line in fp if line.strip()}
+
+
+def score_in_batches(
+    path_to_repo,
+    commit_shas_per_contrib,
+    path_to_results,
+    batch_size=BATCH_SIZE,
+    workers=1,
+    cache=None,
+    backend="pydriller",
+    dedup=False,
+    count_duplicates=True,
+    pathspecs=None,
+):
+    """Computes the complexity of contributions batch by batch and appends
+    one row per contribution, see `contribution_complexity.output.to_row`, to
+    the results file right after its batch is scored. Commits that belong to
+    contributions of different batches are mined only once if a
+    `MetricsCache` is given. Commits with the same patch are deduplicated
+    within a batch with `dedup` and pathspecs limit the metrics to the matching
+    files, see `contribution_complexity.metrics.compute_contrib_compls`,
+    which also holds for analyzing methods only where they matter without a
+    cache. Returns the number of written rows.
+    """
+    kind = "csv" if is_csv(path_to_results) else "json"
+    is_empty = (
+        not Path(path_to_results).is_file()
+        or os.path.getsize(path_to_results) == 0
+    )
+    no_rows = 0
+    contribs = iter(commit_shas_per_contrib.items())
+    with open(path_to_results, "a", newline="", encoding="utf-8") as fp:
+        writer = RowWriter(fp, kind, header=is_empty)
+        while batch := dict(islice(contribs, batch_size)):
+            scored_batch = batch
+            duplicate_of = None
+            if dedup:
+                duplicate_of, scored_batch = dedup_contribs(
+                    path_to_repo, batch, count_duplicates, pathspecs
+                )
+            records = collect_records(
+                path_to_repo,
+                chain.from_iterable(scored_batch.values()),
+                workers=workers,
+                cache=cache,
+                backend=backend,
+                duplicate_of=duplicate_of,
+                pathspecs=pathspecs,
+                models=get_models() if cache is None else None,
+            )
+            breakdowns = contrib_breakdowns_from_records(
+                records, {k: v for k, v in scored_batch.items() if v}
+            )
+            if pathspecs:
+                add_excluded_files(
+                    breakdowns, path_to_repo, scored_batch, pathspecs
+                )
+            for contrib_id, commit_shas in batch.items():
+                writer.write(
+                    contrib_id, commit_shas, breakdowns.get(contrib_id)
+                )
+                no_rows += 1
+            fp.flush()
+    return no_rows
@@ -0,0 +1,106 @@
+"""
+Reading of blobs, i.e., the sources of modified files, through one long running
+`git cat-file --batch` process per repository instead of one process, or one
+GitPython object, per blob. Contents are read into a buffer and handed out as
+`memoryview` slices of it, which are only copied when they are decoded.
+"""
+
+import os
+import atexit
+import threading
+import subprocess
+
+
+class BlobReader:
+    """Reads blobs of a repository by their object ids. Only `read_text` is
+    safe to use from multiple threads and no reader can be used across
+    processes, see `blob_reader`.
+    """
+
+    def __init__(self, path_to_repo):
+        self.path_to_repo = str(path_to_repo)
+        self._lock = threading.Lock()
+        self._buffer = bytearray(64 * 1024)
+        self._proc = subprocess.Popen(
+            ["git", "-C", self.path_to_repo, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def _read_exactly(self, size):
+        # Reads into the buffer, which only grows, so that no bytes objects
+        # are created per blob
+        if len(self._buffer) < size:
+            self._buffer = bytearray(max(size, 2 * len(self._buffer)))
+        view = memoryview(self._buffer)
+        pos = 0
+        while pos < size:
+            no_read = self._proc.stdout.readinto(view[pos:size])
+            if not no_read:
+                raise EOFError(f"git cat-file exited in {self.path_to_repo}")
+            pos += no_read
+        return view[:size]
+
+    def read(self, oid):
+        """Returns the content of the blob with the given object id as a
+        `memoryview`, which is only valid until the next read, or `None` if
+        there is no such blob, e.g., for submodules
+        """
+        self._proc.stdin.write(oid.encode("ascii") + b"\n")
+        self._proc.stdin.flush()
+        # <oid> <type> <size> or <oid> missing
+        header = self._proc.stdout.readline().split()
+        if len(header) != 3:
+            return None
+        _, obj_type, size = header
+        content = self._read_exactly(int(size) + 1)[:-1]
+        if obj_type != b"blob":
+            return None
+        return content
+
+    def read_text(self, oid):
+        """Returns the content of the blob with the given object id decoded
+        like PyDriller does or `None` if there is no such blob
+        """
+        with self._lock:
+            content = self.read(oid)
+            if content is None:
+                return None
+            return str(content, "utf-8", "ignore")
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Open readers keyed by process id and repository, since the pipes of a reader
+# cannot be shared with forked processes
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def blob_reader(path_to_repo):
+    """Returns the reader of the given repository, which is started on first
+    use and stays open until the process exits
+    """
+    key = (os.getpid(), str(path_to_repo))
+    with _readers_lock:
+        if key not in _readers:
+            _readers[key] = BlobReader(path_to_repo)
+        return _readers[key]
+
+
+@atexit.register
+def close_blob_readers():
+    pid = os.getpid()
+    with _readers_lock:
+        for key in [key for key in _readers if key[0] == pid]:
+            _readers.pop(key).close()
@@ -0,0 +1,210 @@
+import os
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+
+
+# Bumped whenever the layout of the records changes, which invalidates the
+# contents of existing cache files
+SCHEMA_VERSION = 1
+# Upper bound of cached modifications after which the least recently used
+# commits are evicted. A modification takes roughly 200 bytes on disk.
+MAX_MODIFICATIONS = 2_000_000
+MOD_METRICS = (
+    "no_lines_added",
+    "no_lines_removed",
+    "no_hunks",
+    "no_methods_changed",
+)
+
+
+def cache_dir():
+    """Directory for all of contribcompl's caches, which respects
+    XDG_CACHE_HOME
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "contribcompl"
+
+
+def hash_str(*args):
+    string = "".join(args)
+    return hashlib.sha256(string.encode("utf-8")).hexdigest()
+
+
+def mod_key(commit_sha, mod_record):
+    # A commit sha already identifies the contents of all files before and
+    # after the commit, so that the source code is not part of the key
+    return hash_str(
+        commit_sha,
+        mod_record["change_type"],
+        mod_record["old_path"] or "",
+        mod_record["new_path"] or "",
+    )
+
+
+class MetricsCache:
+    """Persistent cache of commit records, see
+    `contribution_complexity.metrics.record_per_commit`, in an SQLite
+    database. Records contain no model dependent values, so that cached
+    commits never have to be mined again, also not after the models changed.
+    """
+
+    def __init__(self, path=None, max_modifications=MAX_MODIFICATIONS):
+        if path is None:
+            path = cache_dir() / "metrics.sqlite"
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_modifications = max_modifications
+        self.hits = 0
+        self.misses = 0
+        self._con = sqlite3.connect(path)
+        self._create_tables()
+
+    def _create_tables(self):
+        (version,) = self._con.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._con.execute("DROP TABLE IF EXISTS commits")
+            self._con.execute("DROP TABLE IF EXISTS modifications")
+        metric_cols = ", ".join(f"{m} INTEGER" for m in MOD_METRICS)
+        with self._con:
+            self._con.execute(
+                """CREATE TABLE IF NOT EXISTS commits (
+                    sha TEXT PRIMARY KEY,
+                    no_modified_files INTEGER,
+                    no_lines INTEGER,
+                    no_mods INTEGER,
+                    last_used REAL
+                )"""
+            )
+            self._con.execute(
+                f"""CREATE TABLE IF NOT EXISTS modifications (
+                    key TEXT PRIMARY KEY,
+                    sha TEXT,
+                    idx INTEGER,
+                    change_type TEXT,
+                    old_path TEXT,
+                    new_path TEXT,
+                    {metric_cols}
+                )"""
+            )
+            self._con.execute(
+                "CREATE INDEX IF NOT EXISTS mods_per_commit "
+                "ON modifications (sha, idx)"
+            )
+            self._con.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get_record(self, commit_sha):
+        row = self._con.execute(
+            "SELECT no_modified_files, no_lines FROM commits WHERE sha = ?",
+            (commit_sha,),
+        ).fetchone()
+        if row is None:
+            return None
+        no_modified_files, no_lines = row
+        mod_rows = self._con.execute(
+            "SELECT change_type, old_path, new_path, "
+            + ", ".join(MOD_METRICS)
+            + " FROM modifications WHERE sha = ? ORDER BY idx",
+            (commit_sha,),
+        )
+        mod_records = []
+        for change_type, old_path, new_path, *metrics in mod_rows:
+            mod_records.append(
+                {
+                    "change_type": change_type,
+                    "old_path": old_path,
+                    "new_path": new_path,
+                    **dict(zip(MOD_METRICS, metrics)),
+                }
+            )
+        return {
+            "no_modified_files": no_modified_files,
+            "no_lines": no_lines,
+            "modifications": mod_records,
+        }
+
+    def get_records(self, commit_shas):
+        """Returns the cached records of the given commits keyed by sha.
+        Commits that are not cached are missing in the result.
+        """
+        records = {}
+        for commit_sha in commit_shas:
+            record = self.get_record(commit_sha)
+            if record is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                records[commit_sha] = record
+        if records:
+            now = time.time()
+            with self._con:
+                self._con.executemany(
+                    "UPDATE commits SET last_used = ? WHERE sha = ?",
+                    [(now, commit_sha) for commit_sha in records.keys()],
+                )
+        return records
+
+    def put_records(self, records):
+        now = time.time()
+        placeholders = ", ".join("?" * (6 + len(MOD_METRICS)))
+        with self._con:
+            for commit_sha, record in records.items():
+                mod_records = record["modifications"]
+                self._con.execute(
+                    "INSERT OR REPLACE INTO commits VALUES (?, ?, ?, ?, ?)",
+                    (
+                        commit_sha,
+                        record["no_modified_files"],
+                        record["no_lines"],
+                        len(mod_records),
+                        now,
+                    ),
+                )
+                self._con.executemany(
+                    "INSERT OR REPLACE INTO modifications "
+                    f"VALUES ({placeholders})",
+                    [
+                        (
+                            mod_key(commit_sha, m),
+                            commit_sha,
+                            idx,
+                            m["change_type"],
+                            m["old_path"],
+                            m["new_path"],
+                            *(m[metric] for metric in MOD_METRICS),
+                        )
+                        for idx, m in enumerate(mod_records)
+                    ],
+                )
+        self._evict()
+
+    def _evict(self):
+        (no_mods,) = self._con.execute(
+            "SELECT COALESCE(SUM(no_mods), 0) FROM commits"
+        ).fetchone()
+        if no_mods <= self.max_modifications:
+            return
+        evicted = []
+        rows = self._con.execute(
+            "SELECT sha, no_mods FROM commits ORDER BY last_used"
+        ).fetchall()
+        for commit_sha, no_commit_mods in rows:
+            if no_mods <= self.max_modifications:
+                break
+            evicted.append((commit_sha,))
+            no_mods -= no_commit_mods
+        with self._con:
+            self._con.executemany(
+                "DELETE FROM modifications WHERE sha = ?", evicted
+            )
+            self._con.executemany("DELETE FROM commits WHERE sha = ?", evicted)
+
+    def clear(self):
+        with self._con:
+            self._con.execute("DELETE FROM modifications")
+            self._con.execute("DELETE FROM commits")
+        self._con.execute("VACUUM")
+
+    def close(self):
+        self._con.close()
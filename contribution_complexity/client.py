@@ -0,0 +1,36 @@
+"""
+Client of the scoring server, see `contribution_complexity.server`, which
+needs nothing but the standard library.
+"""
+
+import json
+from urllib.request import Request, urlopen
+from urllib.error import HTTPError
+from contribution_complexity.server import DEFAULT_PORT
+
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+
+
+class ScoringError(Exception):
+    pass
+
+
+def score(repo, shas=None, issue_regex=None, url=DEFAULT_URL, timeout=None):
+    """Asks the server at the given URL for the complexity of the given
+    commits, or of the commits matching the issue regex, of a repository
+    """
+    request = {"repo": repo}
+    if shas is not None:
+        request["shas"] = list(shas)
+    if issue_regex is not None:
+        request["issue_regex"] = issue_regex
+    http_request = Request(
+        url,
+        data=json.dumps(request).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    try:
+        with urlopen(http_request, timeout=timeout) as response:
+            return json.load(response)
+    except HTTPError as e:
+        raise ScoringError(json.load(e)["error"]) from e
@@ -0,0 +1,107 @@
+"""
+Cache of clones of remote repositories, so that repeated runs against the same
+URL do not download its whole history again. Clones are bare and partial, i.e.,
+they contain all commits and trees but fetch file contents only when those are
+needed for diffing. Later runs only fetch new commits.
+"""
+import os
+import shutil
+import subprocess
+from pathlib import Path
+from urllib.parse import urlparse
+from contribution_complexity.cache import cache_dir, hash_str
+
+
+# Upper bound of the total size of all clones in bytes after which the least
+# recently used clones are removed
+MAX_CLONES_SIZE = 10 * 1024**3
+
+
+def clones_dir():
+    return cache_dir() / "clones"
+
+
+def clone_path(url, directory=None):
+    """Directory of the clone of the given URL, which is named after the
+    repository and a hash of the full URL
+    """
+    if directory is None:
+        directory = clones_dir()
+    name = Path(urlparse(url).path.rstrip("/")).name
+    name = name.removesuffix(".git") or "repo"
+    return Path(directory) / f"{name}-{hash_str(url)[:16]}.git"
+
+
+def _git(*args):
+    cmd = ["git", *args]
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+
+
+def dir_size(path):
+    size = 0
+    for root, _, files in os.walk(path):
+        for fname in files:
+            fpath = os.path.join(root, fname)
+            if not os.path.islink(fpath):
+                size += os.path.getsize(fpath)
+    return size
+
+
+def evict_clones(directory=None, max_size=MAX_CLONES_SIZE, keep=()):
+    """Removes the least recently used clones until all of them together take
+    at most `max_size` bytes. Clones in `keep` are never removed. Returns the
+    paths of the removed clones.
+    """
+    if directory is None:
+        directory = clones_dir()
+    if not Path(directory).is_dir():
+        return []
+    clones = sorted(Path(directory).iterdir(), key=lambda p: p.stat().st_mtime)
+    sizes = {clone: dir_size(clone) for clone in clones}
+    total_size = sum(sizes.values())
+    keep = {Path(p) for p in keep}
+    removed = []
+    for clone in clones:
+        if total_size <= max_size:
+            break
+        if clone in keep:
+            continue
+        shutil.rmtree(clone)
+        total_size -= sizes[clone]
+        removed.append(clone)
+    return removed
+
+
+def clean_clones(directory=None):
+    """Removes all cached clones and returns their paths"""
+    return evict_clones(directory, max_size=-1)
+
+
+def cached_clone(url, directory=None, max_size=MAX_CLONES_SIZE):
+    """Returns the path to an up to date clone of the given URL. The
+    repository is cloned on first use and only fetched afterwards.
+    """
+    path = clone_path(url, directory)
+    if path.is_dir():
+        _git("-C", str(path), "fetch", "--quiet", "--prune", "origin")
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        _git(
+            "clone",
+            "--quiet",
+            "--bare",
+            "--filter=blob:none",
+            url,
+            str(tmp_path),
+        )
+        # Bare clones do not fetch any branches by default
+        refspec = "+refs/heads/*:refs/heads/*"
+        _git("-C", str(tmp_path), "config", "remote.origin.fetch", refspec)
+        # An interrupted clone must not be mistaken for a complete one
+        tmp_path.rename(path)
+    # The modification time marks when a clone was used last
+    os.utime(path)
+    evict_clones(path.parent, max_size=max_size, keep=[path])
+    return str(path)
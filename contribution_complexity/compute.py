@@ -2,29 +2,91 @@
 This program computes the complexity of a Git contribution, i.e. one or more commits.
 
 Usage:
-  contribcompl commits [-v | --verbose] <repository> <commit_sha>...
-  contribcompl issue [-v | --verbose] <repository> <issue_regex>
+  contribcompl commits [-v | --verbose] [options] <repository> <commit_sha>...
+  contribcompl issue [-v | --verbose] [options] <repository> <issue_regex>
+  contribcompl issues [-v | --verbose] [options] <repository> --from-csv=<file>
+  contribcompl batch [-v | --verbose] [options] <repository>
+  contribcompl serve [-v | --verbose] [options]
+  contribcompl fleet [-v | --verbose] [options] <config>
+  contribcompl rescore [-v | --verbose] [--models=<file>] <raw_metrics>
+  contribcompl clean-clones
   contribcompl -h | --help
   contribcompl --version
 
 Options:
   -h --help     Show this screen.
   --version     Show version.
-  --output=<kind>  Kind of output, either csv or verbose.
+  --output=<kind>  Kind of output, either json or csv, which contain the
+                complexity together with the metrics and levels that it is
+                computed from. For the batch command, the file to which
+                results are appended, as CSV if it ends in .csv and as JSON
+                lines otherwise.
+  --from-csv=<file>  CSV file with the columns `id` and `issue_regex`.
+  --input=<file>  Like --from-csv but for the batch command, which requires an
+                input and an output file and skips all ids that are already
+                in the output file.
+  --jobs=<n>    Number of processes mining commits in parallel [default: 1].
+  --backend=<name>  Extract commits with pydriller or directly from git, which
+                is faster and yields the same metrics. Defaults to pydriller,
+                or to git if the paths of the repositories to score are
+                filtered, since only git leaves out excluded files before
+                reading them.
+  --no-cache    Neither read nor write the cache of commit metrics.
+  --clear-cache  Empty the cache of commit metrics before computing.
+  --state=<file>  JSON file in which the issues command records the last
+                scored commit of the current branch and the metrics of all
+                issues. Later runs score only new commits and print only
+                issues whose complexity may have changed.
+  --save-raw=<file>  Store the model independent metrics of all commits in a
+                file, from which the `rescore` command computes complexities.
+  --dedup       Mine commits with the same patch, e.g., cherry-picks of a fix
+                to several branches, only once and reuse their metrics for
+                the duplicates. Prints the number of duplicates to stderr.
+  --skip-duplicates  Like --dedup but count each patch only once per
+                contribution, e.g., towards its number of modified files.
+  --exclude=<patterns>  Comma separated patterns in .gitignore syntax of files
+                to leave out of the metrics, in addition to the ones in
+                ~/.contribcomplignore and the repository's
+                .contribcomplignore, e.g., '*.lock,vendor/'.
+  --include=<patterns>  Comma separated patterns of the only files to measure,
+                e.g., '*.java'.
+  --models=<file>  Python file with the models to use instead of the ones in
+                ~/.contribcomplmodels.py.
+  --port=<n>    Port on which the serve command answers requests, see
+                contribution_complexity/server.py [default: 8765].
+  --profile     Print the wall and CPU time of each stage of the metrics
+                pipeline and counts of commits, modifications, etc. to stderr.
+  --trace=<file>  Like --profile and write each timed stage to a file in the
+                Chrome trace event format, e.g., for ui.perfetto.dev.
 """
+import os
+import re
 import sys
+import csv
+import json
+import uuid
 import tempfile
 import subprocess
 from shutil import which
 from docopt import docopt
-from contribution_complexity import __version__
+from contribution_complexity import profiling
+from contribution_complexity.profiling import stage
+from contribution_complexity.output import OUTPUT_KINDS, write_breakdowns
+from contribution_complexity.cache import MetricsCache, hash_str
+from contribution_complexity.clones import cached_clone, clean_clones
 from pathlib import Path
 from urllib.parse import urlparse
-from contribution_complexity.metrics import (
-    compute_contrib_compl,
-    toggle_verbose_output,
+from itertools import chain
+from contribution_complexity.models import load_models
+from contribution_complexity.complexity_types import ContributionComplexity
+from contribution_complexity.raw_metrics import (
+    read_columns,
+    records_from_columns,
+    write_raw_metrics,
 )
 
+# Modules that import PyDriller or NumPy are imported where they are used, so
+# that `--help`, `--version`, and invalid arguments are answered quickly
 
 TMP = tempfile.gettempdir()
 VERBOSE = False
@@ -43,7 +105,8 @@ def is_git_url(potential_url):
     is_complete_url = all((result.scheme, result.netloc, result.path))
     is_git = result.path.endswith(".git")
     is_git_user = result.path.startswith("git@")
-    if is_complete_url:
+    is_file_url = result.scheme == "file" and result.path
+    if is_complete_url or is_file_url:
         return True
     elif is_git_user and is_git:
         return True
@@ -51,11 +114,43 @@ def is_git_url(potential_url):
         return False
 
 
+# Commands are argument lists, which are neither parsed by a shell nor need
+# quoting, and are shared with `contribution_complexity.async_git`
+def is_git_dir_cmd(path_to_repo):
+    cmd = ["git", "-C", str(path_to_repo), "rev-parse"]
+    return cmd + ["--is-inside-work-tree"]
+
+
+def find_commits_for_issue_cmd(path_to_repo, issue_re):
+    return [
+        "git",
+        "-C",
+        str(path_to_repo),
+        "log",
+        "--extended-regexp",
+        f"--grep={issue_re}",
+        "--pretty=format:%H",
+    ]
+
+
+def find_commits_for_issues_cmd(path_to_repo, revisions="HEAD"):
+    return [
+        "git",
+        "-C",
+        str(path_to_repo),
+        "log",
+        "-z",
+        "--pretty=format:%H%n%B",
+        revisions,
+        "--",
+    ]
+
+
 def is_git_dir(potential_repo_path):
     if not Path(potential_repo_path).is_dir():
         return False
-    cmd = f"git -C {potential_repo_path} rev-parse --is-inside-work-tree"
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    cmd = is_git_dir_cmd(potential_repo_path)
+    result = subprocess.run(cmd, capture_output=True, text=True)
     return result.stdout.strip() == "true"
 
 
@@ -63,19 +158,219 @@ def clone_to_tmp(url):
     path = Path(urlparse(url).path)
     outdir = path.name.removesuffix(path.suffix)
     git_repo_dir = os.path.join(TMP, outdir + str(uuid.uuid4()))
-    cmd = f"git clone {url} {git_repo_dir}"
-    subprocess.run(cmd, shell=True)
+    subprocess.run(["git", "clone", url, git_repo_dir])
 
     return git_repo_dir
 
 
 def find_commits_for_issue(path_to_repo, issue_re):
-
-    cmd = f"git -C {path_to_repo} log --extended-regexp --grep='{issue_re}' --pretty=format:'%H'"
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    cmd = find_commits_for_issue_cmd(path_to_repo, issue_re)
+    with stage("find commits"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
     return result.stdout.splitlines()
 
 
+def find_commits_for_issues(path_to_repo, issue_res, revisions="HEAD"):
+    """Maps each of the given issue regexes to the shas of the commits whose
+    messages match it. In contrast to `find_commits_for_issue`, the commit log
+    is read only once for all issues. Only the commits in the given revision
+    range are searched, e.g., `last..HEAD`.
+    """
+    cmd = find_commits_for_issues_cmd(path_to_repo, revisions)
+    with stage("find commits"):
+        result = subprocess.run(
+            cmd, capture_output=True, encoding="utf-8", errors="replace"
+        )
+        return match_issues(result.stdout, issue_res)
+
+
+def match_issues(log, issue_res):
+    """Maps each of the given issue regexes to the shas of the commits in the
+    given output of `find_commits_for_issues_cmd` whose messages match it
+    """
+    # Issues with the same regex share its pattern and commits
+    patterns = {
+        issue_re: re.compile(issue_re, re.MULTILINE)
+        for issue_re in dict.fromkeys(issue_res)
+    }
+    commits_per_issue = {issue_re: {} for issue_re in patterns}
+    for entry in log.split("\0"):
+        if not entry:
+            # The log of an empty revision range
+            continue
+        commit_sha, _, msg = entry.partition("\n")
+        for issue_re, pattern in patterns.items():
+            if pattern.search(msg):
+                commits_per_issue[issue_re][commit_sha] = None
+    return {
+        issue_re: list(commit_shas)
+        for issue_re, commit_shas in commits_per_issue.items()
+    }
+
+
+def read_issues_csv(path_to_csv):
+    """Reads a CSV file with the columns `id` and `issue_regex` and returns a
+    dictionary mapping each id to its issue regex.
+    """
+    with open(path_to_csv, newline="") as fp:
+        return {row["id"]: row["issue_regex"] for row in csv.DictReader(fp)}
+
+
+def git_head(path_to_repo):
+    """Returns the name of the current branch and the sha of its head"""
+    cmd = ["git", "-C", path_to_repo, "rev-parse", "--abbrev-ref", "HEAD"]
+    branch = subprocess.run(cmd, capture_output=True, text=True).stdout
+    cmd = ["git", "-C", path_to_repo, "rev-parse", "HEAD"]
+    head = subprocess.run(cmd, capture_output=True, text=True).stdout
+    return branch.strip(), head.strip()
+
+
+def is_ancestor(path_to_repo, commit_sha, head):
+    cmd = ["git", "-C", path_to_repo, "merge-base", "--is-ancestor"]
+    result = subprocess.run(cmd + [commit_sha, head], capture_output=True)
+    return result.returncode == 0
+
+
+def models_fingerprint():
+    from contribution_complexity.metrics import get_models
+
+    return hash_str(repr(sorted(get_models().items())))
+
+
+def load_state(path_to_state):
+    """Reads the state of incremental runs, see `update_contrib_compls`. A
+    missing file is an empty state.
+    """
+    if not Path(path_to_state).is_file():
+        return {"branches": {}}
+    with open(path_to_state, encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+def save_state(path_to_state, state):
+    # Replace the file at once, so that an interrupted run keeps the old state
+    tmp_path = f"{path_to_state}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fp:
+        json.dump(state, fp)
+    os.replace(tmp_path, path_to_state)
+
+
+def update_contrib_compls(
+    path_to_repo,
+    issues,
+    state,
+    workers=1,
+    cache=None,
+    backend="pydriller",
+    pathspecs=None,
+):
+    """Computes the complexity of issues, which map ids to issue regexes,
+    incrementally. The given state records the head of the current branch
+    after the last run and the sums of the metrics of each issue's commits,
+    see `CommitMetricsAccumulator`. Only commits after that head are searched
+    and mined and their metrics are merged into the sums. Issues that are new,
+    whose regex changed, or all after a change of the models, of the path
+    filters, see `contribution_complexity.path_filter`, or of history are
+    computed from scratch.
+
+    The state is updated in place. Returns the commit shas and the
+    complexities of the issues that got new commits, see
+    `contrib_compl_breakdown`.
+    """
+    from contribution_complexity.accumulator import CommitMetricsAccumulator
+    from contribution_complexity.metrics import (
+        collect_records,
+        contrib_compl_breakdown,
+        metrics_from_record,
+    )
+
+    branch, head = git_head(path_to_repo)
+    fingerprint = models_fingerprint()
+    branch_state = state["branches"].get(branch)
+    if (
+        branch_state is None
+        or branch_state["models"] != fingerprint
+        or branch_state.get("pathspecs") != pathspecs
+        or not is_ancestor(path_to_repo, branch_state["head"], head)
+    ):
+        branch_state = {"head": None, "models": fingerprint, "issues": {}}
+
+    # Known issues are only searched in new commits, others in all commits
+    old_issues = branch_state["issues"]
+    known = {
+        issue_id: issue_re
+        for issue_id, issue_re in issues.items()
+        if old_issues.get(issue_id, {}).get("issue_regex") == issue_re
+    }
+    unknown = {k: v for k, v in issues.items() if k not in known}
+    new_commits_per_issue = {}
+    if known:
+        revisions = f"{branch_state['head']}..{head}"
+        commits_per_issue = find_commits_for_issues(
+            path_to_repo, known.values(), revisions
+        )
+        for issue_id, issue_re in known.items():
+            commit_shas = old_issues[issue_id]["commit_shas"]
+            new_commits_per_issue[issue_id] = [
+                sha
+                for sha in commits_per_issue[issue_re]
+                if sha not in commit_shas
+            ]
+    if unknown:
+        commits_per_issue = find_commits_for_issues(
+            path_to_repo, unknown.values(), head
+        )
+        for issue_id, issue_re in unknown.items():
+            new_commits_per_issue[issue_id] = commits_per_issue[issue_re]
+
+    records = collect_records(
+        path_to_repo,
+        chain.from_iterable(new_commits_per_issue.values()),
+        workers=workers,
+        cache=cache,
+        backend=backend,
+        pathspecs=pathspecs,
+    )
+    metrics_per_sha = {
+        sha: metrics_from_record(record) for sha, record in records.items()
+    }
+
+    issues_state = {}
+    commit_shas_per_contrib = {}
+    breakdowns = {}
+    for issue_id, issue_re in issues.items():
+        new_commit_shas = list(dict.fromkeys(new_commits_per_issue[issue_id]))
+        if issue_id in known:
+            old_issue = old_issues[issue_id]
+            commit_shas = new_commit_shas + old_issue["commit_shas"]
+            sums = bytes.fromhex(old_issue["sums"])
+            acc = CommitMetricsAccumulator.from_bytes(sums)
+        else:
+            commit_shas = new_commit_shas
+            acc = CommitMetricsAccumulator()
+        for sha in new_commit_shas:
+            if sha in metrics_per_sha:
+                acc.add_commit(metrics_per_sha[sha])
+        issues_state[issue_id] = {
+            "issue_regex": issue_re,
+            "commit_shas": commit_shas,
+            "sums": acc.to_bytes().hex(),
+        }
+        if issue_id in known and not new_commit_shas:
+            continue
+        commit_shas_per_contrib[issue_id] = commit_shas
+        if commit_shas:
+            breakdowns[issue_id] = contrib_compl_breakdown(acc)
+
+    state["branches"][branch] = {
+        "head": head,
+        "models": fingerprint,
+        "pathspecs": pathspecs,
+        "issues": issues_state,
+    }
+    return commit_shas_per_contrib, breakdowns
+
+
 def main(path_to_repo, is_url=False, commit_shas=[]):
     path_to_repo_url = path_to_repo
     if is_url:
@@ -84,34 +379,379 @@ def main(path_to_repo, is_url=False, commit_shas=[]):
     print(compute_metrics(path_to_repo, commit_shas))
 
 
+def write_contrib_compls_csv(commit_shas_per_contrib, contribcompls):
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["id", "commit_shas", "contrib_complexity"])
+    for contrib_id, commit_shas in commit_shas_per_contrib.items():
+        contribcompl = contribcompls.get(contrib_id)
+        if contribcompl:
+            contribcompl = contribcompl.value
+        writer.writerow([contrib_id, " ".join(commit_shas), contribcompl])
+
+
+def write_output(commit_shas_per_contrib, breakdowns, output=None):
+    """Writes the given kind of output, see `contribution_complexity.output`,
+    to stdout, by default a CSV file with only the complexities
+    """
+    if output:
+        write_breakdowns(
+            sys.stdout, commit_shas_per_contrib, breakdowns, output
+        )
+    else:
+        contribcompls = {
+            contrib_id: breakdown["contrib_complexity"]
+            for contrib_id, breakdown in breakdowns.items()
+        }
+        write_contrib_compls_csv(commit_shas_per_contrib, contribcompls)
+
+
+def _split_patterns(patterns):
+    if not patterns:
+        return []
+    return [pattern for pattern in patterns.split(",") if pattern]
+
+
+def report_profile(path_to_trace=None):
+    from contribution_complexity.metrics import COUNTERS
+
+    print(profiling.format_summary(COUNTERS), file=sys.stderr)
+    if path_to_trace:
+        profiling.write_trace(path_to_trace, COUNTERS)
+
+
+def local_path_or_exit(path_or_url):
+    """Returns the path of a local repository as is and clones URLs, or exits
+    if that fails
+    """
+    if not is_git_url(path_or_url):
+        return path_or_url
+    # Clones are cached, so that later runs only fetch new commits
+    try:
+        return cached_clone(path_or_url)
+    except subprocess.CalledProcessError as e:
+        print(f"Cannot clone {path_or_url}: {e.stderr.strip()}")
+        sys.exit(1)
+
+
+def pathspecs_or_exit(path_to_repo, excludes=(), includes=()):
+    """Returns the pathspecs of a local repository, see
+    `contribution_complexity.path_filter.pathspecs_for`, or exits if a pattern
+    is not supported
+    """
+    from contribution_complexity.path_filter import pathspecs_for
+
+    try:
+        return pathspecs_for(path_to_repo, excludes, includes)
+    except ValueError as e:
+        print(f"Cannot filter paths of {path_to_repo}: {e}")
+        sys.exit(1)
+
+
 def run():
     if not git_is_available():
         msg = "contribcompl requires git to be installed and accessible on path"
         print(msg)
         sys.exit(1)
 
-    arguments = docopt(__doc__, version=__version__)
+    arguments = docopt(__doc__)
+
+    if arguments["--version"]:
+        from contribution_complexity import __version__
+
+        print(__version__)
+        return
+
+    if arguments["--profile"] or arguments["--trace"]:
+        profiling.enable(trace=bool(arguments["--trace"]))
+
+    if arguments["clean-clones"]:
+        for path in clean_clones():
+            print(f"Removed {path}")
+        return
+
+    if arguments["--state"] and arguments["--save-raw"]:
+        print("--save-raw cannot be combined with --state")
+        sys.exit(1)
+    dedup = arguments["--dedup"] or arguments["--skip-duplicates"]
+    if dedup and (
+        arguments["--state"] or arguments["fleet"] or arguments["serve"]
+    ):
+        print("--dedup cannot be combined with --state, fleet, or serve")
+        sys.exit(1)
+    excludes = _split_patterns(arguments["--exclude"])
+    includes = _split_patterns(arguments["--include"])
+
+    output = None
+    if arguments["batch"]:
+        if not (arguments["--input"] and arguments["--output"]):
+            print("The batch command requires --input and --output")
+            sys.exit(1)
+    else:
+        output = arguments["--output"]
+    if output and output not in OUTPUT_KINDS:
+        print(f"Unknown output {output}, use one of {', '.join(OUTPUT_KINDS)}")
+        sys.exit(1)
+
+    from contribution_complexity.batch import read_done_ids, score_in_batches
+    from contribution_complexity.metrics import (
+        BACKENDS,
+        COUNTERS,
+        collect_records,
+        contrib_breakdowns_from_records,
+        contrib_compls_from_records,
+        dedup_contribs,
+        get_models,
+        toggle_verbose_output,
+        use_models,
+    )
+    from contribution_complexity.path_filter import (
+        add_excluded_files,
+        parse_patterns,
+    )
 
     if arguments["-v"] == True or arguments["--verbose"] == True:
         toggle_verbose_output()
 
-    path_to_repo = arguments["<repository>"]
-    if not (is_git_url(path_to_repo) or is_git_dir(path_to_repo)):
-        print(__doc__)
+    if arguments["--models"]:
+        use_models(load_models(arguments["--models"]))
+
+    if arguments["rescore"]:
+        try:
+            from contribution_complexity.vectorized import (
+                contrib_compl_levels,
+            )
+        except ImportError:
+            # NumPy is optional, without it contributions are rescored one by
+            # one
+            contrib_compl_levels = None
+
+        commit_shas_per_contrib, commit_cols, mod_cols = read_columns(
+            arguments["<raw_metrics>"]
+        )
+        contribs = {k: v for k, v in commit_shas_per_contrib.items() if v}
+        if contrib_compl_levels is None:
+            records = records_from_columns(commit_cols, mod_cols)
+            contribcompls = contrib_compls_from_records(records, contribs)
+        else:
+            levels = contrib_compl_levels(
+                commit_cols, mod_cols, contribs, get_models()
+            )
+            contribcompls = {
+                contrib_id: ContributionComplexity(int(level))
+                for contrib_id, level in zip(contribs.keys(), levels)
+            }
+        write_contrib_compls_csv(commit_shas_per_contrib, contribcompls)
+        return
+
+    workers = int(arguments["--jobs"])
+    backend = arguments["--backend"] or "pydriller"
+    if backend not in BACKENDS:
+        print(f"Unknown backend {backend}, use one of {', '.join(BACKENDS)}")
         sys.exit(1)
+    cache = None
+    if not arguments["--no-cache"]:
+        cache = MetricsCache()
+        if arguments["--clear-cache"]:
+            cache.clear()
 
-    if is_git_url(path_to_repo):
-        path_to_repo = clone_to_tmp(path_to_repo)
+    if arguments["serve"]:
+        # The server imports this module
+        from contribution_complexity.server import Scorer, serve
+
+        try:
+            parse_patterns("\n".join(excludes + includes))
+        except ValueError as e:
+            print(f"Cannot filter paths: {e}")
+            sys.exit(1)
+        # The path filters of each repository are read on its first request
+        scorer = Scorer(cache, backend, excludes, includes)
+        serve(scorer, port=int(arguments["--port"]))
+        if profiling.ENABLED:
+            report_profile(arguments["--trace"])
+        if cache is not None:
+            cache.close()
+        return
+
+    path_to_repo = arguments["<repository>"]
+    if path_to_repo is not None:
+        if not (is_git_url(path_to_repo) or is_git_dir(path_to_repo)):
+            print(__doc__)
+            sys.exit(1)
+        path_to_repo = local_path_or_exit(path_to_repo)
+
+    pathspecs = None
+    if path_to_repo is not None:
+        pathspecs = pathspecs_or_exit(path_to_repo, excludes, includes)
+    # The git backend leaves out excluded files before they are read
+    if pathspecs and not arguments["--backend"]:
+        backend = "git"
+
+    if arguments["fleet"]:
+        from contribution_complexity.fleet import (
+            WorkerError,
+            format_throughput,
+            read_fleet_config,
+            score_fleet,
+        )
+
+        try:
+            repos = read_fleet_config(arguments["<config>"])
+        except (OSError, ValueError) as e:
+            print(f"Cannot read {arguments['<config>']}: {e}")
+            sys.exit(1)
+        for repo in repos:
+            if not (is_git_url(repo["path"]) or is_git_dir(repo["path"])):
+                print(f"{repo['path']} of {repo['name']} is no repository")
+                sys.exit(1)
+            repo["path"] = local_path_or_exit(repo["path"])
+            repo["pathspecs"] = pathspecs_or_exit(
+                repo["path"], excludes, includes
+            )
+        if not arguments["--backend"] and any(r["pathspecs"] for r in repos):
+            backend = "git"
+        try:
+            results, throughput = score_fleet(
+                repos, workers=workers, cache=cache, backend=backend
+            )
+        except WorkerError as e:
+            if arguments["-v"] or arguments["--verbose"]:
+                print(e.details, file=sys.stderr)
+            print(f"Cannot score fleet: {e}")
+            sys.exit(1)
+        # Issue ids are prefixed with the name of their repository
+        commit_shas_per_contrib = {}
+        breakdowns = {}
+        for name, (repo_commit_shas, repo_breakdowns) in results.items():
+            for issue_id, commit_shas in repo_commit_shas.items():
+                commit_shas_per_contrib[f"{name}/{issue_id}"] = commit_shas
+            for issue_id, breakdown in repo_breakdowns.items():
+                breakdowns[f"{name}/{issue_id}"] = breakdown
+        write_output(commit_shas_per_contrib, breakdowns, output)
+        print(format_throughput(throughput), file=sys.stderr)
+    elif arguments["issues"] and arguments["--state"]:
+        issues = read_issues_csv(arguments["--from-csv"])
+        state = load_state(arguments["--state"])
+        commit_shas_per_contrib, breakdowns = update_contrib_compls(
+            path_to_repo,
+            issues,
+            state,
+            workers=workers,
+            cache=cache,
+            backend=backend,
+            pathspecs=pathspecs,
+        )
+        save_state(arguments["--state"], state)
+        if pathspecs:
+            add_excluded_files(
+                breakdowns, path_to_repo, commit_shas_per_contrib, pathspecs
+            )
+        write_output(commit_shas_per_contrib, breakdowns, output)
+    elif arguments["batch"]:
+        issues = read_issues_csv(arguments["--input"])
+        done_ids = read_done_ids(arguments["--output"])
+        issues = {k: v for k, v in issues.items() if k not in done_ids}
+        commits_per_issue = find_commits_for_issues(
+            path_to_repo, issues.values()
+        )
+        commit_shas_per_contrib = {
+            issue_id: commits_per_issue[issue_re]
+            for issue_id, issue_re in issues.items()
+        }
+        score_in_batches(
+            path_to_repo,
+            commit_shas_per_contrib,
+            arguments["--output"],
+            workers=workers,
+            cache=cache,
+            backend=backend,
+            dedup=dedup,
+            count_duplicates=not arguments["--skip-duplicates"],
+            pathspecs=pathspecs,
+        )
+    else:
+        if arguments["issues"]:
+            issues = read_issues_csv(arguments["--from-csv"])
+            commits_per_issue = find_commits_for_issues(
+                path_to_repo, issues.values()
+            )
+            commit_shas_per_contrib = {
+                issue_id: commits_per_issue[issue_re]
+                for issue_id, issue_re in issues.items()
+            }
+        elif arguments["issue"]:
+            issue_re = arguments["<issue_regex>"]
+            commit_shas = find_commits_for_issue(path_to_repo, issue_re)
+            commit_shas_per_contrib = {issue_re: commit_shas}
+        elif arguments["commits"]:
+            commit_shas = arguments["<commit_sha>"]
+            commit_shas_per_contrib = {"commits": commit_shas}
+
+        # Contributions as scored, i.e., without skipped duplicates
+        scored_contribs = commit_shas_per_contrib
+        duplicate_of = None
+        if dedup:
+            duplicate_of, scored_contribs = dedup_contribs(
+                path_to_repo,
+                commit_shas_per_contrib,
+                count_duplicates=not arguments["--skip-duplicates"],
+                pathspecs=pathspecs,
+            )
+        # Records that are neither cached nor saved only have to hold under
+        # the current models, see `metrics_per_mod`
+        keep_records = cache is not None or arguments["--save-raw"]
+        records = collect_records(
+            path_to_repo,
+            chain.from_iterable(scored_contribs.values()),
+            workers=workers,
+            cache=cache,
+            backend=backend,
+            duplicate_of=duplicate_of,
+            pathspecs=pathspecs,
+            models=None if keep_records else get_models(),
+        )
+        if arguments["--save-raw"]:
+            write_raw_metrics(
+                arguments["--save-raw"], records, scored_contribs
+            )
 
-    if arguments["commits"]:
-        commit_shas = arguments["<commit_sha>"]
-    elif arguments["issue"]:
-        issue_re = arguments["<issue_regex>"]
-        commit_shas = find_commits_for_issue(path_to_repo, issue_re)
-        # print(commit_shas)
+        if arguments["issues"]:
+            contribs = {k: v for k, v in scored_contribs.items() if v}
+            breakdowns = contrib_breakdowns_from_records(records, contribs)
+        else:
+            breakdowns = contrib_breakdowns_from_records(
+                records, scored_contribs
+            )
+        if pathspecs:
+            add_excluded_files(
+                breakdowns, path_to_repo, scored_contribs, pathspecs
+            )
+        if arguments["issues"]:
+            write_output(commit_shas_per_contrib, breakdowns, output)
+        else:
+            if output:
+                write_output(commit_shas_per_contrib, breakdowns, output)
+            else:
+                (breakdown,) = breakdowns.values()
+                print(breakdown["contrib_complexity"])
 
-    contribcompl = compute_contrib_compl(path_to_repo, commit_shas)
-    print(contribcompl)
+    if dedup:
+        no_duplicates = COUNTERS["duplicate_commits"]
+        msg = f"{no_duplicates} commits duplicate the patch of another commit"
+        print(msg, file=sys.stderr)
+    if COUNTERS["excluded_files"]:
+        no_excluded = COUNTERS["excluded_files"]
+        msg = f"Path filters excluded {no_excluded} modified files"
+        print(msg, file=sys.stderr)
+    if arguments["-v"] or arguments["--verbose"]:
+        if cache is not None:
+            msg = f"Metrics cache: {cache.hits} hits, {cache.misses} misses"
+            print(msg, file=sys.stderr)
+        for name, count in COUNTERS.items():
+            print(f"{name}: {count}", file=sys.stderr)
+    if profiling.ENABLED:
+        report_profile(arguments["--trace"])
+    if cache is not None:
+        cache.close()
 
 
 if __name__ == "__main__":
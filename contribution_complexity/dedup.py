@@ -0,0 +1,102 @@
+"""
+Deduplication of commits with the same patch, e.g., a fix that is cherry-picked
+to several release branches or merged forward, by their `git patch-id
+--stable`. Only one commit of each patch is mined and the others reuse its
+record, see `contribution_complexity.metrics.collect_records`. Patch ids
+ignore whitespace and line numbers, so the metrics of duplicates are the ones
+of the first commit with their patch. Merges are never duplicates.
+"""
+
+import threading
+import subprocess
+from contribution_complexity.git_backend import (
+    _diff_tree_input,
+    _git,
+    _parents,
+    _pathspec_args,
+)
+
+
+def patch_ids(path_to_repo, commit_shas, pathspecs=None):
+    """Returns the patch ids of the given commits, which exist and are no
+    merges, keyed by sha. Commits without any change, e.g., of the files that
+    the pathspecs match, have no patch id.
+    """
+    commit_parents = _parents(path_to_repo, list(dict.fromkeys(commit_shas)))
+    if not commit_parents:
+        return {}
+    diff_tree = subprocess.Popen(
+        _git(
+            path_to_repo,
+            "diff-tree",
+            "--stdin",
+            "-p",
+            "-r",
+            "--root",
+            "--no-color",
+            "--no-ext-diff",
+            *_pathspec_args(pathspecs),
+        ),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    patch_id = subprocess.Popen(
+        _git(path_to_repo, "patch-id", "--stable"),
+        stdin=diff_tree.stdout,
+        stdout=subprocess.PIPE,
+    )
+    # Only `git patch-id` reads the diffs
+    diff_tree.stdout.close()
+    stdin = _diff_tree_input(commit_parents, merges=False)
+
+    # Write in a separate thread so that none of the pipes can fill up
+    def writer_target():
+        diff_tree.stdin.write(stdin)
+        diff_tree.stdin.close()
+
+    writer = threading.Thread(target=writer_target)
+    writer.start()
+    stdout, _ = patch_id.communicate()
+    writer.join()
+    diff_tree.wait()
+
+    patch_id_per_sha = {}
+    for line in stdout.decode().splitlines():
+        patch_id_sha, commit_sha = line.split()
+        patch_id_per_sha[commit_sha] = patch_id_sha
+    return patch_id_per_sha
+
+
+def find_duplicates(path_to_repo, commit_shas, pathspecs=None):
+    """Maps each of the given commits whose patch equals the one of an earlier
+    of the given commits to that earlier commit
+    """
+    commit_shas = list(dict.fromkeys(commit_shas))
+    patch_id_per_sha = patch_ids(path_to_repo, commit_shas, pathspecs)
+    first_per_patch_id = {}
+    duplicate_of = {}
+    for commit_sha in commit_shas:
+        patch_id = patch_id_per_sha.get(commit_sha)
+        if patch_id is None:
+            continue
+        first = first_per_patch_id.setdefault(patch_id, commit_sha)
+        if first != commit_sha:
+            duplicate_of[commit_sha] = first
+    return duplicate_of
+
+
+def drop_duplicates(commit_shas_per_contrib, duplicate_of):
+    """Returns the contributions with only the first commit of each patch, see
+    `find_duplicates`, so that duplicates do not count towards their metrics
+    """
+    unique_commit_shas_per_contrib = {}
+    for contrib_id, commit_shas in commit_shas_per_contrib.items():
+        seen = set()
+        unique_commit_shas = []
+        for commit_sha in commit_shas:
+            first = duplicate_of.get(commit_sha, commit_sha)
+            if first not in seen:
+                seen.add(first)
+                unique_commit_shas.append(commit_sha)
+        unique_commit_shas_per_contrib[contrib_id] = unique_commit_shas
+    return unique_commit_shas_per_contrib
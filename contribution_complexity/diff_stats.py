@@ -0,0 +1,77 @@
+"""
+Counting of hunks and of added and removed lines of a diff in place, instead
+of splitting it into lists of lines first. Hunks are counted on the lines that
+`str.splitlines` returns, like contribcompl always did, and added and removed
+lines exactly like PyDriller's `Modification.added` and `.removed` count them,
+i.e., on lines split at `\\n` after removing all `\\r`.
+"""
+
+import re
+
+# Line boundaries of `str.splitlines` besides \n, where \r\n counts as one
+_OTHER_SEPS = "\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_RE_OTHER_SEPS = r"\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_RE_SEPS = rf"\n\r{_RE_OTHER_SEPS}"
+_LINE_START = rf"(?:\A|(?<=[\n{_RE_OTHER_SEPS}])|(?<=\r)(?!\n))"
+_SEP = rf"(?:\r\n|[{_RE_SEPS}])"
+_BODY = rf"[^{_RE_SEPS}]*"
+# A hunk is a maximal run of consecutive lines starting with + or -
+HUNK_RE = re.compile(rf"{_LINE_START}[+-]{_BODY}(?:{_SEP}[+-]{_BODY})*")
+# Lines starting with +++ and --- are not counted, like in PyDriller
+ADDED_RE = re.compile(r"^\r*\+(?!\r*\+\r*\+)", re.MULTILINE)
+REMOVED_RE = re.compile(r"^\r*-(?!\r*-\r*-)", re.MULTILINE)
+# Characters that the look-aheads above may need after the end of a hunk
+_TAIL_RE = re.compile(r"[\r+-]*")
+# With \n as only line boundary, every hunk but one in the first two lines
+# starts right after a line that neither is a +, nor a - line
+_HUNK_START_RE = re.compile(r"\n[^+\-\n][^\n]*\n[+-]|\n\n[+-]")
+
+
+def _count(regex, diff, start=0, end=None):
+    if end is None:
+        end = len(diff)
+    return sum(1 for _ in regex.finditer(diff, start, end))
+
+
+def _count_lines_starting_with(diff, prefix):
+    return diff.count("\n" + prefix) + diff.startswith(prefix)
+
+
+def _count_simple_diff_lines(diff):
+    # Counting substrings is much faster than matching regular expressions
+    no_added = _count_lines_starting_with(diff, "+")
+    no_added -= _count_lines_starting_with(diff, "+++")
+    no_removed = _count_lines_starting_with(diff, "-")
+    no_removed -= _count_lines_starting_with(diff, "---")
+
+    no_hunks = _count(_HUNK_START_RE, diff)
+    first_line_end = diff.find("\n")
+    second_line_start = diff[first_line_end + 1 : first_line_end + 2]
+    if diff[:1] in ("+", "-"):
+        no_hunks += 1
+    elif first_line_end != -1 and second_line_start in ("+", "-"):
+        no_hunks += 1
+    return no_added, no_removed, no_hunks
+
+
+def count_diff_lines(diff):
+    """Returns the number of added lines, removed lines, and hunks of a diff
+    without creating a list of its lines. Diffs with other line boundaries
+    than \n, e.g., with carriage returns, take the slower path of matching
+    regular expressions.
+    """
+    if not any(sep in diff for sep in _OTHER_SEPS):
+        return _count_simple_diff_lines(diff)
+
+    no_added = no_removed = no_hunks = 0
+    scanned = 0
+    for hunk in HUNK_RE.finditer(diff):
+        no_hunks += 1
+        # Added and removed lines are always part of a hunk but may start
+        # with carriage returns before it
+        start = max(diff.rfind("\n", scanned, hunk.start()) + 1, scanned)
+        end = _TAIL_RE.match(diff, hunk.end()).end()
+        no_added += _count(ADDED_RE, diff, start, end)
+        no_removed += _count(REMOVED_RE, diff, start, end)
+        scanned = hunk.end()
+    return no_added, no_removed, no_hunks
@@ -0,0 +1,407 @@
+"""
+Scoring of the issues of many repositories, a fleet, with one shared pool of
+worker processes. The commits of all repositories are split into chunks, which
+are distributed over the workers by repository, so that each worker keeps
+only few repositories open. A worker that runs out of chunks steals the last
+chunk of the worker with the most chunks left, so that a single large
+repository does not leave the other workers idle.
+
+Fleets are configured in TOML files, in which relative paths are relative to
+the file, for example:
+
+    [[repos]]
+    name = "cassandra"
+    path = "/tmp/cassandra"
+    # A CSV file with the columns id and issue_regex
+    issues = "cassandra_issues.csv"
+
+    [[repos]]
+    name = "gaffer"
+    path = "https://github.com/gchq/Gaffer.git"
+    # Or an issue regex in which {id} is replaced by each of the ids
+    issue_regex = "(Gh |gh-){id}( |$)"
+    ids = [1, 2, 3]
+
+Repositories may have a `pathspecs` entry, see
+`contribution_complexity.path_filter.pathspecs_for`, to which the metrics of
+their commits are limited.
+"""
+
+import time
+import asyncio
+import traceback
+import multiprocessing
+from queue import Empty
+from pathlib import Path
+from collections import deque
+from itertools import chain
+from pydriller import GitRepository
+from contribution_complexity import profiling
+from contribution_complexity.async_git import GitRunner
+from contribution_complexity.compute import is_git_url, read_issues_csv
+from contribution_complexity.metrics import (
+    COUNTERS,
+    _records_per_commits,
+    _records_per_commits_in_repo,
+    contrib_breakdowns_from_records,
+    get_models,
+)
+from contribution_complexity.path_filter import add_excluded_files
+
+# Number of commits that a worker mines at once
+CHUNK_SIZE = 50
+# Seconds to wait for a result before checking whether all workers are alive
+POLL_SECONDS = 1
+
+
+class WorkerError(RuntimeError):
+    """Raised when a worker fails to mine a chunk or dies, with the traceback
+    of the failure, if any, as `details`
+    """
+
+    def __init__(self, msg, details=""):
+        super().__init__(msg)
+        self.details = details
+
+
+def _load_toml(path_to_config):
+    try:
+        import tomllib
+    except ImportError:
+        # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            msg = "Reading TOML before Python 3.11 requires tomli, install it"
+            raise ValueError(msg + " with `pip install tomli`") from None
+
+    with open(path_to_config, "rb") as fp:
+        return tomllib.load(fp)
+
+
+def read_fleet_config(path_to_config):
+    """Returns the repositories of a fleet configuration, see the module's
+    documentation, as a list of dictionaries with a name, a path or URL, and
+    the issue regexes keyed by issue id
+    """
+    config = _load_toml(path_to_config)
+    base_dir = Path(path_to_config).parent
+    repos = []
+    for idx, repo in enumerate(config.get("repos", [])):
+        name = repo.get("name", str(idx))
+        if "path" not in repo:
+            raise ValueError(f"Repository {name} has no path")
+        path = repo["path"]
+        if not is_git_url(path):
+            path = str(base_dir / Path(path).expanduser())
+        if "issues" in repo:
+            issues = read_issues_csv(base_dir / repo["issues"])
+        elif "issue_regex" in repo and "ids" in repo:
+            issues = {
+                str(issue_id): repo["issue_regex"].replace(
+                    "{id}", str(issue_id)
+                )
+                for issue_id in repo["ids"]
+            }
+        else:
+            msg = f"Repository {name} needs issues or an issue_regex and ids"
+            raise ValueError(msg)
+        repos.append({"name": name, "path": path, "issues": issues})
+    names = [repo["name"] for repo in repos]
+    if len(set(names)) != len(names):
+        raise ValueError("Repository names have to be unique")
+    return repos
+
+
+class WorkStealingScheduler:
+    """Hands out tasks, which belong to repositories, to workers. Each worker
+    works off its own deque of tasks from the front and steals from the back
+    of the fullest deque when its own is empty.
+    """
+
+    def __init__(self, no_workers):
+        self.deques = [deque() for _ in range(no_workers)]
+        self.steals = 0
+
+    def assign(self, tasks_per_repo):
+        """Distributes the tasks of each repository, largest first, to the
+        worker with the fewest tasks
+        """
+        for tasks in sorted(tasks_per_repo.values(), key=len, reverse=True):
+            own = min(self.deques, key=len)
+            own.extend(tasks)
+
+    def next_task(self, worker_id):
+        """Returns the next task of a worker or `None` if there is no task
+        left at all
+        """
+        own = self.deques[worker_id]
+        if own:
+            return own.popleft()
+        fullest = max(self.deques, key=len)
+        if not fullest:
+            return None
+        self.steals += 1
+        return fullest.pop()
+
+
+def _chunk(commit_shas, chunk_size):
+    commit_shas = sorted(commit_shas)
+    return [
+        commit_shas[i : i + chunk_size]
+        for i in range(0, len(commit_shas), chunk_size)
+    ]
+
+
+def _mine_chunk(
+    repos,
+    path_to_repo,
+    commit_shas,
+    backend,
+    lock=None,
+    pathspecs=None,
+    models=None,
+):
+    if backend == "git":
+        return _records_per_commits(
+            path_to_repo, commit_shas, "git", pathspecs, models
+        )
+    if path_to_repo not in repos:
+        git_repo = GitRepository(path_to_repo)
+        if lock is not None:
+            # See `contribution_complexity.metrics._init_worker`
+            with lock:
+                git_repo.repo
+        repos[path_to_repo] = git_repo
+    return _records_per_commits_in_repo(
+        repos[path_to_repo], commit_shas, models, pathspecs
+    )
+
+
+def _work(worker_id, tasks, results, lock, backend, profile, models):
+    if profile is not None:
+        profiling.enable(**profile)
+    repos = {}
+    while (task := tasks.get()) is not None:
+        name, path_to_repo, commit_shas, pathspecs = task
+        start = time.perf_counter()
+        COUNTERS.clear()
+        profiling.reset()
+        try:
+            records = _mine_chunk(
+                repos,
+                path_to_repo,
+                commit_shas,
+                backend,
+                lock,
+                pathspecs,
+                models,
+            )
+        except Exception:
+            results.put((worker_id, name, None, traceback.format_exc(), 0))
+            continue
+        seconds = time.perf_counter() - start
+        report = (dict(COUNTERS), profiling.snapshot())
+        results.put((worker_id, name, records, report, seconds))
+
+
+def _run_tasks(scheduler, workers, backend, models=None):
+    """Runs the scheduled tasks and yields the name of the repository, the
+    records, the counters and profile of worker processes, see
+    `contribution_complexity.profiling.snapshot`, and the seconds of each
+    task as it finishes. With models, methods are only analyzed where they
+    matter, see `contribution_complexity.metrics.metrics_per_mod`.
+    """
+    if workers == 1:
+        repos = {}
+        while (task := scheduler.next_task(0)) is not None:
+            name, path_to_repo, commit_shas, pathspecs = task
+            start = time.perf_counter()
+            try:
+                records = _mine_chunk(
+                    repos,
+                    path_to_repo,
+                    commit_shas,
+                    backend,
+                    pathspecs=pathspecs,
+                    models=models,
+                )
+            except Exception as e:
+                msg = f"Mining {name} failed: {type(e).__name__}: {e}"
+                raise WorkerError(msg, traceback.format_exc()) from e
+            yield name, records, None, time.perf_counter() - start
+        return
+
+    results = multiprocessing.Queue()
+    lock = multiprocessing.Lock()
+    queues = [multiprocessing.Queue() for _ in range(workers)]
+    procs = [
+        multiprocessing.Process(
+            target=_work,
+            args=(
+                worker_id,
+                queues[worker_id],
+                results,
+                lock,
+                backend,
+                profiling.settings(),
+                models,
+            ),
+            daemon=True,
+        )
+        for worker_id in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    try:
+        running = 0
+        for worker_id, queue in enumerate(queues):
+            task = scheduler.next_task(worker_id)
+            if task is not None:
+                queue.put(task)
+                running += 1
+        while running:
+            try:
+                result = results.get(timeout=POLL_SECONDS)
+            except Empty:
+                # Workers only exit when told to, so any exit is a crash
+                for worker_id, proc in enumerate(procs):
+                    if not proc.is_alive():
+                        msg = f"Worker {worker_id} exited with code"
+                        raise WorkerError(f"{msg} {proc.exitcode}")
+                continue
+            worker_id, name, records, report, seconds = result
+            running -= 1
+            if records is None:
+                last_line = report.strip().splitlines()[-1]
+                raise WorkerError(f"Mining {name} failed: {last_line}", report)
+            task = scheduler.next_task(worker_id)
+            if task is not None:
+                queues[worker_id].put(task)
+                running += 1
+            yield name, records, report, seconds
+    finally:
+        for queue in queues:
+            queue.put(None)
+        for proc in procs:
+            proc.join(timeout=5)
+            if proc.is_alive():
+                proc.terminate()
+
+
+async def _find_commits(repos):
+    runner = GitRunner()
+    return await asyncio.gather(
+        *(
+            runner.find_commits_for_issues(
+                repo["path"], repo["issues"].values()
+            )
+            for repo in repos
+        )
+    )
+
+
+def score_fleet(
+    repos, workers=1, cache=None, backend="pydriller", chunk_size=CHUNK_SIZE
+):
+    """Computes the complexity of the issues of all given repositories, see
+    `read_fleet_config`, whose paths have to be local. Commits are mined by a
+    pool of worker processes, see `WorkStealingScheduler`, and only once per
+    repository. Returns the commit shas per issue and the breakdowns, see
+    `contrib_compl_breakdown`, keyed by repository name and the throughput of
+    each repository, see `format_throughput`. Records of repositories with
+    pathspecs are neither read from nor written to the cache, and their
+    breakdowns contain the number of excluded files, see
+    `contribution_complexity.path_filter.add_excluded_files`. Raises a
+    `WorkerError` if mining fails or a worker dies.
+    """
+    with profiling.stage("find commits"):
+        commits_per_issue_per_repo = asyncio.run(_find_commits(repos))
+    commit_shas_per_repo = {}
+    records_per_repo = {}
+    tasks_per_repo = {}
+    throughput = {}
+    for repo, commits_per_issue in zip(repos, commits_per_issue_per_repo):
+        name = repo["name"]
+        commit_shas_per_repo[name] = {
+            issue_id: commits_per_issue[issue_re]
+            for issue_id, issue_re in repo["issues"].items()
+        }
+        commit_shas = set(
+            chain.from_iterable(commit_shas_per_repo[name].values())
+        )
+        pathspecs = repo.get("pathspecs")
+        records_per_repo[name] = {}
+        if cache is not None and not pathspecs:
+            records_per_repo[name] = cache.get_records(commit_shas)
+        missing_shas = commit_shas - records_per_repo[name].keys()
+        tasks_per_repo[name] = [
+            (name, repo["path"], chunk, pathspecs)
+            for chunk in _chunk(missing_shas, chunk_size)
+        ]
+        throughput[name] = {
+            "contribs": len(repo["issues"]),
+            "commits": len(commit_shas),
+            "mined": 0,
+            "busy_seconds": 0.0,
+            "seconds": 0.0,
+        }
+
+    scheduler = WorkStealingScheduler(workers)
+    scheduler.assign(tasks_per_repo)
+    start = time.perf_counter()
+    pathspecs_per_repo = {
+        repo["name"]: repo.get("pathspecs") for repo in repos
+    }
+    # Uncached records only have to hold under the current models
+    models = get_models() if cache is None else None
+    for name, records, report, seconds in _run_tasks(
+        scheduler, workers, backend, models
+    ):
+        records_per_repo[name].update(records)
+        if cache is not None and not pathspecs_per_repo[name]:
+            cache.put_records(records)
+        if report is not None:
+            counters, profile = report
+            COUNTERS.update(counters)
+            profiling.merge(profile)
+        throughput[name]["mined"] += len(records)
+        throughput[name]["busy_seconds"] += seconds
+        # Until the last chunk of the repository is mined
+        throughput[name]["seconds"] = time.perf_counter() - start
+    COUNTERS["fleet_steals"] += scheduler.steals
+
+    results = {}
+    for repo in repos:
+        name = repo["name"]
+        commit_shas_per_contrib = commit_shas_per_repo[name]
+        contribs = {k: v for k, v in commit_shas_per_contrib.items() if v}
+        breakdowns = contrib_breakdowns_from_records(
+            records_per_repo[name], contribs
+        )
+        if pathspecs_per_repo[name]:
+            add_excluded_files(
+                breakdowns, repo["path"], contribs, pathspecs_per_repo[name]
+            )
+        results[name] = (commit_shas_per_contrib, breakdowns)
+    return results, throughput
+
+
+def format_throughput(throughput):
+    """Formats the throughput of each repository as a table, in which busy is
+    the time that workers spent on mining the repository and seconds the time
+    until its last commit was mined
+    """
+    lines = [
+        f"{'repo':20} {'contribs':>9} {'commits':>8} {'mined':>8} "
+        f"{'busy_s':>8} {'seconds':>8} {'commits/s':>10}"
+    ]
+    for name, stats in throughput.items():
+        seconds = stats["seconds"]
+        rate = stats["mined"] / seconds if seconds else 0.0
+        lines.append(
+            f"{name:20} {stats['contribs']:9} {stats['commits']:8} "
+            f"{stats['mined']:8} {stats['busy_seconds']:8.2f} "
+            f"{seconds:8.2f} {rate:10.1f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,396 @@
+"""
+Extraction of commits and their modifications directly from the output of
+`git diff-tree`, instead of constructing PyDriller and GitPython objects with
+the full source code of each modified file. The objects here provide the
+subset of PyDriller's `Commit` and `Modification` interface that the metrics
+need. PyDriller is only used for the method level analysis, for which sources
+are read on demand.
+"""
+
+import re
+import threading
+import subprocess
+from pathlib import Path
+import lizard_languages
+from pydriller import ModificationType
+from pydriller.domain.commit import Modification
+from contribution_complexity.blobs import blob_reader
+from contribution_complexity.diff_stats import count_diff_lines
+
+SHA_RE = re.compile(rb"[0-9a-f]{40}")
+NULL_SHA = "0" * 40
+DIFF_TREE_OPTS = ["-r", "--root", "--always", "--no-color", "--no-ext-diff"]
+
+
+def _git(path_to_repo, *args):
+    return ["git", "-c", "core.quotepath=false", "-C", str(path_to_repo)] + [
+        *args
+    ]
+
+
+def _pathspec_args(pathspecs):
+    # Limits diffs to the files that match the pathspecs, see
+    # `contribution_complexity.path_filter`
+    return ["--", *pathspecs] if pathspecs else []
+
+
+def _unquote_path(path):
+    # Git quotes paths with special characters C-style, even with
+    # core.quotepath=false
+    if not path.startswith('"'):
+        return path
+    escaped = path[1:-1].encode("utf-8").decode("unicode_escape")
+    return escaped.encode("latin-1").decode("utf-8", "ignore")
+
+
+def _read_blob(path_to_repo, oid):
+    # For example, submodules have no blobs, for which this returns `None`
+    return blob_reader(path_to_repo).read_text(oid)
+
+
+class GitModification:
+    """A modified file of a commit, built from the raw and patch output of
+    `git diff-tree`. The patch contains no context lines, which does not
+    change any of the metrics. Sources are only read from the repository when
+    they are accessed.
+    """
+
+    def __init__(self, path_to_repo, old_path, new_path, change_type, diff):
+        self.path_to_repo = path_to_repo
+        self.old_path = old_path
+        self.new_path = new_path
+        self.change_type = change_type
+        self.diff = diff
+        self.old_oid = None
+        self.new_oid = None
+        self._source_code = self._source_code_before = None
+
+    @property
+    def added(self):
+        return count_diff_lines(self.diff)[0]
+
+    @property
+    def removed(self):
+        return count_diff_lines(self.diff)[1]
+
+    @property
+    def filename(self):
+        if self.new_path is not None:
+            return Path(self.new_path).name
+        return Path(self.old_path).name
+
+    @property
+    def language_supported(self):
+        return lizard_languages.get_reader_for(self.filename) is not None
+
+    @property
+    def source_code(self):
+        if self._source_code is None and self.new_oid is not None:
+            self._source_code = _read_blob(self.path_to_repo, self.new_oid)
+        return self._source_code
+
+    @property
+    def source_code_before(self):
+        if self._source_code_before is None and self.old_oid is not None:
+            self._source_code_before = _read_blob(
+                self.path_to_repo, self.old_oid
+            )
+        return self._source_code_before
+
+    @property
+    def changed_methods(self):
+        driller_mod = Modification(
+            self.old_path,
+            self.new_path,
+            self.change_type,
+            {
+                "diff": self.diff,
+                "source_code": self.source_code,
+                "source_code_before": self.source_code_before,
+            },
+        )
+        return driller_mod.changed_methods
+
+
+class GitCommit:
+    """A commit with the statistics and modifications that the metrics
+    need. Like in PyDriller, merge commits have no modifications and their
+    statistics are computed against their first parent.
+    """
+
+    def __init__(self, commit_sha, files, lines, modifications):
+        self.hash = commit_sha
+        self.files = files
+        self.lines = lines
+        self.modifications = modifications
+
+
+def _to_modification_type(status, old_oid, new_oid):
+    if status == "A":
+        return ModificationType.ADD
+    if status == "D":
+        return ModificationType.DELETE
+    if status == "R":
+        return ModificationType.RENAME
+    if old_oid != new_oid:
+        return ModificationType.MODIFY
+    return ModificationType.UNKNOWN
+
+
+def _parse_raw_line(line):
+    # For example ":100644 100644 <old oid> <new oid> R100\told\tnew"
+    info, *paths = line.decode("utf-8", "ignore").split("\t")
+    _, _, old_oid, new_oid, status = info[1:].split(" ")
+    status = status[0]
+    paths = [_unquote_path(p) for p in paths]
+    old_path, new_path = paths[0], paths[-1]
+    if status == "A":
+        old_path = None
+    elif status == "D":
+        new_path = None
+    return _to_modification_type(status, old_oid, new_oid), old_path, new_path
+
+
+def _diff_tree_input(commit_parents, merges=True):
+    lines = []
+    for commit_sha, parents in commit_parents.items():
+        if not parents:
+            lines.append(commit_sha)
+        elif len(parents) == 1 or merges:
+            # Compare merges only against their first parent
+            lines.append(f"{commit_sha} {parents[0]}")
+    return "".join(line + "\n" for line in lines).encode()
+
+
+def _parents(path_to_repo, commit_shas):
+    """Maps each of the given commit shas that exists in the repository to its
+    parents' shas. Like PyDriller, only full shas are considered.
+    """
+    cmd = _git(
+        path_to_repo, "cat-file", "--batch-check=%(objectname) %(objecttype)"
+    )
+    stdin = "".join(f"{sha}\n" for sha in commit_shas)
+    result = subprocess.run(cmd, input=stdin, capture_output=True, text=True)
+    existing = []
+    for requested, line in zip(commit_shas, result.stdout.splitlines()):
+        objectname, _, objecttype = line.partition(" ")
+        if objecttype == "commit" and objectname == requested:
+            existing.append(requested)
+    if not existing:
+        return {}
+
+    cmd = _git(
+        path_to_repo, "log", "--no-walk=unsorted", "--stdin", "--format=%H %P"
+    )
+    stdin = "".join(f"{sha}\n" for sha in existing)
+    result = subprocess.run(cmd, input=stdin, capture_output=True, text=True)
+    commit_parents = {}
+    for line in result.stdout.splitlines():
+        commit_sha, *parents = line.split()
+        commit_parents[commit_sha] = parents
+    return commit_parents
+
+
+def _stats(path_to_repo, commit_parents, pathspecs=None):
+    """Number of modified files and lines per commit like `git diff --numstat
+    --no-renames` reports them, which is what PyDriller's `files` and `lines`
+    are based on
+    """
+    cmd = _git(
+        path_to_repo, "diff-tree", "--stdin", "--numstat", "--no-renames"
+    )
+    stdin = _diff_tree_input(commit_parents)
+    result = subprocess.run(
+        cmd + DIFF_TREE_OPTS + _pathspec_args(pathspecs),
+        input=stdin,
+        capture_output=True,
+    )
+    stats = {}
+    for line in result.stdout.split(b"\n"):
+        if SHA_RE.fullmatch(line):
+            commit_stats = stats[line.decode()] = [0, 0]
+        elif line:
+            insertions, deletions, _ = line.split(b"\t", 2)
+            commit_stats[0] += 1
+            if insertions != b"-":
+                commit_stats[1] += int(insertions) + int(deletions)
+    return stats
+
+
+def selected_paths(path_to_repo, commit_parents, pathspecs=None):
+    """Maps each of the given commits to the paths of its modified files that
+    match the pathspecs, see `contribution_complexity.path_filter`. Renames
+    are listed as the deletion of the old and the addition of the new path,
+    like in `_stats`. Only trees are compared, so that no blob is read.
+    """
+    cmd = _git(
+        path_to_repo, "diff-tree", "--stdin", "--name-only", "--no-renames"
+    )
+    stdin = _diff_tree_input(commit_parents)
+    result = subprocess.run(
+        cmd + DIFF_TREE_OPTS + _pathspec_args(pathspecs),
+        input=stdin,
+        capture_output=True,
+    )
+    paths = {}
+    for line in result.stdout.split(b"\n"):
+        if SHA_RE.fullmatch(line):
+            commit_paths = paths[line.decode()] = set()
+        elif line:
+            commit_paths.add(_unquote_path(line.decode("utf-8", "ignore")))
+    return paths
+
+
+def _iter_modifications(path_to_repo, commit_parents, pathspecs=None):
+    """Streams the modifications of the given commits from a single `git
+    diff-tree` process and yields them grouped per commit
+    """
+    cmd = _git(
+        path_to_repo,
+        "diff-tree",
+        "--stdin",
+        "-M",
+        "--raw",
+        "-p",
+        "--unified=0",
+        "--full-index",
+        "--abbrev=40",
+    )
+    proc = subprocess.Popen(
+        cmd + DIFF_TREE_OPTS + _pathspec_args(pathspecs),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    # Write in a separate thread so that neither of the pipes can fill up
+    stdin = _diff_tree_input(commit_parents, merges=False)
+
+    def writer_target():
+        proc.stdin.write(stdin)
+        proc.stdin.close()
+
+    writer = threading.Thread(target=writer_target)
+    writer.start()
+
+    commit_sha = None
+    mods = patches = None
+
+    def finish_commit():
+        for mod, patch in zip(mods, patches):
+            mod.diff = patch["diff"].decode("utf-8", "ignore")
+            mod.old_oid, mod.new_oid = patch["oids"]
+            if not patch["has_paths"]:
+                # Like GitPython, take both paths from the `diff --git` line
+                # when the patch has no `---` and `+++` lines, e.g., for
+                # binary and empty files
+                mod.old_path = mod.old_path or mod.new_path
+                mod.new_path = mod.new_path or mod.old_path
+        return commit_sha, mods
+
+    for line in proc.stdout:
+        line = line.rstrip(b"\n")
+        if SHA_RE.fullmatch(line):
+            if commit_sha is not None:
+                yield finish_commit()
+            commit_sha = line.decode()
+            mods, patches = [], []
+        elif line.startswith(b":") and not patches:
+            change_type, old_path, new_path = _parse_raw_line(line)
+            mods.append(
+                GitModification(
+                    path_to_repo, old_path, new_path, change_type, ""
+                )
+            )
+        elif line.startswith(b"diff --git "):
+            patch = {
+                "in_header": True,
+                "has_paths": False,
+                # The lines of the patch are appended to one buffer instead
+                # of being kept as separate objects
+                "diff": bytearray(),
+                "oids": (None, None),
+            }
+            patches.append(patch)
+        elif patches and patches[-1]["in_header"]:
+            patch = patches[-1]
+            if line.startswith(b"@@"):
+                patch["in_header"] = False
+                patch["diff"] += line
+                patch["diff"] += b"\n"
+            elif line.startswith(b"--- "):
+                patch["has_paths"] = True
+            elif line.startswith(b"index "):
+                # Like GitPython, blobs are only known if the patch has them
+                oids = line.split(b" ")[1].decode().split("..")
+                patch["oids"] = tuple(
+                    None if oid == NULL_SHA else oid for oid in oids
+                )
+        elif patches:
+            patches[-1]["diff"] += line
+            patches[-1]["diff"] += b"\n"
+    if commit_sha is not None:
+        yield finish_commit()
+    writer.join()
+    proc.wait()
+
+
+def iter_commits(path_to_repo, commit_shas, pathspecs=None):
+    """Yields a `GitCommit` for each of the given commits that exists in the
+    repository. With pathspecs, only the matching files are diffed and
+    counted.
+    """
+    commit_parents = _parents(path_to_repo, list(dict.fromkeys(commit_shas)))
+    stats = _stats(path_to_repo, commit_parents, pathspecs)
+    # `git diff-tree` reports the commits in the order of its input but skips
+    # merges. Commits are yielded as soon as their modifications are read, so
+    # that only those of one commit at a time are kept in memory.
+    remaining_shas = iter(commit_parents.keys())
+    mods_per_commit = _iter_modifications(
+        path_to_repo, commit_parents, pathspecs
+    )
+    for mods_sha, mods in mods_per_commit:
+        for commit_sha in remaining_shas:
+            files, lines = stats[commit_sha]
+            if commit_sha == mods_sha:
+                yield GitCommit(commit_sha, files, lines, mods)
+                break
+            yield GitCommit(commit_sha, files, lines, [])
+        del mods
+    for commit_sha in remaining_shas:
+        files, lines = stats[commit_sha]
+        yield GitCommit(commit_sha, files, lines, [])
+
+
+def filter_commits(path_to_repo, commits, commit_shas, pathspecs):
+    """Yields a `GitCommit` for each of the given commits, e.g., PyDriller's,
+    with only the modifications and statistics of the files that match the
+    pathspecs. In contrast to `iter_commits`, the excluded files have been
+    diffed and read already.
+
+    Like in `iter_commits`, the pathspecs apply before renames are detected,
+    so a file renamed out of or into the excluded files is a deletion or an
+    addition. The modifications of commits with such renames are therefore
+    taken from `iter_commits`.
+    """
+    commit_parents = _parents(path_to_repo, list(dict.fromkeys(commit_shas)))
+    stats = _stats(path_to_repo, commit_parents, pathspecs)
+    paths = selected_paths(path_to_repo, commit_parents, pathspecs)
+    for commit in commits:
+        commit_paths = paths.get(commit.hash, set())
+        mods = []
+        for mod in commit.modifications:
+            selected = [
+                path in commit_paths for path in (mod.old_path, mod.new_path)
+            ]
+            if mod.change_type == ModificationType.RENAME and not all(
+                selected
+            ):
+                if any(selected):
+                    (git_commit,) = iter_commits(
+                        path_to_repo, [commit.hash], pathspecs
+                    )
+                    mods = git_commit.modifications
+                    break
+            elif any(selected):
+                mods.append(mod)
+        files, lines = stats.get(commit.hash, (0, 0))
+        yield GitCommit(commit.hash, files, lines, mods)
@@ -1,9 +1,22 @@
+import re
+import sys
 import math
+import heapq
 import subprocess
 from pathlib import Path
 from statistics import mean
-from collections import Counter
-from pydriller import RepositoryMining, ModificationType
+from itertools import chain
+from multiprocessing import Lock
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, defaultdict
+from gitdb.exc import BadName
+from pydriller import GitRepository, ModificationType
+from contribution_complexity import git_backend, profiling
+from contribution_complexity.dedup import drop_duplicates, find_duplicates
+from contribution_complexity.profiling import stage
+from contribution_complexity.accumulator import CommitMetricsAccumulator
+from contribution_complexity.diff_stats import count_diff_lines
+from contribution_complexity.models import MODEL_NAMES, load_models
 from contribution_complexity.complexity_types import (
     ModificationComplexity,
     CommitComplexity,
@@ -11,6 +24,13 @@ from contribution_complexity.complexity_types import (
 )
 
 VERBOSE = False
+# Ways of extracting commits and their modifications from a repository, see
+# `contribution_complexity.git_backend`
+BACKENDS = ("pydriller", "git")
+# Counts of events in the metrics pipeline, e.g., how many lizard parses were
+# avoided. Worker processes report their counts back to the parent process.
+COUNTERS = Counter()
+FULL_SHA_RE = re.compile(r"[0-9a-f]{40}")
 
 
 def toggle_verbose_output():
@@ -18,69 +38,146 @@ def toggle_verbose_output():
     VERBOSE = not VERBOSE
 
 
-# Load custom models from configuration file in HOME unless it does not exist,
-# is erroneous, etc,
-try:
-    _home = Path.home() / ".contribcomplmodels.py"
-    exec(_home.read_text())
-    model_names = [
-        "LINE_MODEL",
-        "HUNK_MODEL",
-        "METHOD_MODEL",
-        "FILE_MODEL",
-        "MODIFICATION_KIND_MODEL",
-        "MOD_COMPL_WEIGHTS",
-        "MODIFICATION_MODEL",
-    ]
-    for model in model_names:
-        if model not in globals().keys():
-            raise Exception()
-    use_default_model = False
-except SyntaxError:
-    print(f"Syntax error in {_home} using default models...")
-    use_default_model = True
-except FileNotFoundError:
-    print(f"No config file in {_home} using default models...")
-    use_default_model = True
-except Exception:
-    print(f"Not all models seem to be configured in {_home}")
-    use_default_model = True
-if use_default_model:
-    from contribution_complexity.default_models import (
-        LINE_MODEL,
-        HUNK_MODEL,
-        METHOD_MODEL,
-        FILE_MODEL,
-        MODIFICATION_KIND_MODEL,
-        MOD_COMPL_WEIGHTS,
-        MODIFICATION_MODEL,
-    )
+# The models used for discretization, loaded on first use, see `get_models`
+_models = None
+
+
+def load_configured_models():
+    """Returns the models configured in ~/.contribcomplmodels.py or the
+    default models if that file does not exist or is erroneous
+    """
+    path_to_models = Path.home() / ".contribcomplmodels.py"
+    try:
+        return load_models(path_to_models)
+    except FileNotFoundError:
+        pass
+    except SyntaxError:
+        msg = f"Syntax error in {path_to_models} using default models..."
+        print(msg, file=sys.stderr)
+    except Exception:
+        msg = f"Not all models seem to be configured in {path_to_models}"
+        print(msg, file=sys.stderr)
+    from contribution_complexity import default_models
+
+    return {name: getattr(default_models, name) for name in MODEL_NAMES}
+
+
+def _current_models():
+    global _models
+    if _models is None:
+        _models = load_configured_models()
+    return _models
+
+
+def get_models():
+    """Returns the models currently used for discretization keyed by model
+    name. The configured models are loaded on the first call.
+    """
+    return dict(_current_models())
+
+
+def use_models(models):
+    """Replaces the models used for discretization by the given ones, which
+    are keyed by model name, see `contribution_complexity.models.load_models`
+    """
+    global _models
+    if not set(MODEL_NAMES) <= models.keys():
+        models = {**get_models(), **models}
+    _models = dict(models)
 
 
 # ======================
 
 
 def _compute_hunks(mod):
-    is_hunk = False
-    no_hunks = 0
-
-    for line in mod.diff.splitlines():
-        if line.startswith("+") or line.startswith("-"):
-            if not is_hunk:
-                is_hunk = True
-                no_hunks += 1
-        else:
-            is_hunk = False
+    _, _, no_hunks = count_diff_lines(mod.diff)
     return no_hunks
 
 
-def metrics_per_mod(mod):
-    no_lines_added = mod.added
-    no_lines_removed = mod.removed
-    no_hunks = _compute_hunks(mod)
-    # We convert the changed method list into a set since old and new version
-    # would otherwise be counted twice
-    no_methods_changed = len(set([i.long_name for i in mod.changed_methods]))
+def _no_lizard_parses(mod):
+    # Lizard parses the source code before and after a modification to find
+    # its changed methods, in case the language is supported. Which sources
+    # exist follows from the kind of the modification, so that none has to be
+    # read, e.g., by the git backend, just to count the parses.
+    if not mod.language_supported:
+        return 0
+    has_source = mod.change_type != ModificationType.DELETE
+    has_source_before = mod.change_type != ModificationType.ADD
+    return has_source + has_source_before
+
+
+def _method_level_matters(no_lines_added, no_lines_removed, no_hunks, models):
+    # Whether the level of changed methods can change the rounded mean of all
+    # levels, see `aggregate_mod_compl_vals`. For example, with five levels the
+    # levels 2, 2, and 1 yield 2 for any method level.
+    line_model = models["LINE_MODEL"]
+    compls = {
+        "lines_add_compl": to_mod_compl(no_lines_added, line_model),
+        "lines_del_compl": to_mod_compl(no_lines_removed, line_model),
+        "hunk_compl": to_mod_compl(no_hunks, models["HUNK_MODEL"]),
+    }
+    method_compls = [
+        ModificationComplexity(idx + 1)
+        for idx in range(len(models["METHOD_MODEL"]))
+    ]
+    mod_compls = {
+        aggregate_mod_compl_vals({**compls, "method_compl": method_compl})
+        for method_compl in method_compls
+    }
+    return len(mod_compls) > 1
+
+
+def metrics_per_mod(mod, models=None):
+    """Returns the model independent metrics of a modification. With models,
+    methods are not analyzed where their level cannot change the modification's
+    complexity under these models, see `_method_level_matters`, so that the
+    metrics are only valid for them.
+    """
+    # Same counts as `mod.added` and `mod.removed` but without splitting the
+    # diff into lines
+    diff = mod.diff
+    COUNTERS["modifications"] += 1
+    # Bytes of the diff as git outputs it, which only need to be encoded
+    # again if there are other than ASCII characters
+    if diff.isascii():
+        COUNTERS["diff_bytes"] += len(diff)
+    else:
+        COUNTERS["diff_bytes"] += len(diff.encode("utf-8", "replace"))
+    with stage("count diff lines"):
+        no_lines_added, no_lines_removed, no_hunks = count_diff_lines(diff)
+    if (mod.change_type == ModificationType.DELETE) or (
+        mod.change_type == ModificationType.COPY
+    ):
+        # Methods of deleted and copied files do not matter since these
+        # modifications are always of low complexity, see
+        # `overwrite_previous_assessment`
+        COUNTERS["lizard_parses_avoided"] += _no_lizard_parses(mod)
+        no_methods_changed = None
+    elif no_hunks == 0:
+        # Without any added or removed line, no method can have changed
+        COUNTERS["lizard_parses_avoided"] += _no_lizard_parses(mod)
+        no_methods_changed = 0
+    elif not mod.language_supported:
+        no_methods_changed = 0
+    elif models is not None and not _method_level_matters(
+        no_lines_added, no_lines_removed, no_hunks, models
+    ):
+        COUNTERS["lizard_parses_avoided"] += _no_lizard_parses(mod)
+        no_methods_changed = None
+    else:
+        # We convert the changed method list into a set since old and new
+        # version would otherwise be counted twice
+        with stage("read sources"):
+            # Sources of the git backend are read when they are first accessed
+            # and PyDriller's already with its modifications
+            source_code = mod.source_code
+            source_code_before = mod.source_code_before
+        COUNTERS["lizard_parses"] += bool(source_code) + bool(
+            source_code_before
+        )
+        with stage("lizard"):
+            changed_methods = mod.changed_methods
+        no_methods_changed = len(set([i.long_name for i in changed_methods]))
 
     return {
         "no_lines_added": no_lines_added,
@@ -100,10 +197,20 @@ def discretize_mod_metrics(metrics):
     """Maps metric absolute metrics values to a discrete value of type
     ModificationComplexity
     """
-    lines_add_compl = to_mod_compl(metrics["no_lines_added"], LINE_MODEL)
-    lines_del_compl = to_mod_compl(metrics["no_lines_removed"], LINE_MODEL)
-    hunk_compl = to_mod_compl(metrics["no_hunks"], HUNK_MODEL)
-    method_compl = to_mod_compl(metrics["no_methods_changed"], METHOD_MODEL)
+    models = _current_models()
+    line_model = models["LINE_MODEL"]
+    lines_add_compl = to_mod_compl(metrics["no_lines_added"], line_model)
+    lines_del_compl = to_mod_compl(metrics["no_lines_removed"], line_model)
+    hunk_compl = to_mod_compl(metrics["no_hunks"], models["HUNK_MODEL"])
+    if metrics["no_methods_changed"] is None:
+        # Methods are not analyzed for deletions and copies, which are of low
+        # complexity anyway, see `overwrite_previous_assessment`, nor where
+        # their level does not matter, see `metrics_per_mod`
+        method_compl = ModificationComplexity.LOW
+    else:
+        method_compl = to_mod_compl(
+            metrics["no_methods_changed"], models["METHOD_MODEL"]
+        )
 
     return {
         "lines_add_compl": lines_add_compl,
@@ -119,12 +226,12 @@ def aggregate_mod_compl_vals(complexities):
     return ModificationComplexity(compl_val)
 
 
-def overwrite_previous_assessment(mods, compl_per_mods):
+def overwrite_previous_assessment(mod_kinds, compl_per_mods):
     compl_per_mods_new = []
-    for mod, compl_per_mod in zip(mods, compl_per_mods):
+    for mod_kind, compl_per_mod in zip(mod_kinds, compl_per_mods):
 
-        if (mod.change_type == ModificationType.DELETE) or (
-            mod.change_type == ModificationType.COPY
+        if (mod_kind == ModificationType.DELETE) or (
+            mod_kind == ModificationType.COPY
         ):
             compl_per_mods_new.append(ModificationComplexity.LOW)
         else:
@@ -132,97 +239,101 @@ def overwrite_previous_assessment(mods, compl_per_mods):
     return compl_per_mods_new
 
 
-#  ---- Commit Stuff ----
-import hashlib
+def record_per_mod(mod, models=None):
+    """Returns the metrics of a modification together with its kind and paths.
+    Such a record does not depend on the models, so that it can be cached and
+    discretized again later, unless models are given, see `metrics_per_mod`.
+    """
+    return {
+        "change_type": mod.change_type.name,
+        "old_path": mod.old_path,
+        "new_path": mod.new_path,
+        **metrics_per_mod(mod, models),
+    }
+
 
+def map_mod_records_to_compls(mod_records):
+    dis_mod_metrics = [discretize_mod_metrics(m) for m in mod_records]
+    compl_per_mods = [aggregate_mod_compl_vals(m) for m in dis_mod_metrics]
+    # We want to map delete and copy modifications always to complexity low
+    mod_kinds = [ModificationType[m["change_type"]] for m in mod_records]
+    compl_per_mods = overwrite_previous_assessment(mod_kinds, compl_per_mods)
 
-def hash_str(*args):
-    string = "".join(args)
-    return hashlib.sha256(string.encode("utf-8")).hexdigest()
+    return compl_per_mods
 
 
-def persist(driller_commit, driller_mod, data):
-    mod_key = hash_str(
-        driller_commit.hash,
-        driller_mod.change_type.name,
-        driller_mod.new_path,
-        driller_mod.source_code,
-    )
-    out_dict = {mod_key: data}
-    print(out_dict)
+#  ---- Commit Stuff ----
 
 
 def map_mods_to_compls(driller_commit):
-    driller_mods = driller_commit.modifications
-    mod_metrics = [metrics_per_mod(m) for m in driller_mods]
-    dis_mod_metrics = [discretize_mod_metrics(m) for m in mod_metrics]
-    compl_per_mods = [aggregate_mod_compl_vals(m) for m in dis_mod_metrics]
-    # We want to map delete and copy modifications always to complexity low
-    compl_per_mods = overwrite_previous_assessment(driller_mods, compl_per_mods)
-    # for m, met, dmet, compl in zip(
-    #     driller_mods, mod_metrics, dis_mod_metrics, compl_per_mods
-    # ):
-    #     persist(
-    #         driller_commit,
-    #         m,
-    #         {
-    #             "mod_metrics": met,
-    #             "dis_mod_metrics": dmet,
-    #             "compl_per_mods": compl,
-    #         },
-    #     )
+    mod_records = [record_per_mod(m) for m in driller_commit.modifications]
+    return map_mod_records_to_compls(mod_records)
 
-    return compl_per_mods
+
+def record_per_commit(commit, models=None):
+    """Returns the model independent metrics of a commit and of all of its
+    modifications, see `record_per_mod`, which skip methods that do not matter
+    under the given models.
+    """
+    COUNTERS["commits"] += 1
+    with stage("retrieve stats"):
+        no_modified_files = commit.files
+        no_lines = commit.lines
+    with stage("retrieve modifications"):
+        modifications = commit.modifications
+    with stage("measure modifications"):
+        mod_records = [record_per_mod(m, models) for m in modifications]
+    return {
+        "no_modified_files": no_modified_files,
+        "no_lines": no_lines,
+        "modifications": mod_records,
+    }
 
 
-def metrics_per_commit(commit):
-    no_modified_files = commit.files
-    no_lines = commit.lines
-    # no_added_per_commit = commit.insertions
-    # no_removed_per_commit = commit.deletions
-    mod_kinds = [m.change_type for m in commit.modifications]
-    mod_compls = map_mods_to_compls(commit)
+def metrics_from_record(record):
+    mod_records = record["modifications"]
+    no_modified_files = record["no_modified_files"]
+    no_lines = record["no_lines"]
+    mod_kinds = [ModificationType[m["change_type"]] for m in mod_records]
+    mod_compls = map_mod_records_to_compls(mod_records)
 
     return {
         "no_modified_files": no_modified_files,
         "no_lines": no_lines,
-        # "no_added_per_commit": no_added_per_commit,
-        # "no_removed_per_commit": no_removed_per_commit,
         "mod_kinds": mod_kinds,
         "mod_compls": mod_compls,
     }
 
 
+def metrics_per_commit(commit):
+    # The record is discarded, so it only needs to be valid for the current
+    # models
+    return metrics_from_record(record_per_commit(commit, _current_models()))
+
+
 def compute_commit_metrics(driller_commits):
-    no_mod_files = no_lines = no_added = no_removed = 0
-    mod_kinds = []
-    mod_compls = []
-    for commit in driller_commits:
-        com_metrics = metrics_per_commit(commit)
-
-        no_mod_files += com_metrics["no_modified_files"]
-        no_lines += com_metrics["no_lines"]
-        # no_added += com_metrics["no_added_per_commit"]
-        # no_removed += com_metrics["no_removed_per_commit"]
-        mod_kinds += com_metrics["mod_kinds"]
-        mod_compls += com_metrics["mod_compls"]
-
-    if no_mod_files == 0:
-        # That should never happen... But it might in case the commits are not
-        # reachable, e.g., checked out an earlier version.
-        changed_l_per_f = 0
-    else:
-        changed_l_per_f = no_lines / no_mod_files
-    mod_kind_freqs = dict(Counter(mod_kinds))
-    no_mod_types = len(mod_kind_freqs.keys())
-    mods_compl_freqs = dict(Counter(mod_compls))
+    return aggregate_commit_metrics(
+        metrics_per_commit(commit) for commit in driller_commits
+    )
 
-    return {
-        "no_modified_files": no_mod_files,
-        "changed_l_per_f": changed_l_per_f,
-        "no_mod_types": no_mod_types,
-        "mods_compl_freqs": mods_compl_freqs,
-    }
+
+def sum_commit_metrics(commits_metrics):
+    """Sums up the metrics of multiple commits, as returned by
+    `metrics_per_commit`, in a `CommitMetricsAccumulator`. In contrast to the
+    aggregated metrics, such sums can be merged, so that a contribution's
+    metrics can be updated with new commits without mining its old ones.
+    """
+    acc = CommitMetricsAccumulator()
+    for com_metrics in commits_metrics:
+        acc.add_commit(com_metrics)
+    return acc
+
+
+def aggregate_commit_metrics(commits_metrics):
+    """Aggregates the metrics of multiple commits, as returned by
+    `metrics_per_commit`, to the metrics of a contribution
+    """
+    return sum_commit_metrics(commits_metrics).to_commit_metrics()
 
 
 def to_commit_compl(val, model):
@@ -232,22 +343,30 @@ def to_commit_compl(val, model):
 
 
 def weigh_modifications(mod_freqs):
+    weights = _current_models()["MOD_COMPL_WEIGHTS"]
     wsum = 0
     for name in ModificationComplexity:
         freq = mod_freqs.get(name, 0)
-        w = MOD_COMPL_WEIGHTS[name]
+        w = weights[name]
         wsum += freq * w
     return wsum
 
 
 def discretize_commit_metrics(metrics):
-    mod_files_compl = to_commit_compl(metrics["no_modified_files"], FILE_MODEL)
-    lines_mod_compl = to_commit_compl(metrics["changed_l_per_f"], LINE_MODEL)
+    models = _current_models()
+    mod_files_compl = to_commit_compl(
+        metrics["no_modified_files"], models["FILE_MODEL"]
+    )
+    lines_mod_compl = to_commit_compl(
+        metrics["changed_l_per_f"], models["LINE_MODEL"]
+    )
     mod_kind_compl = to_commit_compl(
-        metrics["no_mod_types"], MODIFICATION_KIND_MODEL
+        metrics["no_mod_types"], models["MODIFICATION_KIND_MODEL"]
     )
     mods_compl_freqs_weighed = weigh_modifications(metrics["mods_compl_freqs"])
-    mod_compl = to_commit_compl(mods_compl_freqs_weighed, MODIFICATION_MODEL)
+    mod_compl = to_commit_compl(
+        mods_compl_freqs_weighed, models["MODIFICATION_MODEL"]
+    )
     return {
         "mod_files_compl": mod_files_compl,
         "lines_mod_compl": lines_mod_compl,
@@ -267,34 +386,428 @@ def aggregate_final_complexity_vals(complexities):
 
 #  ---- Main ----
 
+
+def _topological_order(parents_and_dates):
+    # Kahn's algorithm over the parent relations among the given commits only,
+    # which releases older commits first when commits are unrelated
+    no_parents = {}
+    children = defaultdict(list)
+    for sha, (parents, _) in parents_and_dates.items():
+        parents = [p for p in parents if p in parents_and_dates]
+        no_parents[sha] = len(parents)
+        for parent in parents:
+            children[parent].append(sha)
+    position = {sha: idx for idx, sha in enumerate(parents_and_dates)}
+    ready = [
+        (parents_and_dates[sha][1], position[sha], sha)
+        for sha, count in no_parents.items()
+        if count == 0
+    ]
+    heapq.heapify(ready)
+    ordered = []
+    while ready:
+        _, _, sha = heapq.heappop(ready)
+        ordered.append(sha)
+        for child in children[sha]:
+            no_parents[child] -= 1
+            if no_parents[child] == 0:
+                date = parents_and_dates[child][1]
+                heapq.heappush(ready, (date, position[child], child))
+    return ordered
+
+
+def iter_commits(git_repo, commit_shas):
+    """Yields the PyDriller commits with the given shas from an open
+    `GitRepository`, parents before children and otherwise ordered by commit
+    date. Each commit is looked up by its sha instead of walking the history
+    of the repository, like `RepositoryMining(..., only_commits=commit_shas)`
+    does, so that the cost depends on the number of commits and not on the
+    age of the repository. Unknown and abbreviated shas are skipped like
+    PyDriller does.
+
+    Commits are loaded one at a time, so that a commit, whose diffs PyDriller
+    keeps, can be released before the next one is loaded.
+    """
+    parents_and_dates = {}
+    with stage("load commits"):
+        for commit_sha in dict.fromkeys(commit_shas):
+            if not FULL_SHA_RE.fullmatch(commit_sha):
+                continue
+            try:
+                commit = git_repo.get_commit(commit_sha)
+                # Commits are read lazily
+                parents_and_dates[commit_sha] = (
+                    commit.parents,
+                    commit.committer_date,
+                )
+            except (ValueError, BadName):
+                continue
+        ordered_shas = _topological_order(parents_and_dates)
+    for commit_sha in ordered_shas:
+        yield git_repo.get_commit(commit_sha)
+
+
 # path_to_repo = "/tmp/gaffer"
 # commit_shas = ["ee3e2a78e21fcaf206126179f82918e9161054e5"]
-# data = collect_data(path_to_repo, commit_shas)
-# assert len(data) == 1975
+# commits = list(collect_data(path_to_repo, commit_shas))
+# assert len(commits) == 1
 def collect_data(path_to_repo, commit_shas):
-    rm = RepositoryMining(path_to_repo, only_commits=commit_shas)
-    commits = []
-    modifications = []
-    for commit in rm.traverse_commits():
-        commits.append(commit)
-        for mod in commit.modifications:
-            modifications.append((commit, mod))
+    """Yields the PyDriller commits with the given shas, see `iter_commits`"""
+    yield from iter_commits(GitRepository(path_to_repo), commit_shas)
 
-    return commits, modifications
 
+def contrib_compl_from_commit_metrics(commits_metrics):
+    return contrib_compl_from_sums(sum_commit_metrics(commits_metrics))
 
-def compute_contrib_compl(path_to_repo, commit_shas):
-    driller_commits, data = collect_data(path_to_repo, commit_shas)
-    # _, driller_mods = zip(*data)
 
-    # mod_metrics = [metrics_per_mod(m) for m in driller_mods]
-    # dis_mod_metrics = [discretize_mod_metrics(m) for m in mod_metrics]
-    # compl_per_mods = [aggregate_mod_compl_vals(m) for m in dis_mod_metrics]
-    # # We want to map delete and copy modifications always to complexity low
-    # compl_per_mods = overwrite_previous_assessment(driller_mods, compl_per_mods)
-
-    commit_metrics = compute_commit_metrics(driller_commits)
+def contrib_compl_breakdown(acc):
+    """Returns the complexity of a contribution from the sums of the metrics
+    of its commits, see `sum_commit_metrics`, together with the intermediate
+    values it is computed from, i.e., the aggregated metrics, see
+    `aggregate_commit_metrics`, and their discrete levels, see
+    `discretize_commit_metrics`
+    """
+    commit_metrics = acc.to_commit_metrics()
     dis_commit_metrics = discretize_commit_metrics(commit_metrics)
     contrib_compl = aggregate_final_complexity_vals(dis_commit_metrics)
+    mods_compl_freqs_weighed = weigh_modifications(
+        commit_metrics["mods_compl_freqs"]
+    )
+    return {
+        "contrib_complexity": contrib_compl,
+        **commit_metrics,
+        "mods_compl_freqs_weighed": mods_compl_freqs_weighed,
+        **dis_commit_metrics,
+    }
+
+
+def contrib_compl_from_sums(acc):
+    """Computes the complexity of a contribution from the sums of the metrics
+    of its commits, see `sum_commit_metrics`
+    """
+    commit_metrics = acc.to_commit_metrics()
+    dis_commit_metrics = discretize_commit_metrics(commit_metrics)
+    return aggregate_final_complexity_vals(dis_commit_metrics)
+
+
+def _records_per_commits(
+    path_to_repo, commit_shas, backend="pydriller", pathspecs=None, models=None
+):
+    """Mines the given commits and returns their records, see
+    `record_per_commit`, keyed by sha. The result contains only plain values so
+    that it can be passed between processes and cached, unless it depends on
+    the given models.
+    """
+    with stage("mine commits"):
+        if backend == "git":
+            commits = git_backend.iter_commits(
+                path_to_repo, commit_shas, pathspecs
+            )
+        else:
+            commits = collect_data(path_to_repo, commit_shas)
+            if pathspecs:
+                commits = git_backend.filter_commits(
+                    path_to_repo, commits, commit_shas, pathspecs
+                )
+        return {c.hash: record_per_commit(c, models) for c in commits}
+
+
+def _records_per_commits_in_repo(
+    git_repo, commit_shas, models=None, pathspecs=None
+):
+    # Like `_records_per_commits` with PyDriller but in an open `GitRepository`
+    with stage("mine commits"):
+        commits = iter_commits(git_repo, commit_shas)
+        if pathspecs:
+            commits = git_backend.filter_commits(
+                git_repo.path, commits, commit_shas, pathspecs
+            )
+        return {c.hash: record_per_commit(c, models) for c in commits}
+
+
+# Repository, backend, path filter, and models of a worker process, see
+# `compute_contrib_compls`
+_worker_path = None
+_worker_repo = None
+_worker_backend = None
+_worker_pathspecs = None
+_worker_models = None
+
+
+def _init_worker(
+    path_to_repo,
+    lock,
+    backend="pydriller",
+    profile=None,
+    pathspecs=None,
+    models=None,
+):
+    global _worker_path, _worker_repo, _worker_backend, _worker_pathspecs
+    global _worker_models
+    _worker_path = path_to_repo
+    _worker_backend = backend
+    _worker_pathspecs = pathspecs
+    _worker_models = models
+    if profile is not None:
+        profiling.enable(**profile)
+    if backend == "git":
+        return
+    _worker_repo = GitRepository(path_to_repo)
+    # PyDriller writes to the repository's config when opening it, which fails
+    # when multiple processes do so at the same time
+    with lock:
+        _worker_repo.repo
+
+
+def _records_per_commits_in_worker(commit_shas):
+    COUNTERS.clear()
+    profiling.reset()
+    if _worker_backend == "git":
+        records = _records_per_commits(
+            _worker_path, commit_shas, "git", _worker_pathspecs, _worker_models
+        )
+        return records, COUNTERS, profiling.snapshot()
+    # On the repository handle that the worker keeps open
+    records = _records_per_commits_in_repo(
+        _worker_repo, commit_shas, _worker_models, _worker_pathspecs
+    )
+    return records, COUNTERS, profiling.snapshot()
+
+
+def mine_records(
+    path_to_repo,
+    commit_shas,
+    workers=1,
+    backend="pydriller",
+    pathspecs=None,
+    models=None,
+):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, use one of {BACKENDS}")
+    commit_shas = sorted(set(commit_shas))
+    records = {}
+    if workers > 1 and len(commit_shas) > 1:
+        shards = [commit_shas[i::workers] for i in range(workers)]
+        shards = [shard for shard in shards if shard]
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            initializer=_init_worker,
+            initargs=(
+                path_to_repo,
+                Lock(),
+                backend,
+                profiling.settings(),
+                pathspecs,
+                models,
+            ),
+        ) as executor:
+            results = executor.map(_records_per_commits_in_worker, shards)
+            for shard_records, shard_counters, shard_profile in results:
+                records.update(shard_records)
+                COUNTERS.update(shard_counters)
+                profiling.merge(shard_profile)
+    elif commit_shas:
+        records = _records_per_commits(
+            path_to_repo, commit_shas, backend, pathspecs, models
+        )
+    return records
+
+
+def collect_records(
+    path_to_repo,
+    commit_shas,
+    workers=1,
+    cache=None,
+    backend="pydriller",
+    duplicate_of=None,
+    pathspecs=None,
+    models=None,
+):
+    """Returns the records, see `record_per_commit`, of the given commits
+    keyed by sha. Commits found in the given `MetricsCache` are not mined at
+    all. With more than one worker, the remaining commits are sharded across a
+    pool of processes, each mining its own share of the repository. The
+    backend is either "pydriller" or "git", see
+    `contribution_complexity.git_backend`, which yield the same records.
+
+    Commits that `duplicate_of` maps to another of the given commits, see
+    `contribution_complexity.dedup.find_duplicates`, are not mined either but
+    get the record of that commit.
+
+    Pathspecs, see `contribution_complexity.path_filter`, limit the records to
+    the matching files. Only the git backend leaves out the other files before
+    reading them. Pathspecs bypass the cache, whose records cover all files.
+
+    With models, methods are only analyzed where they matter under these
+    models, see `metrics_per_mod`. Such records are not written to the cache.
+    """
+    commit_shas = set(commit_shas)
+    duplicate_of = duplicate_of or {}
+    if pathspecs:
+        cache = None
+    records = {}
+    if cache is not None:
+        with stage("read cache"):
+            records = cache.get_records(commit_shas)
+    missing_shas = commit_shas - records.keys()
+    duplicate_shas = missing_shas & duplicate_of.keys()
+    new_records = mine_records(
+        path_to_repo,
+        missing_shas - duplicate_shas,
+        workers=workers,
+        backend=backend,
+        pathspecs=pathspecs,
+        models=models,
+    )
+    if cache is not None and models is None:
+        with stage("write cache"):
+            cache.put_records(new_records)
+    records.update(new_records)
+    for commit_sha in duplicate_shas:
+        first = duplicate_of[commit_sha]
+        if first in records:
+            records[commit_sha] = records[first]
+    return records
+
+
+def dedup_contribs(
+    path_to_repo,
+    commit_shas_per_contrib,
+    count_duplicates=True,
+    pathspecs=None,
+):
+    """Returns the duplicates among the commits of the given contributions,
+    see `contribution_complexity.dedup.find_duplicates`, which can be passed
+    to `collect_records`, and the contributions to score, from which
+    duplicates are dropped unless they count towards the metrics
+    """
+    with stage("dedup"):
+        duplicate_of = find_duplicates(
+            path_to_repo,
+            chain.from_iterable(commit_shas_per_contrib.values()),
+            pathspecs,
+        )
+    COUNTERS["duplicate_commits"] += len(duplicate_of)
+    if not count_duplicates:
+        commit_shas_per_contrib = drop_duplicates(
+            commit_shas_per_contrib, duplicate_of
+        )
+    return duplicate_of, commit_shas_per_contrib
+
+
+def _sums_from_records(records, commit_shas_per_contrib):
+    metrics_per_sha = {
+        sha: metrics_from_record(record) for sha, record in records.items()
+    }
+    for contrib_id, commit_shas in commit_shas_per_contrib.items():
+        commits_metrics = (
+            metrics_per_sha[sha]
+            for sha in dict.fromkeys(commit_shas)
+            if sha in metrics_per_sha
+        )
+        yield contrib_id, sum_commit_metrics(commits_metrics)
+
+
+def contrib_compls_from_records(records, commit_shas_per_contrib):
+    """Computes the complexity of contributions from the records of their
+    commits with the current models. No repository is needed for that.
+    """
+    with stage("aggregate"):
+        return {
+            contrib_id: contrib_compl_from_sums(acc)
+            for contrib_id, acc in _sums_from_records(
+                records, commit_shas_per_contrib
+            )
+        }
+
+
+def contrib_breakdowns_from_records(records, commit_shas_per_contrib):
+    """Like `contrib_compls_from_records` but maps each contribution to its
+    complexity together with the values it is computed from, see
+    `contrib_compl_breakdown`
+    """
+    with stage("aggregate"):
+        return {
+            contrib_id: contrib_compl_breakdown(acc)
+            for contrib_id, acc in _sums_from_records(
+                records, commit_shas_per_contrib
+            )
+        }
+
+
+def compute_contrib_compls(
+    path_to_repo,
+    commit_shas_per_contrib,
+    workers=1,
+    cache=None,
+    backend="pydriller",
+    dedup=False,
+    count_duplicates=True,
+    pathspecs=None,
+):
+    """Computes the complexity of many contributions at once. The argument
+    maps contribution ids to lists of commit shas and the result maps the same
+    ids to their ContributionComplexity.
+
+    Each commit is mined and measured only once, even when it belongs to
+    multiple contributions, see `collect_records`. With `dedup`, the same
+    holds for commits with the same patch, see
+    `contribution_complexity.dedup`, which count only once per contribution
+    unless `count_duplicates` is true. Pathspecs limit the metrics to the
+    matching files, see `contribution_complexity.path_filter`.
+
+    Without a cache, the records are not kept, so methods are only analyzed
+    where they matter under the current models, see `metrics_per_mod`.
+    """
+    duplicate_of = None
+    if dedup:
+        duplicate_of, commit_shas_per_contrib = dedup_contribs(
+            path_to_repo, commit_shas_per_contrib, count_duplicates, pathspecs
+        )
+    all_commit_shas = chain.from_iterable(commit_shas_per_contrib.values())
+    records = collect_records(
+        path_to_repo,
+        all_commit_shas,
+        workers=workers,
+        cache=cache,
+        backend=backend,
+        duplicate_of=duplicate_of,
+        pathspecs=pathspecs,
+        models=_current_models() if cache is None else None,
+    )
+    return contrib_compls_from_records(records, commit_shas_per_contrib)
+
+
+def compute_contrib_compl(
+    path_to_repo,
+    commit_shas,
+    workers=1,
+    cache=None,
+    backend="pydriller",
+    dedup=False,
+    count_duplicates=True,
+    pathspecs=None,
+):
+    streamed = workers == 1 and cache is None and backend == "pydriller"
+    if not streamed or dedup or pathspecs:
+        contrib_compls = compute_contrib_compls(
+            path_to_repo,
+            {None: commit_shas},
+            workers=workers,
+            cache=cache,
+            backend=backend,
+            dedup=dedup,
+            count_duplicates=count_duplicates,
+            pathspecs=pathspecs,
+        )
+        return contrib_compls[None]
+
+    # Each commit is reduced to its metrics before the next one is loaded
+    with stage("measure and aggregate"):
+        commit_metrics = compute_commit_metrics(
+            collect_data(path_to_repo, commit_shas)
+        )
+        dis_commit_metrics = discretize_commit_metrics(commit_metrics)
+        contrib_compl = aggregate_final_complexity_vals(dis_commit_metrics)
 
     return contrib_compl
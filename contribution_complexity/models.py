@@ -0,0 +1,32 @@
+import math
+from pathlib import Path
+from contribution_complexity.complexity_types import ModificationComplexity
+
+
+MODEL_NAMES = (
+    "LINE_MODEL",
+    "HUNK_MODEL",
+    "METHOD_MODEL",
+    "FILE_MODEL",
+    "MODIFICATION_KIND_MODEL",
+    "MOD_COMPL_WEIGHTS",
+    "MODIFICATION_MODEL",
+)
+
+
+def load_models(path_to_models):
+    """Executes the Python file at the given path, which has to define all
+    models like `contribution_complexity.default_models` does, and returns
+    them as a dictionary keyed by model name.
+    """
+    namespace = {
+        "math": math,
+        "ModificationComplexity": ModificationComplexity,
+    }
+    exec(Path(path_to_models).read_text(), namespace)
+    missing = [name for name in MODEL_NAMES if name not in namespace]
+    if missing:
+        names = ", ".join(missing)
+        msg = f"Models {names} are not configured in {path_to_models}"
+        raise ValueError(msg)
+    return {name: namespace[name] for name in MODEL_NAMES}
@@ -0,0 +1,100 @@
+"""
+Machine readable output of the complexity of contributions together with the
+intermediate values it is computed from, see
+`contribution_complexity.metrics.contrib_compl_breakdown`, as JSON lines or as
+CSV.
+"""
+
+import csv
+import json
+from contribution_complexity.complexity_types import ModificationComplexity
+
+OUTPUT_KINDS = ("json", "csv")
+METRIC_COLUMNS = (
+    "no_modified_files",
+    "changed_l_per_f",
+    "no_mod_types",
+    "mods_compl_freqs_weighed",
+)
+LEVEL_COLUMNS = (
+    "mod_files_compl",
+    "lines_mod_compl",
+    "mod_kind_compl",
+    "mod_compl",
+)
+# The frequencies of modification complexities are flattened in CSV
+FREQ_COLUMNS = tuple(
+    f"no_{compl.name.lower()}_mods" for compl in ModificationComplexity
+)
+# Number of files that path filters excluded from the metrics, see
+# `contribution_complexity.path_filter`
+EXCLUDED_COLUMN = "no_excluded_files"
+CSV_COLUMNS = (
+    ("id", "commit_shas", "contrib_complexity")
+    + METRIC_COLUMNS
+    + FREQ_COLUMNS
+    + LEVEL_COLUMNS
+    + (EXCLUDED_COLUMN,)
+)
+
+
+def to_row(contrib_id, commit_shas, breakdown):
+    """Converts a breakdown into a row of plain values. Contributions without
+    commits have no breakdown and only `None` values.
+    """
+    row = {"id": contrib_id, "commit_shas": list(commit_shas)}
+    if breakdown is None:
+        row["contrib_complexity"] = None
+        row.update(dict.fromkeys(METRIC_COLUMNS))
+        row["mods_compl_freqs"] = {}
+        row.update(dict.fromkeys(LEVEL_COLUMNS))
+        row[EXCLUDED_COLUMN] = None
+        return row
+
+    row["contrib_complexity"] = breakdown["contrib_complexity"].value
+    row.update({col: breakdown[col] for col in METRIC_COLUMNS})
+    row["mods_compl_freqs"] = {
+        compl.name: breakdown["mods_compl_freqs"].get(compl, 0)
+        for compl in ModificationComplexity
+    }
+    row.update({col: breakdown[col].value for col in LEVEL_COLUMNS})
+    row[EXCLUDED_COLUMN] = breakdown.get(EXCLUDED_COLUMN, 0)
+    return row
+
+
+def to_csv_row(row):
+    csv_row = dict(row)
+    csv_row["commit_shas"] = " ".join(row["commit_shas"])
+    freqs = csv_row.pop("mods_compl_freqs")
+    for compl, col in zip(ModificationComplexity, FREQ_COLUMNS):
+        csv_row[col] = freqs.get(compl.name)
+    return [csv_row[col] for col in CSV_COLUMNS]
+
+
+class RowWriter:
+    """Writes rows, see `to_row`, one by one to a file object"""
+
+    def __init__(self, fp, kind, header=True):
+        if kind not in OUTPUT_KINDS:
+            raise ValueError(
+                f"Unknown output {kind}, use one of {OUTPUT_KINDS}"
+            )
+        self.fp = fp
+        self.kind = kind
+        if kind == "csv":
+            self._csv_writer = csv.writer(fp)
+            if header:
+                self._csv_writer.writerow(CSV_COLUMNS)
+
+    def write(self, contrib_id, commit_shas, breakdown):
+        row = to_row(contrib_id, commit_shas, breakdown)
+        if self.kind == "csv":
+            self._csv_writer.writerow(to_csv_row(row))
+        else:
+            self.fp.write(json.dumps(row) + "\n")
+
+
+def write_breakdowns(fp, commit_shas_per_contrib, breakdowns, kind):
+    writer = RowWriter(fp, kind)
+    for contrib_id, commit_shas in commit_shas_per_contrib.items():
+        writer.write(contrib_id, commit_shas, breakdowns.get(contrib_id))
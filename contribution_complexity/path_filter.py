@@ -0,0 +1,148 @@
+"""
+Filters that exclude files, e.g., generated sources, lock files, binaries, or
+vendored trees, from the metrics. Patterns use the syntax of .gitignore files
+and are read from ~/.contribcomplignore, from .contribcomplignore in the
+repository, and from the command line. They are converted to git pathspecs,
+which the git backend passes to `git diff-tree`, so that excluded files are
+neither diffed nor read. For example:
+
+    # Generated and vendored files
+    *.lock
+    *.jar
+    /build/
+    vendor/
+"""
+
+import subprocess
+from pathlib import Path
+from itertools import chain
+from contribution_complexity.git_backend import (
+    _git,
+    _parents,
+    selected_paths,
+)
+from contribution_complexity.metrics import COUNTERS
+
+IGNORE_FILE = ".contribcomplignore"
+
+
+def parse_patterns(text):
+    """Returns the patterns of an ignore file, i.e., its lines without
+    comments and blank lines. Negated patterns are not supported, since git
+    pathspecs cannot include files again that another pattern excludes.
+    """
+    patterns = []
+    for line in text.splitlines():
+        pattern = line.strip()
+        if not pattern or pattern.startswith("#"):
+            continue
+        if pattern.startswith("!"):
+            raise ValueError(f"Negated patterns are not supported: {pattern}")
+        patterns.append(pattern)
+    return patterns
+
+
+def read_ignore_files(path_to_repo):
+    """Returns the patterns of ~/.contribcomplignore and of the repository's
+    .contribcomplignore, which is read from the working tree or, e.g., in
+    bare clones, from HEAD
+    """
+    texts = []
+    path_to_home_file = Path.home() / IGNORE_FILE
+    if path_to_home_file.is_file():
+        texts.append(path_to_home_file.read_text(encoding="utf-8"))
+    path_to_repo_file = Path(path_to_repo) / IGNORE_FILE
+    if path_to_repo_file.is_file():
+        texts.append(path_to_repo_file.read_text(encoding="utf-8"))
+    else:
+        cmd = _git(path_to_repo, "cat-file", "blob", f"HEAD:{IGNORE_FILE}")
+        result = subprocess.run(cmd, capture_output=True)
+        if result.returncode == 0:
+            texts.append(result.stdout.decode("utf-8", "replace"))
+    return [pattern for text in texts for pattern in parse_patterns(text)]
+
+
+def to_globs(pattern):
+    """Converts a .gitignore pattern to the globs of git pathspecs that match
+    the same files
+    """
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    # Patterns with a slash, except for a trailing one, are relative to the
+    # top of the repository and others match at any depth
+    if "/" in pattern:
+        base = pattern.lstrip("/")
+    else:
+        base = f"**/{pattern}"
+    if dir_only:
+        return [f"{base}/**"]
+    return [base, f"{base}/**"]
+
+
+def to_pathspecs(excludes=(), includes=()):
+    """Returns the git pathspecs that select the files matching any of the
+    includes, or all files if there are none, except for the ones matching
+    any of the excludes. Returns `None` if nothing is filtered.
+    """
+    pathspecs = [
+        f":(glob){glob}" for pattern in includes for glob in to_globs(pattern)
+    ]
+    pathspecs += [
+        f":(exclude,glob){glob}"
+        for pattern in excludes
+        for glob in to_globs(pattern)
+    ]
+    return pathspecs or None
+
+
+def pathspecs_for(path_to_repo, excludes=(), includes=()):
+    """Returns the pathspecs of the ignore files, see `read_ignore_files`, and
+    of the given patterns or `None` if nothing is filtered
+    """
+    excludes = read_ignore_files(path_to_repo) + parse_patterns(
+        "\n".join(excludes)
+    )
+    return to_pathspecs(excludes, parse_patterns("\n".join(includes)))
+
+
+def _count_files(path_to_repo, commit_parents, pathspecs=None):
+    # Counts modified files like the git backend does for `Commit.files`
+    paths = selected_paths(path_to_repo, commit_parents, pathspecs)
+    return {commit_sha: len(p) for commit_sha, p in paths.items()}
+
+
+def count_excluded_files(path_to_repo, commit_shas, pathspecs):
+    """Returns the number of files of each of the given commits that the
+    pathspecs exclude keyed by sha
+    """
+    commit_parents = _parents(path_to_repo, list(dict.fromkeys(commit_shas)))
+    if not commit_parents or not pathspecs:
+        return dict.fromkeys(commit_parents, 0)
+    no_files = _count_files(path_to_repo, commit_parents)
+    no_selected_files = _count_files(path_to_repo, commit_parents, pathspecs)
+    return {
+        commit_sha: no_files.get(commit_sha, 0)
+        - no_selected_files.get(commit_sha, 0)
+        for commit_sha in commit_parents
+    }
+
+
+def add_excluded_files(
+    breakdowns, path_to_repo, commit_shas_per_contrib, pathspecs
+):
+    """Adds the number of files that the pathspecs exclude from the commits
+    of each contribution to its breakdown, see
+    `contribution_complexity.metrics.contrib_compl_breakdown`, so that the
+    output shows what was filtered
+    """
+    no_excluded_files = count_excluded_files(
+        path_to_repo,
+        chain.from_iterable(commit_shas_per_contrib.values()),
+        pathspecs,
+    )
+    COUNTERS["excluded_files"] += sum(no_excluded_files.values())
+    for contrib_id, breakdown in breakdowns.items():
+        commit_shas = dict.fromkeys(commit_shas_per_contrib[contrib_id])
+        breakdown["no_excluded_files"] = sum(
+            no_excluded_files.get(commit_sha, 0) for commit_sha in commit_shas
+        )
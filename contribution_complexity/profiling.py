@@ -0,0 +1,134 @@
+"""
+Timing of the stages of the metrics pipeline, e.g., mining commits, counting
+diff lines, or parsing sources with lizard, see `stage`. Stages are only
+timed once profiling is enabled, see `enable`, and otherwise cost one check
+of a flag. Stages may be nested, so their times are inclusive.
+
+Worker processes time their stages themselves and report them back with their
+records, see `snapshot` and `merge`.
+"""
+
+import os
+import json
+import time
+import threading
+
+ENABLED = False
+TRACING = False
+# Number of calls, wall seconds, and CPU seconds per stage name
+STAGES = {}
+# Complete events of the Chrome trace event format, see `write_trace`
+EVENTS = []
+
+
+def enable(trace=False):
+    """Enables the timing of stages and, if `trace` is true, the recording of
+    one event per timed stage
+    """
+    global ENABLED, TRACING
+    ENABLED = True
+    TRACING = trace
+
+
+def settings():
+    """Returns the arguments of `enable` for worker processes or `None` if
+    profiling is disabled
+    """
+    return {"trace": TRACING} if ENABLED else None
+
+
+class stage:
+    """Context manager that times a stage of the pipeline:
+
+    with stage("lizard"):
+        ...
+    """
+
+    __slots__ = ("name", "_wall", "_cpu")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        if ENABLED:
+            self._wall = time.perf_counter_ns()
+            self._cpu = time.thread_time_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not ENABLED:
+            return
+        wall = time.perf_counter_ns() - self._wall
+        cpu = time.thread_time_ns() - self._cpu
+        stats = STAGES.setdefault(self.name, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += wall
+        stats[2] += cpu
+        if TRACING:
+            EVENTS.append(
+                {
+                    "name": self.name,
+                    "ph": "X",
+                    "ts": self._wall / 1000,
+                    "dur": wall / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+
+def reset():
+    STAGES.clear()
+    EVENTS.clear()
+
+
+def snapshot():
+    """Returns the stages and events recorded so far, e.g., by a worker
+    process, which can be passed between processes
+    """
+    return {"stages": dict(STAGES), "events": list(EVENTS)}
+
+
+def merge(other):
+    """Adds the stages and events of a `snapshot` to the ones of this
+    process
+    """
+    for name, (calls, wall, cpu) in other["stages"].items():
+        stats = STAGES.setdefault(name, [0, 0, 0])
+        stats[0] += calls
+        stats[1] += wall
+        stats[2] += cpu
+    EVENTS.extend(other["events"])
+
+
+def format_summary(counters=None):
+    """Formats the stages, slowest first, and the given counters, e.g.,
+    `contribution_complexity.metrics.COUNTERS`, as a table
+    """
+    lines = [f"{'stage':28} {'calls':>9} {'wall_s':>10} {'cpu_s':>10}"]
+    stages = sorted(STAGES.items(), key=lambda item: -item[1][1])
+    for name, (calls, wall, cpu) in stages:
+        lines.append(
+            f"{name:28} {calls:9} {wall / 1e9:10.3f} {cpu / 1e9:10.3f}"
+        )
+    for name, count in sorted((counters or {}).items()):
+        lines.append(f"{name:28} {count:9}")
+    return "\n".join(lines)
+
+
+def write_trace(path_to_trace, counters=None):
+    """Writes the recorded events in the Chrome trace event format, which
+    chrome://tracing and https://ui.perfetto.dev display, together with the
+    summary of the stages and the given counters
+    """
+    stages = {
+        name: {"calls": calls, "wall_s": wall / 1e9, "cpu_s": cpu / 1e9}
+        for name, (calls, wall, cpu) in STAGES.items()
+    }
+    trace = {
+        "traceEvents": EVENTS,
+        "displayTimeUnit": "ms",
+        "otherData": {"stages": stages, "counters": dict(counters or {})},
+    }
+    with open(path_to_trace, "w", encoding="utf-8") as fp:
+        json.dump(trace, fp)
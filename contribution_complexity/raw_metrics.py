@@ -0,0 +1,79 @@
+import gzip
+import json
+from contribution_complexity.cache import MOD_METRICS
+
+
+COMMIT_COLUMNS = ("sha", "no_modified_files", "no_lines", "no_mods")
+MOD_COLUMNS = ("change_type", "old_path", "new_path") + MOD_METRICS
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_raw_metrics(path, records, commit_shas_per_contrib):
+    """Writes the records of commits, see
+    `contribution_complexity.metrics.record_per_commit`, together with the
+    commits of each contribution to a JSON file with one list per column.
+    The modifications of the i-th commit are the next `no_mods` rows of the
+    modification columns. Files ending in `.gz` are compressed.
+    """
+    commit_cols = {col: [] for col in COMMIT_COLUMNS}
+    mod_cols = {col: [] for col in MOD_COLUMNS}
+    for commit_sha, record in records.items():
+        mod_records = record["modifications"]
+        commit_cols["sha"].append(commit_sha)
+        commit_cols["no_modified_files"].append(record["no_modified_files"])
+        commit_cols["no_lines"].append(record["no_lines"])
+        commit_cols["no_mods"].append(len(mod_records))
+        for mod_record in mod_records:
+            for col in MOD_COLUMNS:
+                mod_cols[col].append(mod_record[col])
+
+    with _open(path, "w") as fp:
+        json.dump(
+            {
+                "contributions": commit_shas_per_contrib,
+                "commits": commit_cols,
+                "modifications": mod_cols,
+            },
+            fp,
+        )
+
+
+def read_columns(path):
+    """Returns the contributions, the commit columns, and the modification
+    columns of a file written by `write_raw_metrics`
+    """
+    with _open(path, "r") as fp:
+        data = json.load(fp)
+    return data["contributions"], data["commits"], data["modifications"]
+
+
+def records_from_columns(commit_cols, mod_cols):
+    records = {}
+    start = 0
+    for idx, commit_sha in enumerate(commit_cols["sha"]):
+        end = start + commit_cols["no_mods"][idx]
+        mod_records = [
+            {col: mod_cols[col][i] for col in MOD_COLUMNS}
+            for i in range(start, end)
+        ]
+        records[commit_sha] = {
+            "no_modified_files": commit_cols["no_modified_files"][idx],
+            "no_lines": commit_cols["no_lines"][idx],
+            "modifications": mod_records,
+        }
+        start = end
+    return records
+
+
+def read_raw_metrics(path):
+    """Reads a file written by `write_raw_metrics` and returns the records
+    keyed by sha and the commits of each contribution
+    """
+    commit_shas_per_contrib, commit_cols, mod_cols = read_columns(path)
+    records = records_from_columns(commit_cols, mod_cols)
+    return records, commit_shas_per_contrib
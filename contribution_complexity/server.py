@@ -0,0 +1,214 @@
+"""
+A long running process that scores contributions on request, so that the
+startup of Python, the import of PyDriller, the loading of the models, and the
+opening of repositories are paid only once. Requests are HTTP POSTs of a JSON
+object with the repository and either the shas of commits or an issue regex,
+for example:
+
+    {"repo": "/tmp/cassandra", "shas": ["021df08...", "2f1d6c7..."]}
+    {"repo": "/tmp/cassandra", "issue_regex": "CASSANDRA-8099( |$)"}
+
+Responses are JSON objects with the complexity and the values it is computed
+from, see `contribution_complexity.output.to_row`. Requests are served one
+after the other. Clones of URLs are fetched again when requested commits are
+not in them, and requests for commits that do not exist fail. The metrics are
+limited by the path filters of each repository, see
+`contribution_complexity.path_filter`.
+"""
+
+import re
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pydriller import GitRepository
+from contribution_complexity.clones import cached_clone
+from contribution_complexity.compute import (
+    find_commits_for_issue,
+    is_git_dir,
+    is_git_url,
+)
+from contribution_complexity import metrics
+from contribution_complexity.output import to_row
+from contribution_complexity.path_filter import (
+    add_excluded_files,
+    pathspecs_for,
+)
+from contribution_complexity.metrics import (
+    _records_per_commits,
+    _records_per_commits_in_repo,
+    contrib_breakdowns_from_records,
+    get_models,
+)
+
+DEFAULT_PORT = 8765
+FULL_SHA_RE = re.compile(r"[0-9a-f]{40}")
+
+
+class BadRequest(Exception):
+    pass
+
+
+class Scorer:
+    """Scores contributions of any number of repositories, which are kept
+    open, with the given `MetricsCache`. Files matching the given excludes,
+    or not matching the given includes, are left out in addition to the ones
+    in the ignore files of each repository, see `pathspecs_for`.
+    """
+
+    def __init__(
+        self, cache=None, backend="pydriller", excludes=(), includes=()
+    ):
+        self.cache = cache
+        self.backend = backend
+        self.excludes = list(excludes)
+        self.includes = list(includes)
+        self._paths = {}
+        self._repos = {}
+        self._pathspecs = {}
+
+    def repo_path(self, repo, update=False):
+        """Returns the local path of a repository path or URL. URLs are
+        cloned, or fetched, once per process and fetched again on `update`.
+        """
+        if update and is_git_url(repo):
+            path_to_repo = cached_clone(repo)
+            self._paths[repo] = path_to_repo
+            # Reopen the repository, so that it finds the fetched commits
+            self._repos.pop(path_to_repo, None)
+            # The fetched head may have another ignore file
+            self._pathspecs.pop(path_to_repo, None)
+        elif repo not in self._paths:
+            if is_git_url(repo):
+                self._paths[repo] = cached_clone(repo)
+            elif is_git_dir(repo):
+                self._paths[repo] = repo
+            else:
+                raise BadRequest(f"{repo} is neither a repository nor a URL")
+        return self._paths[repo]
+
+    def pathspecs(self, path_to_repo):
+        """Returns the pathspecs of a repository, see `pathspecs_for`, which
+        are read once per process and after each fetch
+        """
+        if path_to_repo not in self._pathspecs:
+            try:
+                self._pathspecs[path_to_repo] = pathspecs_for(
+                    path_to_repo, self.excludes, self.includes
+                )
+            except ValueError as e:
+                raise BadRequest(f"Cannot filter paths: {e}")
+        return self._pathspecs[path_to_repo]
+
+    def _mine(self, path_to_repo, commit_shas, pathspecs=None, models=None):
+        if self.backend == "git":
+            return _records_per_commits(
+                path_to_repo, commit_shas, "git", pathspecs, models
+            )
+        if path_to_repo not in self._repos:
+            self._repos[path_to_repo] = GitRepository(path_to_repo)
+        return _records_per_commits_in_repo(
+            self._repos[path_to_repo], commit_shas, models, pathspecs
+        )
+
+    def records(self, path_to_repo, commit_shas):
+        # Like `collect_records` but on the open repository
+        commit_shas = {
+            sha for sha in commit_shas if FULL_SHA_RE.fullmatch(sha)
+        }
+        pathspecs = self.pathspecs(path_to_repo)
+        # Filtered records cover only some files, unlike the cached ones
+        cache = None if pathspecs else self.cache
+        records = {}
+        if cache is not None:
+            records = cache.get_records(commit_shas)
+        # Uncached records only have to hold under the current models
+        models = get_models() if cache is None else None
+        new_records = self._mine(
+            path_to_repo, commit_shas - records.keys(), pathspecs, models
+        )
+        if cache is not None:
+            cache.put_records(new_records)
+        records.update(new_records)
+        return records
+
+    def score(self, request):
+        """Answers a request, see the module's documentation"""
+        if not isinstance(request, dict) or "repo" not in request:
+            raise BadRequest("Requests need a repo")
+        path_to_repo = self.repo_path(request["repo"])
+        if "shas" in request:
+            contrib_id = "commits"
+            commit_shas = request["shas"]
+            if not isinstance(commit_shas, list) or not all(
+                isinstance(sha, str) for sha in commit_shas
+            ):
+                raise BadRequest("shas have to be a list of strings")
+        elif "issue_regex" in request:
+            contrib_id = request["issue_regex"]
+            if not isinstance(contrib_id, str):
+                raise BadRequest("issue_regex has to be a string")
+            commit_shas = find_commits_for_issue(path_to_repo, contrib_id)
+        else:
+            raise BadRequest("Requests need either shas or an issue_regex")
+
+        records = self.records(path_to_repo, commit_shas)
+        missing_shas = [sha for sha in commit_shas if sha not in records]
+        if missing_shas and is_git_url(request["repo"]):
+            # For example, commits that were pushed after the clone
+            path_to_repo = self.repo_path(request["repo"], update=True)
+            records.update(self.records(path_to_repo, missing_shas))
+            missing_shas = [sha for sha in missing_shas if sha not in records]
+        if missing_shas:
+            shas = ", ".join(dict.fromkeys(missing_shas))
+            raise BadRequest(f"Unknown commits: {shas}")
+        contribs = {contrib_id: commit_shas} if records else {}
+        breakdowns = contrib_breakdowns_from_records(records, contribs)
+        pathspecs = self.pathspecs(path_to_repo)
+        if pathspecs:
+            add_excluded_files(breakdowns, path_to_repo, contribs, pathspecs)
+        return to_row(contrib_id, commit_shas, breakdowns.get(contrib_id))
+
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    def _respond(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond(200, {"status": "ok"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length))
+            self._respond(200, self.server.scorer.score(request))
+        except (ValueError, BadRequest) as e:
+            self._respond(400, {"error": str(e)})
+        except Exception as e:
+            # Keep serving, e.g., after git failed on a broken repository
+            self._respond(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        # Requests are only logged with verbose output
+        if metrics.VERBOSE:
+            super().log_message(format, *args)
+
+
+def make_server(scorer, host="127.0.0.1", port=DEFAULT_PORT):
+    server = HTTPServer((host, port), ScoringHandler)
+    server.scorer = scorer
+    return server
+
+
+def serve(scorer, host="127.0.0.1", port=DEFAULT_PORT):
+    server = make_server(scorer, host, port)
+    print(f"Serving on http://{host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,149 @@
+"""
+Discretization of whole columns of metrics at once with NumPy, which is an
+optional dependency (`pip install contribution-complexity[fast]`). The results
+are identical to the ones of the scalar functions in
+`contribution_complexity.metrics`, but complexities are integer levels, i.e.,
+the values of the complexity enums, instead of enum members.
+"""
+import numpy as np
+from contribution_complexity.complexity_types import ModificationComplexity
+
+
+MOD_KINDS = ("ADD", "COPY", "RENAME", "DELETE", "MODIFY", "UNKNOWN")
+# Modifications of these kinds are always of low complexity, see
+# `contribution_complexity.metrics.overwrite_previous_assessment`
+LOW_MOD_KINDS = ("DELETE", "COPY")
+
+
+def model_edges(model):
+    """Converts a model of `(low, up)` tuples into the array of its upper
+    bounds and its lowest bound. The intervals of the model have to be
+    contiguous, i.e., each interval starts where the previous one ends.
+    """
+    lows, ups = zip(*model)
+    if lows[1:] != ups[:-1]:
+        raise ValueError(f"Intervals of model {model} are not contiguous")
+    return lows[0], np.asarray(ups, dtype=float)
+
+
+def to_levels(values, model):
+    """Maps each value to the level of the interval `low < val <= up` of the
+    model that contains it, counting from 1. Missing values, i.e., `None` or
+    NaN, are of low complexity like in
+    `contribution_complexity.metrics.discretize_mod_metrics`. Raises a
+    `ValueError` for values outside of all intervals.
+    """
+    low, ups = model_edges(model)
+    values = np.asarray(values, dtype=float)
+    missing = np.isnan(values)
+    idxs = np.searchsorted(ups, values, side="left")
+    outside = ~missing & ((values <= low) | (idxs == len(ups)))
+    if outside.any():
+        val = values[outside][0]
+        raise ValueError(f"Value {val:g} is outside of model {model}")
+    levels = np.where(missing, ModificationComplexity.LOW.value, idxs + 1)
+    return levels.astype(np.int8)
+
+
+def mean_levels(*levels):
+    """Rounds the mean of the given level arrays half to even like
+    `round(mean(...))` does
+    """
+    return np.rint(np.sum(levels, axis=0) / len(levels)).astype(np.int8)
+
+
+def mod_compl_levels(mod_cols, models):
+    """Computes the complexity levels of modifications from the columns of
+    their metrics, see `contribution_complexity.raw_metrics`
+    """
+    line_model = models["LINE_MODEL"]
+    lines_add_compl = to_levels(mod_cols["no_lines_added"], line_model)
+    lines_del_compl = to_levels(mod_cols["no_lines_removed"], line_model)
+    hunk_compl = to_levels(mod_cols["no_hunks"], models["HUNK_MODEL"])
+    method_compl = to_levels(
+        mod_cols["no_methods_changed"], models["METHOD_MODEL"]
+    )
+    compls = mean_levels(
+        lines_add_compl, lines_del_compl, hunk_compl, method_compl
+    )
+
+    is_low = np.isin(np.asarray(mod_cols["change_type"]), LOW_MOD_KINDS)
+    compls[is_low] = ModificationComplexity.LOW.value
+    return compls
+
+
+def contrib_compl_levels(
+    commit_cols, mod_cols, commit_shas_per_contrib, models
+):
+    """Computes the complexity levels of contributions from the columns of
+    the metrics of their commits and modifications. The result is ordered
+    like the given contributions.
+    """
+    no_commits = len(commit_cols["sha"])
+    no_contribs = len(commit_shas_per_contrib)
+    commit_idxs = np.repeat(np.arange(no_commits), commit_cols["no_mods"])
+
+    # Per commit: bit mask of modification kinds and frequency of
+    # modification complexities
+    kind_codes = np.asarray(
+        [MOD_KINDS.index(k) for k in mod_cols["change_type"]], dtype=np.int64
+    )
+    kind_masks = np.zeros(no_commits, dtype=np.int64)
+    np.bitwise_or.at(kind_masks, commit_idxs, 1 << kind_codes)
+    mod_compls = mod_compl_levels(mod_cols, models)
+    compl_freqs = np.zeros(
+        (no_commits, len(ModificationComplexity)), dtype=np.int64
+    )
+    np.add.at(compl_freqs, (commit_idxs, mod_compls - 1), 1)
+
+    # Per contribution: sums over its distinct commits
+    idx_per_sha = {sha: idx for idx, sha in enumerate(commit_cols["sha"])}
+    contrib_idxs, contrib_commit_idxs = [], []
+    contribs = enumerate(commit_shas_per_contrib.values())
+    for contrib_idx, commit_shas in contribs:
+        for sha in dict.fromkeys(commit_shas):
+            if sha in idx_per_sha:
+                contrib_idxs.append(contrib_idx)
+                contrib_commit_idxs.append(idx_per_sha[sha])
+    contrib_idxs = np.asarray(contrib_idxs, dtype=np.int64)
+    contrib_commit_idxs = np.asarray(contrib_commit_idxs, dtype=np.int64)
+
+    def sum_per_contrib(commit_vals):
+        sums = np.zeros(
+            (no_contribs,) + commit_vals.shape[1:], dtype=commit_vals.dtype
+        )
+        np.add.at(sums, contrib_idxs, commit_vals[contrib_commit_idxs])
+        return sums
+
+    no_mod_files = sum_per_contrib(
+        np.asarray(commit_cols["no_modified_files"], dtype=np.int64)
+    )
+    no_lines = sum_per_contrib(
+        np.asarray(commit_cols["no_lines"], dtype=np.int64)
+    )
+    contrib_kind_masks = np.zeros(no_contribs, dtype=np.int64)
+    np.bitwise_or.at(
+        contrib_kind_masks, contrib_idxs, kind_masks[contrib_commit_idxs]
+    )
+    no_mod_types = np.zeros(no_contribs, dtype=np.int64)
+    for kind_code in range(len(MOD_KINDS)):
+        no_mod_types += (contrib_kind_masks >> kind_code) & 1
+    contrib_compl_freqs = sum_per_contrib(compl_freqs)
+
+    changed_l_per_f = np.divide(
+        no_lines,
+        no_mod_files,
+        out=np.zeros(no_contribs, dtype=float),
+        where=no_mod_files != 0,
+    )
+    weights = np.asarray(
+        [models["MOD_COMPL_WEIGHTS"][c] for c in ModificationComplexity]
+    )
+    mods_compl_freqs_weighed = contrib_compl_freqs @ weights
+
+    return mean_levels(
+        to_levels(no_mod_files, models["FILE_MODEL"]),
+        to_levels(changed_l_per_f, models["LINE_MODEL"]),
+        to_levels(no_mod_types, models["MODIFICATION_KIND_MODEL"]),
+        to_levels(mods_compl_freqs_weighed, models["MODIFICATION_MODEL"]),
+    )
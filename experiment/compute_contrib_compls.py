@@ -1,8 +1,8 @@
 import sys
 import numpy as np
 import pandas as pd
-from contribution_complexity.compute import find_commits_for_issue
-from contribution_complexity.metrics import compute_contrib_compl
+from contribution_complexity.compute import find_commits_for_issues
+from contribution_complexity.metrics import compute_contrib_compls
 
 
 def main(sys_name):
@@ -24,38 +24,29 @@ def main(sys_name):
     # df = df.iloc[:10]
 
     path_to_repo = f"/tmp/{sys_name}"
-    contribcompls = []
-    commit_shas_per_contrib = []
-
-    for issue_key in df[issue_key_col].values:
-        if sys_name == "cassandra":
-            issue_re = f"{issue_key}( |$)"
-        elif sys_name == "gaffer":
-            issue_re = f"(Gh |gh-){issue_key}( |$)"
+    if sys_name == "cassandra":
+        issue_res = [f"{k}( |$)" for k in df[issue_key_col].values]
+    elif sys_name == "gaffer":
+        issue_res = [f"(Gh |gh-){k}( |$)" for k in df[issue_key_col].values]
+    commits_per_issue = find_commits_for_issues(path_to_repo, issue_res)
 
-        commit_shas = find_commits_for_issue(path_to_repo, issue_re)
-        commit_shas_per_contrib.append(commit_shas)
+    commit_shas_per_contrib = {}
+    for issue_key, issue_re in zip(df[issue_key_col].values, issue_res):
+        commit_shas = commits_per_issue[issue_re]
+        commit_shas_per_contrib[issue_key] = commit_shas
         print(issue_re, commit_shas, flush=True)
 
-        if commit_shas:
-            try:
-                contribcompl = compute_contrib_compl(path_to_repo, commit_shas)
-            except:
-                print(
-                    f"Skipping {issue_key}",
-                    issue_re,
-                    commit_shas,
-                    type(commit_shas),
-                    flush=True,
-                )
-                contribcompl = None
-            contribcompl = contribcompl.value
-        else:
-            contribcompl = None
-        contribcompls.append(contribcompl)
-
-    df["commit_shas"] = commit_shas_per_contrib
-    df["contrib_complexity"] = contribcompls
+    # Commits are mined only once, also when they belong to multiple issues
+    contribcompls = compute_contrib_compls(
+        path_to_repo,
+        {k: shas for k, shas in commit_shas_per_contrib.items() if shas},
+    )
+
+    df["commit_shas"] = list(commit_shas_per_contrib.values())
+    df["contrib_complexity"] = [
+        contribcompls[k].value if k in contribcompls else None
+        for k in commit_shas_per_contrib.keys()
+    ]
 
     # Prevent sha lists from being truncated
     np.set_printoptions(threshold=sys.maxsize)
@@ -0,0 +1,89 @@
+import subprocess
+import pytest
+
+
+JAVA_SRC = """public class {name} {{
+    public int first(int a) {{
+        return a + {n};
+    }}
+
+    public int second(int b) {{
+        if (b > {n}) {{
+            return b;
+        }}
+        return {n};
+    }}
+}}
+"""
+
+
+def _git(path, *args):
+    env = {
+        "GIT_AUTHOR_NAME": "Jane Doe",
+        "GIT_AUTHOR_EMAIL": "jane@example.com",
+        "GIT_AUTHOR_DATE": "2021-04-01T12:00:00+00:00",
+        "GIT_COMMITTER_NAME": "Jane Doe",
+        "GIT_COMMITTER_EMAIL": "jane@example.com",
+        "GIT_COMMITTER_DATE": "2021-04-01T12:00:00+00:00",
+        "HOME": str(path),
+    }
+    result = subprocess.run(
+        ["git", "-C", str(path), *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return result.stdout.strip()
+
+
+def _commit(path, files, msg):
+    for name, content in files.items():
+        fpath = path / name
+        if content is None:
+            fpath.unlink()
+        else:
+            fpath.parent.mkdir(parents=True, exist_ok=True)
+            fpath.write_text(content)
+    _git(path, "add", "-A")
+    _git(path, "commit", "-q", "-m", msg)
+    return _git(path, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def git_repo(tmp_path):
+    """A small repository whose first four commits reference the issues
+    ISSUE-1 to ISSUE-3. Returns the path to the repository and the shas of its
+    commits.
+    """
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    shas = [
+        _commit(
+            path,
+            {"src/A.java": JAVA_SRC.format(name="A", n=1), "README": "a\n"},
+            "ISSUE-1 Initial import",
+        ),
+        _commit(
+            path,
+            {"src/A.java": JAVA_SRC.format(name="A", n=2)},
+            "ISSUE-2 Change constants\n\nSee also ISSUE-1",
+        ),
+        _commit(
+            path,
+            {
+                "src/B.java": JAVA_SRC.format(name="B", n=3),
+                "README": "a\nb\nc\n",
+            },
+            "ISSUE-22 Add B",
+        ),
+        _commit(path, {"README": None}, "Remove README ISSUE-3"),
+        _commit(
+            path,
+            {"src/B.java": None, "src/C.java": JAVA_SRC.format(name="B", n=3)},
+            "Move B",
+        ),
+        _commit(path, {"src/C.java": None}, "Remove C"),
+    ]
+    return str(path), shas
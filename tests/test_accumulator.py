@@ -0,0 +1,67 @@
+from pydriller import ModificationType
+from contribution_complexity.accumulator import CommitMetricsAccumulator
+from contribution_complexity.complexity_types import ModificationComplexity
+from contribution_complexity.metrics import (
+    collect_records,
+    metrics_from_record,
+    sum_commit_metrics,
+)
+
+
+def _commits_metrics(git_repo):
+    path_to_repo, shas = git_repo
+    records = collect_records(path_to_repo, shas)
+    return [metrics_from_record(records[sha]) for sha in shas]
+
+
+def test_merged_accumulators_equal_one_accumulator(git_repo):
+    commits_metrics = _commits_metrics(git_repo)
+
+    acc = sum_commit_metrics(commits_metrics)
+    merged = sum_commit_metrics(commits_metrics[:2]).merge(
+        sum_commit_metrics(commits_metrics[2:])
+    )
+    assert merged == acc
+    assert merged.to_commit_metrics() == acc.to_commit_metrics()
+    assert acc.no_modified_files == sum(
+        m["no_modified_files"] for m in commits_metrics
+    )
+
+
+def test_to_commit_metrics():
+    acc = CommitMetricsAccumulator()
+    assert acc.to_commit_metrics() == {
+        "no_modified_files": 0,
+        "changed_l_per_f": 0,
+        "no_mod_types": 0,
+        "mods_compl_freqs": {},
+    }
+
+    acc.add_commit(
+        {
+            "no_modified_files": 2,
+            "no_lines": 5,
+            "mod_kinds": [ModificationType.ADD, ModificationType.ADD],
+            "mod_compls": [
+                ModificationComplexity.LOW,
+                ModificationComplexity.HIGH,
+            ],
+        }
+    )
+    assert acc.to_commit_metrics() == {
+        "no_modified_files": 2,
+        "changed_l_per_f": 2.5,
+        "no_mod_types": 1,
+        "mods_compl_freqs": {
+            ModificationComplexity.LOW: 1,
+            ModificationComplexity.HIGH: 1,
+        },
+    }
+
+
+def test_bytes_round_trip(git_repo):
+    acc = sum_commit_metrics(_commits_metrics(git_repo))
+
+    data = acc.to_bytes()
+    assert len(data) == len(CommitMetricsAccumulator().to_bytes())
+    assert CommitMetricsAccumulator.from_bytes(data) == acc
@@ -0,0 +1,98 @@
+import asyncio
+from contribution_complexity.async_git import GitRunner, compute_contrib_compl
+from contribution_complexity.compute import (
+    find_commits_for_issue,
+    find_commits_for_issues,
+)
+from contribution_complexity.metrics import compute_contrib_compls
+
+
+def test_find_commits_concurrently(git_repo, tmp_path):
+    path_to_repo, shas = git_repo
+    issue_res = ["ISSUE-1( |$)", "ISSUE-2( |$)", "ISSUE-3( |$)"]
+
+    async def find():
+        runner = GitRunner(max_concurrent=2)
+        return await asyncio.gather(
+            runner.is_git_dir(path_to_repo),
+            runner.is_git_dir(str(tmp_path)),
+            runner.find_commits_for_issues(path_to_repo, issue_res),
+            *(
+                runner.find_commits_for_issue(path_to_repo, i)
+                for i in issue_res
+            ),
+        )
+
+    is_dir, is_not_dir, per_issue, *commit_shas = asyncio.run(find())
+    assert is_dir and not is_not_dir
+    assert per_issue == find_commits_for_issues(path_to_repo, issue_res)
+    assert commit_shas == [
+        find_commits_for_issue(path_to_repo, i) for i in issue_res
+    ]
+
+
+def test_runner_bounds_concurrency(git_repo, monkeypatch):
+    path_to_repo, _ = git_repo
+    running = []
+    max_running = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def counting_exec(*args, **kwargs):
+        running.append(None)
+        max_running.append(len(running))
+        proc = await create_subprocess_exec(*args, **kwargs)
+        communicate = proc.communicate
+
+        async def done(input=None):
+            result = await communicate(input)
+            running.pop()
+            return result
+
+        proc.communicate = done
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", counting_exec)
+
+    async def log():
+        runner = GitRunner(max_concurrent=3)
+        return await asyncio.gather(
+            *(runner.git(path_to_repo, "log", "--oneline") for _ in range(12))
+        )
+
+    assert len(set(asyncio.run(log()))) == 1
+    assert max(max_running) == 3
+
+
+def test_compute_contrib_compl(git_repo):
+    path_to_repo, shas = git_repo
+    expected = compute_contrib_compls(
+        path_to_repo, {"first": shas[:2], "last": shas[2:]}
+    )
+
+    async def compute():
+        runner = GitRunner(max_concurrent=2)
+        return await asyncio.gather(
+            compute_contrib_compl(path_to_repo, shas[:2], runner=runner),
+            compute_contrib_compl(
+                path_to_repo, shas[2:], backend="git", runner=runner
+            ),
+        )
+
+    assert asyncio.run(compute()) == [expected["first"], expected["last"]]
+
+
+def test_concurrent_calls_on_the_same_repo(git_repo):
+    path_to_repo, shas = git_repo
+    expected = compute_contrib_compls(path_to_repo, {"ALL": shas})["ALL"]
+
+    async def main():
+        runner = GitRunner(max_concurrent=16)
+        return await asyncio.gather(
+            *(
+                runner.compute_contrib_compl(path_to_repo, shas)
+                for _ in range(16)
+            ),
+            *(compute_contrib_compl(path_to_repo, shas) for _ in range(16)),
+        )
+
+    assert asyncio.run(main()) == [expected] * 32
@@ -0,0 +1,53 @@
+import json
+from contribution_complexity.batch import read_done_ids, score_in_batches
+from contribution_complexity.metrics import compute_contrib_compls
+
+
+def _contribs(shas):
+    return {
+        "ISSUE-1": [shas[1], shas[0]],
+        "ISSUE-2": [shas[1]],
+        "ISSUE-3": [shas[3]],
+        "ISSUE-4": [],
+        "ALL": shas,
+    }
+
+
+def test_score_in_batches(git_repo, tmp_path):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = _contribs(shas)
+    path_to_results = tmp_path / "results.jsonl"
+
+    no_rows = score_in_batches(
+        path_to_repo, commit_shas_per_contrib, path_to_results, batch_size=2
+    )
+    assert no_rows == 5
+    rows = [json.loads(l) for l in path_to_results.read_text().splitlines()]
+    expected = compute_contrib_compls(
+        path_to_repo, {k: v for k, v in commit_shas_per_contrib.items() if v}
+    )
+    assert [r["id"] for r in rows] == list(commit_shas_per_contrib.keys())
+    for row in rows:
+        assert row["commit_shas"] == commit_shas_per_contrib[row["id"]]
+        if row["commit_shas"]:
+            assert row["contrib_complexity"] == expected[row["id"]].value
+        else:
+            assert row["contrib_complexity"] is None
+
+
+def test_resume_after_partial_row(git_repo, tmp_path):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = _contribs(shas)
+    path_to_results = tmp_path / "results.csv"
+    score_in_batches(path_to_repo, commit_shas_per_contrib, path_to_results)
+    complete = path_to_results.read_text()
+    # As if a run crashed while writing the last row
+    path_to_results.write_text(complete[:-10])
+
+    done_ids = read_done_ids(path_to_results)
+    assert done_ids == {"ISSUE-1", "ISSUE-2", "ISSUE-3", "ISSUE-4"}
+    missing = {
+        k: v for k, v in commit_shas_per_contrib.items() if k not in done_ids
+    }
+    assert score_in_batches(path_to_repo, missing, path_to_results) == 1
+    assert path_to_results.read_text() == complete
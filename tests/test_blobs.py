@@ -0,0 +1,31 @@
+from pathlib import Path
+from contribution_complexity.blobs import BlobReader, blob_reader
+from tests.conftest import _commit, _git
+
+
+def test_read_blobs(git_repo):
+    path_to_repo, shas = git_repo
+    big = "".join(f"line {i}\n" for i in range(20000))
+    _commit(Path(path_to_repo), {"big.txt": big}, "Add a big file")
+    oids = {
+        name: _git(path_to_repo, "rev-parse", f"HEAD:{name}")
+        for name in ("src/A.java", "big.txt")
+    }
+    tree_oid = _git(path_to_repo, "rev-parse", "HEAD^{tree}")
+
+    with BlobReader(path_to_repo) as reader:
+        assert bytes(reader.read(oids["big.txt"])) == big.encode()
+        # Non-blobs and unknown objects are skipped without losing track of
+        # the output of git
+        assert reader.read(tree_oid) is None
+        assert reader.read("0" * 40) is None
+        expected = _git(path_to_repo, "show", "HEAD:src/A.java")
+        assert reader.read_text(oids["src/A.java"]).strip() == expected
+        assert reader.read_text(oids["big.txt"]) == big
+
+
+def test_one_reader_per_repository(git_repo, tmp_path):
+    path_to_repo, _ = git_repo
+    reader = blob_reader(path_to_repo)
+    assert blob_reader(path_to_repo) is reader
+    assert blob_reader(tmp_path) is not reader
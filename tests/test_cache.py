@@ -0,0 +1,75 @@
+from contribution_complexity import metrics
+from contribution_complexity.cache import MetricsCache
+from contribution_complexity.metrics import compute_contrib_compls
+
+
+RECORD = {
+    "no_modified_files": 2,
+    "no_lines": 12,
+    "modifications": [
+        {
+            "change_type": "MODIFY",
+            "old_path": "src/A.java",
+            "new_path": "src/A.java",
+            "no_lines_added": 5,
+            "no_lines_removed": 5,
+            "no_hunks": 2,
+            "no_methods_changed": 1,
+        },
+        {
+            "change_type": "DELETE",
+            "old_path": "README",
+            "new_path": None,
+            "no_lines_added": 0,
+            "no_lines_removed": 2,
+            "no_hunks": 1,
+            "no_methods_changed": 0,
+        },
+    ],
+}
+
+
+def test_cache_roundtrip(tmp_path):
+    cache = MetricsCache(tmp_path / "metrics.sqlite")
+    cache.put_records({"a" * 40: RECORD})
+
+    result = cache.get_records(["a" * 40, "b" * 40])
+    assert result == {"a" * 40: RECORD}
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.clear()
+    assert cache.get_records(["a" * 40]) == {}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = MetricsCache(tmp_path / "metrics.sqlite", max_modifications=4)
+    cache.put_records({"a" * 40: RECORD})
+    cache.put_records({"b" * 40: RECORD})
+    cache.get_records(["a" * 40])
+    cache.put_records({"c" * 40: RECORD})
+
+    result = cache.get_records(["a" * 40, "b" * 40, "c" * 40])
+    assert sorted(result.keys()) == ["a" * 40, "c" * 40]
+
+
+def test_cached_commits_are_not_mined(git_repo, tmp_path, monkeypatch):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = {"ISSUE-1": shas[:2], "ALL": shas}
+    cache = MetricsCache(tmp_path / "metrics.sqlite")
+
+    expected = compute_contrib_compls(path_to_repo, commit_shas_per_contrib)
+    result = compute_contrib_compls(
+        path_to_repo, commit_shas_per_contrib, cache=cache
+    )
+    assert result == expected
+    assert (cache.hits, cache.misses) == (0, len(shas))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("Cached commits are mined again")
+
+    monkeypatch.setattr(metrics, "_records_per_commits", fail)
+    result = compute_contrib_compls(
+        path_to_repo, commit_shas_per_contrib, cache=cache
+    )
+    assert result == expected
+    assert (cache.hits, cache.misses) == (len(shas), len(shas))
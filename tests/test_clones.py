@@ -0,0 +1,63 @@
+from pathlib import Path
+from contribution_complexity.clones import (
+    cached_clone,
+    clean_clones,
+    clone_path,
+    evict_clones,
+)
+from contribution_complexity.compute import is_git_url
+from contribution_complexity.metrics import collect_records
+from tests.conftest import _commit, _git
+
+
+def _remote(git_repo, tmp_path):
+    path_to_repo, shas = git_repo
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "clone", "-q", "--bare", path_to_repo, str(remote))
+    return f"file://{remote}", shas
+
+
+def test_file_urls_are_git_urls():
+    assert is_git_url("file:///tmp/remote.git")
+    assert is_git_url("https://github.com/apache/cassandra.git")
+    assert not is_git_url("/tmp/remote.git")
+
+
+def test_cached_clone_fetches_new_commits(git_repo, tmp_path):
+    url, shas = _remote(git_repo, tmp_path)
+    clones = tmp_path / "clones"
+
+    path = cached_clone(url, directory=clones)
+    assert path == str(clone_path(url, clones))
+    assert _git(path, "rev-parse", "main") == shas[-1]
+
+    path_to_repo, _ = git_repo
+    new_sha = _commit(Path(path_to_repo), {"src/D.java": "class D {}\n"}, "D")
+    _git(path_to_repo, "push", "-q", url[len("file://") :], "main")
+    assert cached_clone(url, directory=clones) == path
+    assert _git(path, "rev-parse", "main") == new_sha
+
+
+def test_same_records_from_clone(git_repo, tmp_path):
+    url, shas = _remote(git_repo, tmp_path)
+    path_to_repo, _ = git_repo
+
+    path = cached_clone(url, directory=tmp_path / "clones")
+    expected = collect_records(path_to_repo, shas)
+    assert collect_records(path, shas) == expected
+    assert collect_records(path, shas, backend="git") == expected
+
+
+def test_least_recently_used_clones_are_evicted(git_repo, tmp_path):
+    url, _ = _remote(git_repo, tmp_path)
+    clones = tmp_path / "clones"
+    first = cached_clone(url, directory=clones)
+    second = cached_clone(url + "/", directory=clones)
+    assert first != second
+
+    cached_clone(url, directory=clones, max_size=1)
+    assert Path(first).is_dir()
+    assert not Path(second).is_dir()
+
+    assert clean_clones(clones) == [Path(first)]
+    assert evict_clones(clones) == []
@@ -0,0 +1,119 @@
+import sys
+import pytest
+from pathlib import Path
+from collections import Counter
+from contribution_complexity import compute, metrics
+from contribution_complexity.compute import (
+    find_commits_for_issue,
+    find_commits_for_issues,
+    load_state,
+    match_issues,
+    save_state,
+    update_contrib_compls,
+)
+from contribution_complexity.metrics import compute_contrib_compls
+from tests.conftest import JAVA_SRC, _commit
+
+
+def test_find_commits_for_issues(git_repo):
+    path_to_repo, shas = git_repo
+    issue_res = ["ISSUE-1( |$)", "ISSUE-2( |$)", "ISSUE-3( |$)", "ISSUE-4"]
+
+    result = find_commits_for_issues(path_to_repo, issue_res)
+    assert result == {
+        "ISSUE-1( |$)": [shas[1], shas[0]],
+        "ISSUE-2( |$)": [shas[1]],
+        "ISSUE-3( |$)": [shas[3]],
+        "ISSUE-4": [],
+    }
+
+
+def test_find_commits_for_issues_matches_grep(git_repo):
+    path_to_repo, _ = git_repo
+    issue_res = ["ISSUE-1( |$)", "ISSUE-2( |$)", "ISSUE-3( |$)"]
+
+    result = find_commits_for_issues(path_to_repo, issue_res)
+    for issue_re in issue_res:
+        expected = find_commits_for_issue(path_to_repo, issue_re)
+        assert result[issue_re] == expected
+
+
+def test_issues_with_the_same_regex(git_repo):
+    path_to_repo, shas = git_repo
+    issue_res = ["ISSUE-1( |$)", "ISSUE-2( |$)", "ISSUE-1( |$)"]
+
+    result = find_commits_for_issues(path_to_repo, issue_res)
+    assert result == {
+        "ISSUE-1( |$)": [shas[1], shas[0]],
+        "ISSUE-2( |$)": [shas[1]],
+    }
+    # A commit is listed once per issue, even if it is logged twice
+    log = f"{shas[0]}\nISSUE-1 a\0{shas[0]}\nISSUE-1 a\0"
+    assert match_issues(log, issue_res[:1]) == {"ISSUE-1( |$)": [shas[0]]}
+
+
+def test_update_contrib_compls_incrementally(git_repo, tmp_path):
+    path_to_repo, shas = git_repo
+    issues = {"1": "ISSUE-1( |$)", "2": "ISSUE-2( |$)", "4": "ISSUE-4( |$)"}
+    path_to_state = tmp_path / "state.json"
+
+    state = load_state(path_to_state)
+    contribs, breakdowns = update_contrib_compls(
+        path_to_repo, issues, state
+    )
+    save_state(path_to_state, state)
+    assert contribs == {"1": [shas[1], shas[0]], "2": [shas[1]], "4": []}
+    assert set(breakdowns.keys()) == {"1", "2"}
+
+    new_sha = _commit(
+        Path(path_to_repo),
+        {"src/A.java": JAVA_SRC.format(name="A", n=7)},
+        "ISSUE-4 and ISSUE-1 again",
+    )
+    issues["3"] = "ISSUE-3( |$)"
+    state = load_state(path_to_state)
+    contribs, breakdowns = update_contrib_compls(
+        path_to_repo, issues, state
+    )
+    # Issue 2 got no new commits
+    assert contribs == {
+        "1": [new_sha, shas[1], shas[0]],
+        "4": [new_sha],
+        "3": [shas[3]],
+    }
+    expected = compute_contrib_compls(path_to_repo, contribs)
+    for contrib_id, contribcompl in expected.items():
+        assert breakdowns[contrib_id]["contrib_complexity"] == contribcompl
+
+    contribs, breakdowns = update_contrib_compls(
+        path_to_repo, issues, state
+    )
+    assert contribs == {}
+    assert breakdowns == {}
+
+
+@pytest.mark.parametrize(
+    "options, avoided",
+    [(["--no-cache"], 2), (["--no-cache", "--save-raw=raw.json"], 0)],
+)
+def test_run_skips_irrelevant_method_levels(
+    git_repo, monkeypatch, tmp_path, capsys, options, avoided
+):
+    path_to_repo, _ = git_repo
+    lines = "".join(f"        int x{i} = {i};\n" for i in range(20))
+    src = f"public class D {{\n    public void f() {{\n{lines}    }}\n}}\n"
+    first = _commit(Path(path_to_repo), {"src/D.java": src}, "Add D")
+    # See `test_irrelevant_method_levels_are_skipped`
+    second = _commit(
+        Path(path_to_repo), {"src/D.java": src.replace("= ", "= 1 + ")}, "D"
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(metrics, "COUNTERS", Counter())
+    argv = ["contribcompl", "commits", *options, path_to_repo, first, second]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    compute.run()
+    # Records that are saved have to hold under any models
+    assert metrics.COUNTERS["lizard_parses_avoided"] == avoided
+    expected = compute_contrib_compls(path_to_repo, {"D": [first, second]})
+    assert capsys.readouterr().out.strip().endswith(str(expected["D"]))
@@ -0,0 +1,78 @@
+import pytest
+from contribution_complexity.dedup import (
+    drop_duplicates,
+    find_duplicates,
+    patch_ids,
+)
+from contribution_complexity.metrics import (
+    COUNTERS,
+    collect_records,
+    compute_contrib_compls,
+)
+from tests.conftest import _git
+
+
+@pytest.fixture
+def picked_repo(git_repo):
+    """The repository of `git_repo` with the change of ISSUE-2 cherry-picked
+    to a release branch, which is merged back into main
+    """
+    path_to_repo, shas = git_repo
+    _git(path_to_repo, "checkout", "-q", "-b", "release", shas[0])
+    _git(path_to_repo, "cherry-pick", "-x", shas[1])
+    picked = _git(path_to_repo, "rev-parse", "HEAD")
+    _git(path_to_repo, "checkout", "-q", "main")
+    _git(path_to_repo, "merge", "-q", "--no-ff", "release", "-m", "Merge")
+    merge = _git(path_to_repo, "rev-parse", "HEAD")
+    return path_to_repo, shas, picked, merge
+
+
+def test_find_duplicates(picked_repo):
+    path_to_repo, shas, picked, merge = picked_repo
+
+    ids = patch_ids(path_to_repo, [shas[1], picked, merge, "0" * 40])
+    assert ids.keys() == {shas[1], picked}
+    assert ids[shas[1]] == ids[picked]
+
+    commit_shas = [picked, shas[0], shas[1], merge]
+    assert find_duplicates(path_to_repo, commit_shas) == {shas[1]: picked}
+    assert find_duplicates(path_to_repo, shas) == {}
+
+
+def test_drop_duplicates():
+    duplicate_of = {"b": "a", "c": "a"}
+    commit_shas_per_contrib = {"1": ["c", "b", "d"], "2": ["b"]}
+
+    assert drop_duplicates(commit_shas_per_contrib, duplicate_of) == {
+        "1": ["c", "d"],
+        "2": ["b"],
+    }
+
+
+def test_duplicates_are_mined_once(picked_repo):
+    path_to_repo, shas, picked, _ = picked_repo
+    commit_shas = [shas[1], picked]
+
+    COUNTERS.clear()
+    records = collect_records(
+        path_to_repo, commit_shas, duplicate_of={picked: shas[1]}
+    )
+    assert COUNTERS["commits"] == 1
+    assert records[picked] == records[shas[1]]
+
+
+def test_compute_contrib_compls_with_dedup(picked_repo):
+    path_to_repo, shas, picked, _ = picked_repo
+    contribs = {"ISSUE-2": [shas[1], picked, shas[2]]}
+
+    expected = compute_contrib_compls(path_to_repo, contribs)
+    assert compute_contrib_compls(path_to_repo, contribs, dedup=True) == (
+        expected
+    )
+
+    skipped = compute_contrib_compls(
+        path_to_repo, contribs, dedup=True, count_duplicates=False
+    )
+    assert skipped == compute_contrib_compls(
+        path_to_repo, {"ISSUE-2": [shas[1], shas[2]]}
+    )
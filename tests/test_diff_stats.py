@@ -0,0 +1,49 @@
+import random
+import pytest
+from contribution_complexity.diff_stats import count_diff_lines
+
+
+def count_diff_lines_by_splitting(diff):
+    # Like `_compute_hunks` in `contribution_complexity.metrics` and
+    # PyDriller's `Modification.added` and `.removed`
+    is_hunk = False
+    no_hunks = 0
+    for line in diff.splitlines():
+        if line.startswith("+") or line.startswith("-"):
+            if not is_hunk:
+                is_hunk = True
+                no_hunks += 1
+        else:
+            is_hunk = False
+    lines = diff.replace("\r", "").split("\n")
+    no_added = len([l for l in lines if l.startswith("+") and l[:3] != "+++"])
+    no_removed = len(
+        [l for l in lines if l.startswith("-") and l[:3] != "---"]
+    )
+    return no_added, no_removed, no_hunks
+
+
+@pytest.mark.parametrize(
+    "diff, expected",
+    [
+        ("", (0, 0, 0)),
+        ("@@ -1 +1 @@\n-a\n+b\n", (1, 1, 1)),
+        ("@@ -1,2 +1,2 @@\n-a\n c\n+b\n", (1, 1, 2)),
+        ("+a\n\n+b", (2, 0, 2)),
+        ("+++a\n---b\n+c\n", (1, 0, 1)),
+        ("@@ -1 +1 @@\r\n-a\r\n+b\r\n", (1, 1, 1)),
+        ("+a\x0c+b\x0cc\n+d", (2, 0, 2)),
+    ],
+)
+def test_count_diff_lines(diff, expected):
+    assert count_diff_lines(diff) == expected
+    assert count_diff_lines_by_splitting(diff) == expected
+
+
+@pytest.mark.parametrize("alphabet", ["+-+-ab @\n\n\n", "+-ab @\n\n\r\x0c "])
+def test_count_diff_lines_like_splitting(alphabet):
+    rnd = random.Random(42)
+    for _ in range(5000):
+        length = rnd.randint(0, 40)
+        diff = "".join(rnd.choice(alphabet) for _ in range(length))
+        assert count_diff_lines(diff) == count_diff_lines_by_splitting(diff)
@@ -0,0 +1,133 @@
+import os
+import sys
+import pytest
+from contribution_complexity import compute, fleet
+from contribution_complexity.fleet import (
+    WorkerError,
+    WorkStealingScheduler,
+    read_fleet_config,
+    score_fleet,
+)
+from contribution_complexity.metrics import compute_contrib_compls
+from tests.conftest import JAVA_SRC, _commit, _git
+
+
+def _small_repo(path, no_commits):
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    for i in range(no_commits):
+        files = {f"src/C{i % 3}.java": JAVA_SRC.format(name=f"C{i % 3}", n=i)}
+        _commit(path, files, f"BUG-{i % 4} Change {i}")
+    return str(path)
+
+
+@pytest.fixture
+def fleet_config(git_repo, tmp_path):
+    path_to_repo, _ = git_repo
+    _small_repo(tmp_path / "small", 9)
+    (tmp_path / "issues.csv").write_text(
+        "id,issue_regex\n1,ISSUE-1( |$)\n2,ISSUE-2( |$)\n4,ISSUE-4( |$)\n"
+    )
+    path_to_config = tmp_path / "fleet.toml"
+    path_to_config.write_text(f"""
+[[repos]]
+name = "main"
+path = "{path_to_repo}"
+issues = "issues.csv"
+
+[[repos]]
+name = "small"
+path = "small"
+issue_regex = "BUG-{{id}}( |$)"
+ids = [0, 1, 2, 3]
+""")
+    return path_to_config
+
+
+def test_work_stealing_scheduler():
+    scheduler = WorkStealingScheduler(3)
+    scheduler.assign({"big": list(range(6)), "small": ["a", "b"]})
+    assert [list(d) for d in scheduler.deques] == [
+        [0, 1, 2, 3, 4, 5],
+        ["a", "b"],
+        [],
+    ]
+    # Idle workers steal from the back of the fullest deque
+    assert scheduler.next_task(2) == 5
+    assert scheduler.next_task(1) == "a"
+    assert scheduler.next_task(0) == 0
+    assert scheduler.steals == 1
+
+    tasks = [scheduler.next_task(i % 3) for i in range(8)]
+    assert {t for t in tasks if t is not None} == {1, 2, 3, 4, "b"}
+    assert scheduler.next_task(0) is None
+
+
+def test_read_fleet_config(fleet_config, tmp_path):
+    main, small = read_fleet_config(fleet_config)
+    assert main["issues"] == {
+        "1": "ISSUE-1( |$)",
+        "2": "ISSUE-2( |$)",
+        "4": "ISSUE-4( |$)",
+    }
+    assert small["path"] == str(tmp_path / "small")
+    assert small["issues"]["3"] == "BUG-3( |$)"
+
+
+def test_read_fleet_config_without_tomli(fleet_config, monkeypatch):
+    # As on Python < 3.11 without tomli installed
+    monkeypatch.setitem(sys.modules, "tomllib", None)
+    monkeypatch.setitem(sys.modules, "tomli", None)
+    with pytest.raises(ValueError, match="requires tomli"):
+        read_fleet_config(fleet_config)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_score_fleet(fleet_config, workers):
+    repos = read_fleet_config(fleet_config)
+
+    results, throughput = score_fleet(repos, workers=workers, chunk_size=2)
+    for repo in repos:
+        commit_shas_per_contrib, breakdowns = results[repo["name"]]
+        assert commit_shas_per_contrib.keys() == repo["issues"].keys()
+        expected = compute_contrib_compls(
+            repo["path"],
+            {k: v for k, v in commit_shas_per_contrib.items() if v},
+        )
+        assert breakdowns.keys() == expected.keys()
+        for issue_id, contribcompl in expected.items():
+            breakdown = breakdowns[issue_id]
+            assert breakdown["contrib_complexity"] == contribcompl
+    assert throughput["main"]["commits"] == 2
+    assert throughput["small"]["commits"] == 9
+    assert throughput["small"]["mined"] == 9
+
+
+def _crash(*args, **kwargs):
+    os._exit(3)
+
+
+def _fail(*args, **kwargs):
+    raise OSError("Disk full")
+
+
+def test_dead_workers_fail_the_fleet(fleet_config, monkeypatch):
+    repos = read_fleet_config(fleet_config)
+    # Workers are forked and inherit the patch
+    monkeypatch.setattr(fleet, "_mine_chunk", _crash)
+    monkeypatch.setattr(fleet, "POLL_SECONDS", 0.1)
+    with pytest.raises(WorkerError, match="exited with code 3"):
+        score_fleet(repos, workers=2)
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_failures_exit_with_one_line(fleet_config, monkeypatch, capsys, jobs):
+    monkeypatch.setattr(fleet, "_mine_chunk", _fail)
+    argv = ["contribcompl", "fleet", "--no-cache", f"--jobs={jobs}"]
+    monkeypatch.setattr(sys, "argv", argv + [str(fleet_config)])
+    with pytest.raises(SystemExit) as e:
+        compute.run()
+    assert e.value.code == 1
+    out = capsys.readouterr().out
+    assert out.startswith("Cannot score fleet: Mining ")
+    assert out.endswith(" failed: OSError: Disk full\n")
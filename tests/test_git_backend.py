@@ -0,0 +1,88 @@
+import os
+from collections import Counter
+from pathlib import Path
+from contribution_complexity import git_backend, metrics
+from contribution_complexity.git_backend import iter_commits
+from contribution_complexity.metrics import (
+    _records_per_commits,
+    collect_records,
+    record_per_commit,
+)
+from tests.conftest import JAVA_SRC, _commit, _git
+
+
+def test_same_records_as_pydriller(git_repo):
+    path_to_repo, shas = git_repo
+
+    expected = _records_per_commits(path_to_repo, shas)
+    records = _records_per_commits(path_to_repo, shas, backend="git")
+    assert records == expected
+
+
+def test_same_records_for_special_modifications(git_repo):
+    path_to_repo, shas = git_repo
+    path = Path(path_to_repo)
+    (path / "bin.dat").write_bytes(b"\x00\x01\x02")
+    crlf_src = JAVA_SRC.format(name="A", n=4).replace("\n", "\r\n")
+    shas.append(_commit(path, {"src/A.java": crlf_src}, "Binary and CRLF"))
+    os.chmod(path / "src/A.java", 0o755)
+    shas.append(_commit(path, {"ü dir/x y.txt": "a"}, "Mode and unicode"))
+    _git(path, "checkout", "-q", "-b", "side", shas[1])
+    shas.append(_commit(path, {"f.py": "def f():\n    pass\n"}, "Side"))
+    _git(path, "checkout", "-q", "main")
+    _git(path, "merge", "-q", "--no-ff", "side", "-m", "Merge")
+    shas.append(_git(path, "rev-parse", "HEAD"))
+
+    expected = _records_per_commits(path_to_repo, shas[6:])
+    records = _records_per_commits(path_to_repo, shas[6:], backend="git")
+    assert records == expected
+
+
+def test_unknown_commits_are_skipped(git_repo):
+    path_to_repo, shas = git_repo
+    commit_shas = [shas[0], shas[1][:10], "0" * 40, shas[0]]
+
+    commits = list(iter_commits(path_to_repo, commit_shas))
+    assert [c.hash for c in commits] == [shas[0]]
+    assert record_per_commit(commits[0]) == collect_records(
+        path_to_repo, [shas[0]]
+    )[shas[0]]
+
+
+def test_git_backend_in_parallel(git_repo):
+    path_to_repo, shas = git_repo
+
+    expected = collect_records(path_to_repo, shas)
+    records = collect_records(path_to_repo, shas, workers=3, backend="git")
+    assert records == expected
+
+
+def test_no_blobs_are_read_for_deletes_and_renames(git_repo, monkeypatch):
+    path_to_repo, shas = git_repo
+    read_oids = []
+
+    def read_blob(path_to_repo, oid):
+        read_oids.append(oid)
+
+    monkeypatch.setattr(git_backend, "_read_blob", read_blob)
+    # A pure rename of src/B.java to src/C.java and a deletion of src/C.java
+    records = collect_records(path_to_repo, shas[4:], backend="git")
+    assert [m["change_type"] for m in records[shas[4]]["modifications"]] == [
+        "RENAME"
+    ]
+    assert [m["change_type"] for m in records[shas[5]]["modifications"]] == [
+        "DELETE"
+    ]
+    assert read_oids == []
+
+
+def test_diff_bytes_are_counted(git_repo, monkeypatch):
+    path_to_repo, shas = git_repo
+    commit_sha = _commit(Path(path_to_repo), {"ü.txt": "ä\nb\n"}, "Umlauts")
+    monkeypatch.setattr(metrics, "COUNTERS", Counter())
+
+    (commit,) = iter_commits(path_to_repo, [commit_sha])
+    (mod,) = commit.modifications
+    assert mod.diff == "@@ -0,0 +1,2 @@\n+ä\n+b\n"
+    record_per_commit(commit)
+    assert metrics.COUNTERS["diff_bytes"] == len(mod.diff.encode()) == 23
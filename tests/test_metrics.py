@@ -0,0 +1,126 @@
+import tracemalloc
+import pytest
+from pathlib import Path
+from collections import Counter
+from pydriller import GitRepository, RepositoryMining
+from contribution_complexity import metrics
+from tests.conftest import _commit, _git
+from contribution_complexity.metrics import (
+    collect_records,
+    compute_contrib_compl,
+    compute_contrib_compls,
+)
+
+
+def test_compute_contrib_compls(git_repo):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = {
+        "ISSUE-1": [shas[0], shas[1]],
+        "ISSUE-2": [shas[1]],
+        "ISSUE-3": [shas[2], shas[3]],
+        "ALL": shas,
+    }
+
+    result = compute_contrib_compls(path_to_repo, commit_shas_per_contrib)
+    assert list(result.keys()) == list(commit_shas_per_contrib.keys())
+    for contrib_id, commit_shas in commit_shas_per_contrib.items():
+        expected = compute_contrib_compl(path_to_repo, commit_shas)
+        assert result[contrib_id] == expected
+
+
+def test_compute_contrib_compls_in_parallel(git_repo):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = {
+        "ISSUE-1": [shas[0], shas[1]],
+        "ISSUE-3": [shas[2], shas[3]],
+        "ALL": shas,
+    }
+
+    serial = compute_contrib_compls(path_to_repo, commit_shas_per_contrib)
+    parallel = compute_contrib_compls(
+        path_to_repo, commit_shas_per_contrib, workers=3
+    )
+    assert list(parallel.items()) == list(serial.items())
+    assert compute_contrib_compl(path_to_repo, shas, workers=2) == serial["ALL"]
+
+
+def test_lizard_parses_are_avoided(git_repo, monkeypatch):
+    path_to_repo, shas = git_repo
+    monkeypatch.setattr(metrics, "COUNTERS", Counter())
+
+    records = collect_records(path_to_repo, shas[4:])
+    rename, = records[shas[4]]["modifications"]
+    delete, = records[shas[5]]["modifications"]
+    assert rename["no_methods_changed"] == 0
+    assert delete["no_methods_changed"] is None
+    # Both sources of the renamed file and the deleted source would have been
+    # parsed
+    assert metrics.COUNTERS["lizard_parses_avoided"] == 3
+
+
+def test_irrelevant_method_levels_are_skipped(git_repo, monkeypatch):
+    path_to_repo, shas = git_repo
+    lines = "".join(f"        int x{i} = {i};\n" for i in range(20))
+    src = f"public class D {{\n    public void f() {{\n{lines}    }}\n}}\n"
+    first = _commit(Path(path_to_repo), {"src/D.java": src}, "Add D")
+    # 20 added and 20 removed lines in one hunk are of the levels 2, 2, and
+    # 1, whose mean with any method level rounds to 2
+    second = _commit(
+        Path(path_to_repo), {"src/D.java": src.replace("= ", "= 1 + ")}, "D"
+    )
+    models = metrics.get_models()
+    assert not metrics._method_level_matters(20, 20, 1, models)
+    assert metrics._method_level_matters(1, 1, 1, models)
+    monkeypatch.setattr(metrics, "COUNTERS", Counter())
+
+    records = collect_records(path_to_repo, [first, second])
+    skipped = collect_records(path_to_repo, [first, second], models=models)
+    (mod,) = records[second]["modifications"]
+    (skipped_mod,) = skipped[second]["modifications"]
+    assert mod["no_methods_changed"] == 1
+    assert skipped_mod["no_methods_changed"] is None
+    assert metrics.COUNTERS["lizard_parses_avoided"] == 2
+    assert skipped[first] == records[first]
+
+    contribs = {"D": [first, second]}
+    assert metrics.contrib_compls_from_records(
+        skipped, contribs
+    ) == metrics.contrib_compls_from_records(records, contribs)
+
+
+def test_iter_commits(git_repo):
+    path_to_repo, shas = git_repo
+    git_repo = GitRepository(path_to_repo)
+    unknown = "0" * 40
+    commit_shas = [shas[2], unknown, shas[0][:7], shas[1], shas[2], shas[0]]
+    commit_shas.insert(2, "1" * 40)
+
+    commits = list(metrics.iter_commits(git_repo, commit_shas))
+    # Parents before children although all commits have the same date
+    assert [c.hash for c in commits] == [shas[0], shas[1], shas[2]]
+
+    rm = RepositoryMining(path_to_repo, only_commits=commit_shas)
+    assert [c.hash for c in commits] == [c.hash for c in rm.traverse_commits()]
+
+
+@pytest.mark.parametrize("backend", ["pydriller", "git"])
+def test_memory_is_bounded_by_largest_commit(tmp_path, backend):
+    path = tmp_path / "repo"
+    path.mkdir()
+    _git(path, "init", "-q", "-b", "main")
+    shas = []
+    for v in range(8):
+        # Each commit rewrites all lines of a large file
+        big = "".join(f"line {v} {i} {'x' * 40}\n" for i in range(10000))
+        shas.append(_commit(path, {"data.txt": big}, f"ISSUE-1 Version {v}"))
+
+    def peak_memory(commit_shas):
+        tracemalloc.start()
+        try:
+            compute_contrib_compl(str(path), commit_shas, backend=backend)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    # Mining all commits must not keep their diffs and sources alive
+    assert peak_memory(shas) < 1.5 * peak_memory(shas[-1:])
@@ -0,0 +1,65 @@
+import io
+import csv
+import json
+from contribution_complexity.metrics import (
+    collect_records,
+    compute_contrib_compls,
+    contrib_breakdowns_from_records,
+)
+from contribution_complexity.output import CSV_COLUMNS, write_breakdowns
+
+
+def _breakdowns(git_repo):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = {"ISSUE-1": [shas[1], shas[0]], "ALL": shas}
+    records = collect_records(path_to_repo, shas)
+    breakdowns = contrib_breakdowns_from_records(
+        records, commit_shas_per_contrib
+    )
+    return path_to_repo, commit_shas_per_contrib, breakdowns
+
+
+def test_breakdowns_match_complexities(git_repo):
+    path_to_repo, commit_shas_per_contrib, breakdowns = _breakdowns(git_repo)
+
+    expected = compute_contrib_compls(path_to_repo, commit_shas_per_contrib)
+    for contrib_id, contribcompl in expected.items():
+        assert breakdowns[contrib_id]["contrib_complexity"] == contribcompl
+    assert breakdowns["ISSUE-1"]["no_modified_files"] == 3
+    assert breakdowns["ISSUE-1"]["no_mod_types"] == 2
+
+
+def test_write_json(git_repo):
+    _, commit_shas_per_contrib, breakdowns = _breakdowns(git_repo)
+    commit_shas_per_contrib["EMPTY"] = []
+
+    fp = io.StringIO()
+    write_breakdowns(fp, commit_shas_per_contrib, breakdowns, "json")
+    rows = [json.loads(line) for line in fp.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == ["ISSUE-1", "ALL", "EMPTY"]
+    issue_row, _, empty_row = rows
+    breakdown = breakdowns["ISSUE-1"]
+    assert issue_row["contrib_complexity"] == (
+        breakdown["contrib_complexity"].value
+    )
+    assert issue_row["changed_l_per_f"] == breakdown["changed_l_per_f"]
+    assert issue_row["mod_compl"] == breakdown["mod_compl"].value
+    assert sum(issue_row["mods_compl_freqs"].values()) == 3
+    assert empty_row["contrib_complexity"] is None
+
+
+def test_write_csv(git_repo):
+    _, commit_shas_per_contrib, breakdowns = _breakdowns(git_repo)
+
+    fp = io.StringIO()
+    write_breakdowns(fp, commit_shas_per_contrib, breakdowns, "csv")
+    fp.seek(0)
+    reader = csv.DictReader(fp)
+    assert tuple(reader.fieldnames) == CSV_COLUMNS
+    rows = list(reader)
+    assert rows[0]["commit_shas"] == " ".join(
+        commit_shas_per_contrib["ISSUE-1"]
+    )
+    assert rows[1]["contrib_complexity"] == str(
+        breakdowns["ALL"]["contrib_complexity"].value
+    )
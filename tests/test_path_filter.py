@@ -0,0 +1,210 @@
+import os
+import sys
+import json
+import pytest
+import subprocess
+from pathlib import Path
+from contribution_complexity.metrics import (
+    collect_records,
+    compute_contrib_compls,
+    contrib_breakdowns_from_records,
+)
+from contribution_complexity.path_filter import (
+    add_excluded_files,
+    count_excluded_files,
+    parse_patterns,
+    pathspecs_for,
+    to_globs,
+    to_pathspecs,
+)
+from tests.conftest import JAVA_SRC, _commit, _git
+
+
+def test_to_globs():
+    assert to_globs("*.lock") == ["**/*.lock", "**/*.lock/**"]
+    assert to_globs("/build/") == ["build/**"]
+    assert to_globs("vendor/") == ["**/vendor/**"]
+    assert to_globs("src/gen") == ["src/gen", "src/gen/**"]
+    assert to_pathspecs() is None
+    assert to_pathspecs(["README"], ["*.java"]) == [
+        ":(glob)**/*.java",
+        ":(glob)**/*.java/**",
+        ":(exclude,glob)**/README",
+        ":(exclude,glob)**/README/**",
+    ]
+
+
+def test_parse_patterns():
+    text = "# Generated\n\n*.lock\n  vendor/  \n"
+    assert parse_patterns(text) == ["*.lock", "vendor/"]
+    with pytest.raises(ValueError):
+        parse_patterns("*.lock\n!keep.lock\n")
+
+
+def test_ignore_files(git_repo, tmp_path, monkeypatch):
+    path_to_repo, _ = git_repo
+    monkeypatch.setenv("HOME", str(tmp_path))
+    assert pathspecs_for(path_to_repo) is None
+
+    (tmp_path / ".contribcomplignore").write_text("*.lock\n")
+    _commit(tmp_path / "repo", {".contribcomplignore": "README\n"}, "Ignore")
+    assert pathspecs_for(path_to_repo, ["src/C.java"]) == to_pathspecs(
+        ["*.lock", "README", "src/C.java"]
+    )
+
+
+def test_excluded_files_are_not_mined(git_repo):
+    path_to_repo, shas = git_repo
+    pathspecs = to_pathspecs(["README"])
+
+    records = collect_records(path_to_repo, shas, backend="git")
+    filtered = collect_records(
+        path_to_repo, shas, backend="git", pathspecs=pathspecs
+    )
+    assert filtered[shas[0]]["no_modified_files"] == 1
+    assert filtered[shas[1]] == records[shas[1]]
+    assert filtered[shas[3]]["no_modified_files"] == 0
+
+    # PyDriller's modifications are filtered after they are read
+    assert collect_records(path_to_repo, shas, pathspecs=pathspecs) == filtered
+    assert (
+        collect_records(path_to_repo, shas, workers=2, pathspecs=pathspecs)
+        == filtered
+    )
+
+    java_only = compute_contrib_compls(
+        path_to_repo,
+        {"ALL": shas},
+        backend="git",
+        pathspecs=to_pathspecs(includes=["*.java"]),
+    )
+    assert java_only == compute_contrib_compls(
+        path_to_repo, {"ALL": shas}, backend="git", pathspecs=pathspecs
+    )
+
+
+def test_renames_across_filters(git_repo):
+    path_to_repo, _ = git_repo
+    path = Path(path_to_repo)
+    src = JAVA_SRC.format(name="X", n=5)
+    shas = [
+        _commit(path, {"vendor/X.java": src}, "Vendor X"),
+        _commit(path, {"vendor/X.java": None, "src/X.java": src}, "Move in"),
+        _commit(path, {"src/X.java": None, "vendor/Y.java": src}, "Move out"),
+        _commit(path, {"vendor/Y.java": None, "vendor/Z.java": src}, "Move"),
+    ]
+    pathspecs = to_pathspecs(["vendor/"])
+
+    records = collect_records(
+        path_to_repo, shas, backend="git", pathspecs=pathspecs
+    )
+    assert records == collect_records(path_to_repo, shas, pathspecs=pathspecs)
+    # The pathspecs apply before renames are detected
+    kinds = [
+        [mod["change_type"] for mod in records[sha]["modifications"]]
+        for sha in shas
+    ]
+    assert kinds == [[], ["ADD"], ["DELETE"], []]
+
+
+def test_add_excluded_files(git_repo):
+    path_to_repo, shas = git_repo
+    pathspecs = to_pathspecs(["README"])
+    commit_shas_per_contrib = {"ISSUE-1": [shas[1], shas[0]], "ALL": shas}
+
+    no_excluded_files = count_excluded_files(path_to_repo, shas, pathspecs)
+    assert no_excluded_files == {
+        sha: int(i in (0, 2, 3)) for i, sha in enumerate(shas)
+    }
+
+    records = collect_records(
+        path_to_repo, shas, backend="git", pathspecs=pathspecs
+    )
+    breakdowns = contrib_breakdowns_from_records(
+        records, commit_shas_per_contrib
+    )
+    add_excluded_files(
+        breakdowns, path_to_repo, commit_shas_per_contrib, pathspecs
+    )
+    assert breakdowns["ISSUE-1"]["no_excluded_files"] == 1
+    assert breakdowns["ALL"]["no_excluded_files"] == 3
+
+
+def _contribcompl(tmp_path, *args):
+    env = {
+        **os.environ,
+        "HOME": str(tmp_path),
+        "XDG_CACHE_HOME": str(tmp_path / "cache"),
+    }
+    cmd = [sys.executable, "-m", "contribution_complexity.compute", *args]
+    result = subprocess.run(
+        cmd, capture_output=True, text=True, env=env, check=True
+    )
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+
+@pytest.fixture
+def ignoring_repo(git_repo, tmp_path):
+    """The repository of `git_repo` with an ignore file that excludes README,
+    which is modified by the commits of ISSUE-1 and ISSUE-3
+    """
+    path_to_repo, shas = git_repo
+    _commit(Path(path_to_repo), {".contribcomplignore": "README\n"}, "Ignore")
+    (tmp_path / "issues.csv").write_text(
+        "id,issue_regex\n1,ISSUE-1( |$)\n3,ISSUE-3( |$)\n"
+    )
+    return path_to_repo, shas
+
+
+def test_ignore_file_with_state(ignoring_repo, tmp_path):
+    path_to_repo, shas = ignoring_repo
+    args = ["issues", "--output=json", f"--state={tmp_path / 'state.json'}"]
+    args += [
+        "--no-cache",
+        path_to_repo,
+        f"--from-csv={tmp_path / 'issues.csv'}",
+    ]
+
+    rows = {row["id"]: row for row in _contribcompl(tmp_path, *args)}
+    expected = {
+        row["id"]: row
+        for row in _contribcompl(
+            tmp_path,
+            "issues",
+            "--output=json",
+            "--no-cache",
+            path_to_repo,
+            f"--from-csv={tmp_path / 'issues.csv'}",
+        )
+    }
+    assert rows == expected
+    assert rows["1"]["no_modified_files"] == 2
+    assert rows["1"]["no_excluded_files"] == 1
+    # The commit of ISSUE-3 only removes the README
+    assert rows["3"]["no_modified_files"] == 0
+
+    # Without the ignore file, all issues are computed from scratch and
+    # written again
+    _git(path_to_repo, "rm", "-q", ".contribcomplignore")
+    _git(path_to_repo, "commit", "-q", "-m", "Unignore")
+    rows = {row["id"]: row for row in _contribcompl(tmp_path, *args)}
+    assert rows["1"]["no_modified_files"] == 3
+    assert rows["1"]["no_excluded_files"] == 0
+
+
+def test_ignore_file_in_fleet(ignoring_repo, tmp_path):
+    path_to_repo, shas = ignoring_repo
+    path_to_config = tmp_path / "fleet.toml"
+    path_to_config.write_text(
+        f'[[repos]]\nname = "main"\npath = "{path_to_repo}"\n'
+        'issues = "issues.csv"\n'
+    )
+
+    for backend in ("--backend=pydriller", "--backend=git"):
+        rows = _contribcompl(
+            tmp_path, "fleet", "--output=json", backend, str(path_to_config)
+        )
+        rows = {row["id"]: row for row in rows}
+        assert rows["main/1"]["no_modified_files"] == 2
+        assert rows["main/1"]["no_excluded_files"] == 1
+        assert rows["main/3"]["no_modified_files"] == 0
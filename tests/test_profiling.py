@@ -0,0 +1,66 @@
+import json
+import time
+import pytest
+from contribution_complexity import git_backend, profiling
+from contribution_complexity.metrics import COUNTERS, compute_contrib_compls
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    monkeypatch.setattr(profiling, "TRACING", False)
+    monkeypatch.setattr(profiling, "STAGES", {})
+    monkeypatch.setattr(profiling, "EVENTS", [])
+    profiling.enable(trace=True)
+
+
+def test_stages_are_only_timed_when_enabled(monkeypatch):
+    monkeypatch.setattr(profiling, "ENABLED", False)
+    monkeypatch.setattr(profiling, "STAGES", {})
+    with profiling.stage("nothing"):
+        pass
+    assert profiling.STAGES == {}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_profile_pipeline(git_repo, enabled, workers, tmp_path):
+    path_to_repo, shas = git_repo
+    COUNTERS.clear()
+
+    compute_contrib_compls(path_to_repo, {"all": shas}, workers=workers)
+    calls = {name: stats[0] for name, stats in profiling.STAGES.items()}
+    # Stages of worker processes are merged into the ones of this process
+    assert calls["mine commits"] == min(workers, len(shas))
+    assert calls["retrieve modifications"] == len(shas)
+    assert calls["count diff lines"] == COUNTERS["modifications"]
+    assert calls["lizard"] > 0
+    assert calls["aggregate"] == 1
+    assert COUNTERS["commits"] == len(shas)
+    assert "lizard" in profiling.format_summary(COUNTERS)
+
+    path_to_trace = tmp_path / "trace.json"
+    profiling.write_trace(path_to_trace, COUNTERS)
+    trace = json.loads(path_to_trace.read_text())
+    assert len(trace["traceEvents"]) == sum(calls.values())
+    assert {e["ph"] for e in trace["traceEvents"]} == {"X"}
+    assert trace["otherData"]["counters"]["commits"] == len(shas)
+
+
+def test_sources_are_read_in_their_stage(git_repo, enabled, monkeypatch):
+    path_to_repo, shas = git_repo
+    read_blob = git_backend._read_blob
+    read_oids = []
+
+    def slow_read_blob(path_to_repo, oid):
+        read_oids.append(oid)
+        time.sleep(0.05)
+        return read_blob(path_to_repo, oid)
+
+    monkeypatch.setattr(git_backend, "_read_blob", slow_read_blob)
+    compute_contrib_compls(path_to_repo, {"all": shas}, backend="git")
+    assert read_oids
+    # Lizard gets the sources that were read before it runs
+    _, read_wall, _ = profiling.STAGES["read sources"]
+    _, lizard_wall, _ = profiling.STAGES["lizard"]
+    assert read_wall >= len(read_oids) * 0.05 * 1e9
+    assert lizard_wall < len(read_oids) * 0.05 * 1e9
@@ -0,0 +1,52 @@
+from contribution_complexity import metrics
+from contribution_complexity.models import load_models
+from contribution_complexity.complexity_types import ContributionComplexity
+from contribution_complexity.raw_metrics import (
+    read_raw_metrics,
+    write_raw_metrics,
+)
+from contribution_complexity.metrics import (
+    collect_records,
+    compute_contrib_compls,
+    contrib_compls_from_records,
+)
+
+
+STRICT_MODELS = """
+LINE_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+HUNK_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+METHOD_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+FILE_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+MODIFICATION_KIND_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+MOD_COMPL_WEIGHTS = {
+    ModificationComplexity.LOW: 1,
+    ModificationComplexity.MODERATE: 2,
+    ModificationComplexity.MEDIUM: 3,
+    ModificationComplexity.ELEVATED: 4,
+    ModificationComplexity.HIGH: 5,
+}
+MODIFICATION_MODEL = ((-1, 0), (0, 1), (1, 2), (2, 3), (3, math.inf))
+"""
+
+
+def test_rescore_from_raw_metrics(git_repo, tmp_path, monkeypatch):
+    path_to_repo, shas = git_repo
+    commit_shas_per_contrib = {"ISSUE-1": shas[:2], "ALL": shas}
+    path_to_raw = tmp_path / "raw.json.gz"
+
+    records = collect_records(path_to_repo, shas)
+    write_raw_metrics(path_to_raw, records, commit_shas_per_contrib)
+    raw_records, raw_commit_shas_per_contrib = read_raw_metrics(path_to_raw)
+    assert raw_records == records
+    assert raw_commit_shas_per_contrib == commit_shas_per_contrib
+
+    expected = compute_contrib_compls(path_to_repo, commit_shas_per_contrib)
+    result = contrib_compls_from_records(raw_records, commit_shas_per_contrib)
+    assert result == expected
+
+    path_to_models = tmp_path / "models.py"
+    path_to_models.write_text(STRICT_MODELS)
+    monkeypatch.setattr(metrics, "_models", metrics.get_models())
+    metrics.use_models(load_models(path_to_models))
+    result = contrib_compls_from_records(raw_records, commit_shas_per_contrib)
+    assert result["ALL"] == ContributionComplexity.HIGH
@@ -0,0 +1,95 @@
+import threading
+import pytest
+from pathlib import Path
+from contribution_complexity.client import ScoringError, score
+from contribution_complexity.metrics import compute_contrib_compls
+from contribution_complexity.server import Scorer, make_server
+from tests.conftest import JAVA_SRC, _commit, _git
+
+
+@pytest.fixture
+def server_url():
+    server = make_server(Scorer(), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_score_shas(git_repo, server_url):
+    path_to_repo, shas = git_repo
+    expected = compute_contrib_compls(path_to_repo, {"commits": shas[:2]})
+
+    row = score(path_to_repo, shas=shas[:2], url=server_url)
+    assert row["commit_shas"] == shas[:2]
+    assert row["contrib_complexity"] == expected["commits"].value
+    # The repository is still open for the second request
+    assert score(path_to_repo, shas=shas[:2], url=server_url) == row
+
+
+def test_score_issue_regex(git_repo, server_url):
+    path_to_repo, shas = git_repo
+    expected = compute_contrib_compls(
+        path_to_repo, {"ISSUE-1": [shas[1], shas[0]]}
+    )
+
+    row = score(path_to_repo, issue_regex="ISSUE-1( |$)", url=server_url)
+    assert row["commit_shas"] == [shas[1], shas[0]]
+    assert row["contrib_complexity"] == expected["ISSUE-1"].value
+
+    row = score(path_to_repo, issue_regex="ISSUE-4( |$)", url=server_url)
+    assert row["commit_shas"] == []
+    assert row["contrib_complexity"] is None
+
+
+def test_bad_requests(git_repo, tmp_path, server_url):
+    path_to_repo, _ = git_repo
+    with pytest.raises(ScoringError, match="neither a repository"):
+        score(str(tmp_path), shas=[], url=server_url)
+    with pytest.raises(ScoringError, match="need either shas"):
+        score(path_to_repo, url=server_url)
+
+
+def test_clones_are_fetched_for_new_commits(
+    git_repo, tmp_path, server_url, monkeypatch
+):
+    path_to_repo, shas = git_repo
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "clone", "-q", "--bare", path_to_repo, str(remote))
+    url = f"file://{remote}"
+    score(url, shas=shas[:1], url=server_url)
+
+    # Pushed after the server cloned the repository
+    new_sha = _commit(
+        Path(path_to_repo),
+        {"src/D.java": JAVA_SRC.format(name="D", n=4)},
+        "ISSUE-5 Add D",
+    )
+    _git(path_to_repo, "push", "-q", str(remote), "main")
+    expected = compute_contrib_compls(path_to_repo, {"new": [new_sha]})
+    row = score(url, shas=[new_sha], url=server_url)
+    assert row["contrib_complexity"] == expected["new"].value
+
+    with pytest.raises(ScoringError, match="Unknown commits: 0000"):
+        score(url, shas=[new_sha, "0" * 40], url=server_url)
+    with pytest.raises(ScoringError, match="Unknown commits"):
+        score(path_to_repo, shas=[shas[0][:10]], url=server_url)
+    with pytest.raises(ScoringError, match="Unknown commits: 1111"):
+        score(path_to_repo, shas=[shas[0], "1" * 40], url=server_url)
+
+
+def test_path_filters(git_repo, tmp_path, monkeypatch):
+    path_to_repo, shas = git_repo
+    monkeypatch.setenv("HOME", str(tmp_path))
+    _commit(Path(path_to_repo), {".contribcomplignore": "README\n"}, "Ignore")
+    request = {"repo": path_to_repo, "shas": shas[:1]}
+
+    for backend in ("pydriller", "git"):
+        row = Scorer(backend=backend).score(request)
+        assert row["no_modified_files"] == 1
+        assert row["no_excluded_files"] == 1
+        row = Scorer(backend=backend, excludes=["*.java"]).score(request)
+        assert row["no_modified_files"] == 0
+        assert row["no_excluded_files"] == 2
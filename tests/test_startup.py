@@ -0,0 +1,49 @@
+import sys
+import subprocess
+import pytest
+
+HEAVY_MODULES = ("pydriller", "git", "lizard", "numpy")
+
+
+def import_times(*args):
+    """Runs the CLI with `python -X importtime` and returns its stdout and the
+    cumulative import time in microseconds per imported module
+    """
+    cmd = [sys.executable, "-X", "importtime", "-m"]
+    cmd += ["contribution_complexity.compute", *args]
+    result = subprocess.run(cmd, capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return result.stdout, times
+
+
+@pytest.mark.parametrize(
+    "args",
+    [["--help"], ["--version"], ["commits", "--output=xml", ".", "abc"]],
+)
+def test_startup_imports_nothing_heavy(args):
+    stdout, times = import_times(*args)
+    assert "contribution_complexity.output" in times
+    assert not [m for m in HEAVY_MODULES if m in times]
+    assert "using default models" not in stdout
+    if args != ["--version"]:
+        # Only needed to read the installed version
+        assert "importlib.metadata" not in times
+
+
+def test_models_are_loaded_on_first_use():
+    code = (
+        "from contribution_complexity import metrics\n"
+        "assert metrics._models is None\n"
+        "metrics.get_models()\n"
+        "assert metrics._models is not None\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout == ""
@@ -0,0 +1,75 @@
+import random
+import pytest
+from contribution_complexity.metrics import (
+    contrib_compls_from_records,
+    get_models,
+    map_mod_records_to_compls,
+)
+from contribution_complexity.raw_metrics import (
+    COMMIT_COLUMNS,
+    MOD_COLUMNS,
+    records_from_columns,
+)
+
+np = pytest.importorskip("numpy")
+from contribution_complexity.vectorized import (  # noqa: E402
+    MOD_KINDS,
+    contrib_compl_levels,
+    mod_compl_levels,
+    to_levels,
+)
+
+
+def random_columns(rnd, no_commits):
+    # Values close to the bounds of the default models
+    vals = [0, 1, 2, 3, 5, 7, 9, 10, 15, 16, 30, 31, 60, 90, 91, 500]
+    commit_cols = {col: [] for col in COMMIT_COLUMNS}
+    mod_cols = {col: [] for col in MOD_COLUMNS}
+    for idx in range(no_commits):
+        no_mods = rnd.choice([0, 1, 2, 3, 10, 40, 120])
+        commit_cols["sha"].append(f"{idx:040x}")
+        commit_cols["no_modified_files"].append(rnd.choice(vals + [no_mods]))
+        commit_cols["no_lines"].append(rnd.choice(vals) * rnd.choice(vals))
+        commit_cols["no_mods"].append(no_mods)
+        for _ in range(no_mods):
+            mod_cols["change_type"].append(rnd.choice(MOD_KINDS))
+            mod_cols["old_path"].append("a")
+            mod_cols["new_path"].append("a")
+            for col in MOD_COLUMNS[3:]:
+                mod_cols[col].append(rnd.choice(vals))
+            if rnd.random() < 0.2:
+                # Methods that were not analyzed, see `metrics_per_mod`
+                mod_cols["no_methods_changed"][-1] = None
+    return commit_cols, mod_cols
+
+
+def test_vectorized_discretization_is_identical():
+    rnd = random.Random(42)
+    commit_cols, mod_cols = random_columns(rnd, 300)
+    records = records_from_columns(commit_cols, mod_cols)
+    shas = commit_cols["sha"]
+    commit_shas_per_contrib = {
+        idx: rnd.sample(shas, rnd.choice([1, 1, 2, 5, 30])) + ["f" * 40]
+        for idx in range(500)
+    }
+
+    mod_records = [m for r in records.values() for m in r["modifications"]]
+    expected = [c.value for c in map_mod_records_to_compls(mod_records)]
+    result = mod_compl_levels(mod_cols, get_models())
+    assert result.tolist() == expected
+
+    expected = contrib_compls_from_records(records, commit_shas_per_contrib)
+    result = contrib_compl_levels(
+        commit_cols, mod_cols, commit_shas_per_contrib, get_models()
+    )
+    assert result.tolist() == [c.value for c in expected.values()]
+    assert len(set(result.tolist())) > 2
+
+
+def test_to_levels():
+    model = [(-1, 10), (10, 30), (30, float("inf"))]
+    assert to_levels([0, 10, 11, 500], model).tolist() == [1, 1, 2, 3]
+    # Missing values, e.g., of methods that were not analyzed
+    assert to_levels([None, float("nan"), 31], model).tolist() == [1, 1, 3]
+    with pytest.raises(ValueError, match="Value -1 is outside"):
+        to_levels([3, -1], model)